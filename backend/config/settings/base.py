@@ -221,5 +221,112 @@ CORS_ALLOWED_ORIGINS = config(
     cast=Csv()
 )
 CORS_ALLOW_CREDENTIALS = config('CORS_ALLOW_CREDENTIALS', default=True, cast=bool)
+
+# Scoring rule table (JSON overlay on core.services.scoring_rules.DEFAULT_RULES).
+# The file is re-checked every SCORING_RULES_CHECK_SECONDS and hot-reloaded on change.
+SCORING_RULES_FILE = config('SCORING_RULES_FILE', default='')
+SCORING_RULES_CHECK_SECONDS = config('SCORING_RULES_CHECK_SECONDS', default=5, cast=float)
+
+# Per-worker score distribution used for submit percentiles; rebuilt from the DB at this interval.
+SCORE_DISTRIBUTION_REFRESH_SECONDS = config('SCORE_DISTRIBUTION_REFRESH_SECONDS', default=300, cast=float)
+
+# Upper bound on grid points scored by one what-if request.
+WHAT_IF_MAX_POINTS = config('WHAT_IF_MAX_POINTS', default=100000, cast=int)
+
+# Per-worker memo of live scoring previews, keyed on the normalized engine input.
+SCORING_PREVIEW_CACHE_SIZE = config('SCORING_PREVIEW_CACHE_SIZE', default=4096, cast=int)
+
+# Upper bound on draws sampled by one Monte Carlo simulation request.
+MONTE_CARLO_MAX_DRAWS = config('MONTE_CARLO_MAX_DRAWS', default=100000, cast=int)
+
+# Per-worker section-score matrix for investor weighting profiles; rebuilt from the DB at this
+# interval, or once this many saves/deletes are waiting to be merged. Rankings are memoized per weight vector.
+SECTION_MATRIX_REFRESH_SECONDS = config('SECTION_MATRIX_REFRESH_SECONDS', default=300, cast=float)
+SECTION_MATRIX_MAX_PENDING = config('SECTION_MATRIX_MAX_PENDING', default=500, cast=int)
+WEIGHTED_RANKING_CACHE_SIZE = config('WEIGHTED_RANKING_CACHE_SIZE', default=256, cast=int)
+
+# Upper bound on the rows one chat question loads as context ("top 500" is capped to this).
+CHAT_CONTEXT_MAX_ROWS = config('CHAT_CONTEXT_MAX_ROWS', default=50, cast=int)
+# Prompt tokens the encoded company table may use; rows past it are trimmed.
+CHAT_CONTEXT_TOKEN_BUDGET = config('CHAT_CONTEXT_TOKEN_BUDGET', default=1500, cast=int)
+# Streamed list/table answers read their rows in chunks of this size, up to CHAT_STREAM_MAX_ROWS.
+CHAT_STREAM_CHUNK_SIZE = config('CHAT_STREAM_CHUNK_SIZE', default=200, cast=int)
+CHAT_STREAM_MAX_ROWS = config('CHAT_STREAM_MAX_ROWS', default=10000, cast=int)
+
+# Per-worker company name index used to resolve the companies chat questions mention.
+NAME_INDEX_REFRESH_SECONDS = config('NAME_INDEX_REFRESH_SECONDS', default=300, cast=float)
+
+# Per-worker tf-idf index over the free-text form answers, used to add topic matches to chat context.
+# Rebuilt from the DB at this interval, or once this many saves/deletes are waiting to be merged.
+TEXT_INDEX_REFRESH_SECONDS = config('TEXT_INDEX_REFRESH_SECONDS', default=300, cast=float)
+TEXT_INDEX_MAX_PENDING = config('TEXT_INDEX_MAX_PENDING', default=500, cast=int)
+# Minimum cosine similarity for a company to count as matching a question.
+TEXT_INDEX_MIN_SCORE = config('TEXT_INDEX_MIN_SCORE', default=0.1, cast=float)
+
+# Startup search (core.services.evaluation_search): the database full-text index (MySQL FULLTEXT,
+# SQLite FTS5) when migrated, else ('memory' forces it) a per-worker inverted index rebuilt at this interval.
+EVALUATION_SEARCH_BACKEND = config('EVALUATION_SEARCH_BACKEND', default='auto')
+SEARCH_INDEX_REFRESH_SECONDS = config('SEARCH_INDEX_REFRESH_SECONDS', default=300, cast=float)
+# Words read from one query, and indexed words one query word may expand to as a prefix.
+SEARCH_MAX_TERMS = config('SEARCH_MAX_TERMS', default=8, cast=int)
+SEARCH_PREFIX_EXPANSIONS = config('SEARCH_PREFIX_EXPANSIONS', default=64, cast=int)
+
+# LLM providers, resolved once per process (core.services.llm_providers). The OpenAI client
+# shares one keep-alive connection pool across requests and threads.
+OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
+OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-4o-mini')
+OPENAI_BASE_URL = config('OPENAI_BASE_URL', default='')
+GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
+# Answers were already generated with this default (as in .env.example); the health check reports the same model
+GEMINI_MODEL = config('GEMINI_MODEL', default='gemini-1.5-flash')
+LLM_TIMEOUT_SECONDS = config('LLM_TIMEOUT_SECONDS', default=30, cast=float)
+LLM_CONNECT_TIMEOUT_SECONDS = config('LLM_CONNECT_TIMEOUT_SECONDS', default=5, cast=float)
+LLM_MAX_CONNECTIONS = config('LLM_MAX_CONNECTIONS', default=20, cast=int)
+LLM_MAX_KEEPALIVE_CONNECTIONS = config('LLM_MAX_KEEPALIVE_CONNECTIONS', default=10, cast=int)
+LLM_KEEPALIVE_EXPIRY_SECONDS = config('LLM_KEEPALIVE_EXPIRY_SECONDS', default=30, cast=float)
+# Hedged requests (core.services.llm_gateway): the secondary provider is asked too once the primary
+# is slower than this percentile of its recent latencies (a fixed delay until enough samples).
+LLM_HEDGE_PERCENTILE = config('LLM_HEDGE_PERCENTILE', default=95, cast=float)
+LLM_HEDGE_MIN_DELAY_SECONDS = config('LLM_HEDGE_MIN_DELAY_SECONDS', default=0.5, cast=float)
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = config('LLM_HEDGE_DEFAULT_DELAY_SECONDS', default=4.0, cast=float)
+LLM_HEDGE_MIN_SAMPLES = config('LLM_HEDGE_MIN_SAMPLES', default=20, cast=int)
+LLM_HEDGE_WINDOW = config('LLM_HEDGE_WINDOW', default=200, cast=int)
+# Per-provider circuit breakers: a provider whose recent calls mostly fail or are slow is skipped
+# for LLM_BREAKER_OPEN_SECONDS, then let through for LLM_BREAKER_HALF_OPEN_CALLS trial calls.
+LLM_BREAKER_FAILURE_RATIO = config('LLM_BREAKER_FAILURE_RATIO', default=0.5, cast=float)
+LLM_BREAKER_MIN_CALLS = config('LLM_BREAKER_MIN_CALLS', default=10, cast=int)
+LLM_BREAKER_WINDOW = config('LLM_BREAKER_WINDOW', default=20, cast=int)
+LLM_BREAKER_SLOW_FIRST_TOKEN_SECONDS = config('LLM_BREAKER_SLOW_FIRST_TOKEN_SECONDS', default=8, cast=float)
+LLM_BREAKER_SLOW_ANSWER_SECONDS = config('LLM_BREAKER_SLOW_ANSWER_SECONDS', default=20, cast=float)
+LLM_BREAKER_OPEN_SECONDS = config('LLM_BREAKER_OPEN_SECONDS', default=30, cast=float)
+LLM_BREAKER_HALF_OPEN_CALLS = config('LLM_BREAKER_HALF_OPEN_CALLS', default=1, cast=int)
+# Overall time budget of one chat request (database, model and fallback); the reserve is kept
+# back from the model call for answering from platform data.
+CHAT_REQUEST_DEADLINE_SECONDS = config('CHAT_REQUEST_DEADLINE_SECONDS', default=25, cast=float)
+CHAT_FALLBACK_RESERVE_SECONDS = config('CHAT_FALLBACK_RESERVE_SECONDS', default=1, cast=float)
+# Chat questions per investor (DRF rate string); empty disables the limit, e.g. for load tests.
+INVESTOR_CHAT_THROTTLE_RATE = config('INVESTOR_CHAT_THROTTLE_RATE', default='10/minute') or None
+# Investor narratives are written by a background thread pool after an evaluation is submitted
+# (core.services.narrative_service) and served from the evaluation row.
+NARRATIVE_WORKERS = config('NARRATIVE_WORKERS', default=2, cast=int)
+NARRATIVE_MAX_TOKENS = config('NARRATIVE_MAX_TOKENS', default=600, cast=int)
+
+# Model answers to chat questions, keyed on the normalized question and a fingerprint of the
+# context. LocMemCache evicts least-recently-used entries past MAX_ENTRIES; point
+# ANSWER_CACHE_BACKEND at e.g. django.core.cache.backends.redis.RedisCache to share it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'answers': {
+        'BACKEND': config('ANSWER_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('ANSWER_CACHE_LOCATION', default='chat-answers'),
+        'TIMEOUT': config('ANSWER_CACHE_TTL_SECONDS', default=600, cast=int),
+        'OPTIONS': {'MAX_ENTRIES': config('ANSWER_CACHE_MAX_ENTRIES', default=2000, cast=int)},
+    },
+}
+
+# Allowed throughput drop (fraction) before `manage.py bench_scoring` fails against its baseline.
+BENCHMARK_REGRESSION_MARGIN = config('BENCHMARK_REGRESSION_MARGIN', default=0.25, cast=float)
 LOGIN_URL = '/admin/login/'
 LOGIN_REDIRECT_URL = '/admin/'
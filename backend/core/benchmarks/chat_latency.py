@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+import json
+import platform
+import time
+
+import numpy as np
+from django.db import connection
+from rest_framework.test import APIClient
+
+from core.services import answer_cache
+
+ENDPOINTS = ('stream', 'chat')
+STREAM_URL = '/api/v1/investor/chat/stream'
+CHAT_URL = '/api/v1/investor/chat/'
+
+# Open questions the platform data cannot answer by itself, so each one reaches the model
+QUESTIONS: List[str] = [
+    "What are the main investment risks across these startups?",
+    "Which of these companies looks most capital efficient, and why?",
+    "How experienced are the founders of these startups?",
+    "What due diligence questions should I ask before investing here?",
+    "Summarize the investment thesis for the strongest startup.",
+]
+PERCENTILES = (50, 95, 99)
+
+
+def _tag(n: int) -> str:
+    """Letters-only request tag (a, b, ..., ba, ...): keeps questions unique without adding numbers the parser would read."""
+    out = ""
+    while True:
+        n, r = divmod(n, 26)
+        out = chr(ord("a") + r) + out
+        if not n:
+            return out
+
+
+def latency_summary(seconds: Sequence[float]) -> Optional[Dict[str, float]]:
+    """p50 / p95 / p99, mean and max in milliseconds, or None without samples."""
+    if not seconds:
+        return None
+    values = np.asarray(seconds, dtype=float) * 1000
+    out = {f"p{p}_ms": round(float(np.percentile(values, p)), 2) for p in PERCENTILES}
+    out["mean_ms"] = round(float(values.mean()), 2)
+    out["max_ms"] = round(float(values.max()), 2)
+    return out
+
+
+def _stream_turn(client: APIClient, question: str, session_id: Optional[str]) -> Dict[str, Any]:
+    params = {"message": question}
+    if session_id:
+        params["session_id"] = session_id
+    t0 = time.monotonic()
+    resp = client.get(STREAM_URL, params)
+    sample: Dict[str, Any] = {"endpoint": "stream", "status": resp.status_code, "ttft": None, "session_id": session_id}
+    if resp.status_code != 200:
+        sample["total"] = time.monotonic() - t0
+        return sample
+    for part in resp.streaming_content:
+        text = part.decode("utf-8") if isinstance(part, bytes) else part
+        if sample["ttft"] is None and "event: token" in text:
+            sample["ttft"] = time.monotonic() - t0
+        if "event: meta" in text and not sample["session_id"]:
+            sample["session_id"] = json.loads(text.split("data: ", 1)[1])["session_id"]
+    sample["total"] = time.monotonic() - t0
+    return sample
+
+
+def _chat_turn(client: APIClient, question: str, session_id: Optional[str]) -> Dict[str, Any]:
+    payload = {"message": question}
+    if session_id:
+        payload["session_id"] = session_id
+    t0 = time.monotonic()
+    resp = client.post(CHAT_URL, payload, format="json")
+    total = time.monotonic() - t0
+    data = resp.data if hasattr(resp, "data") else {}
+    # The whole answer arrives at once: time to first token is the total
+    return {
+        "endpoint": "chat", "status": resp.status_code, "ttft": total, "total": total,
+        "session_id": str(data.get("session_id")) if resp.status_code == 200 else session_id,
+    }
+
+
+def run_session(user, endpoint: str, questions: Sequence[str], turns: int, index: int) -> List[Dict[str, Any]]:
+    """One investor's chat session: ``turns`` questions in a row, each turn continuing the session."""
+    client = APIClient(raise_request_exception=False)
+    client.force_authenticate(user)
+    turn = _stream_turn if endpoint == "stream" else _chat_turn
+    samples = []
+    session_id = None
+    for t in range(turns):
+        question = f"{questions[(index + t) % len(questions)]} (ref {_tag(index * turns + t)})"
+        sample = turn(client, question, session_id)
+        session_id = sample.pop("session_id")
+        samples.append(sample)
+    return samples
+
+
+def _pooled_session(*args) -> List[Dict[str, Any]]:
+    try:
+        return run_session(*args)
+    finally:
+        # Pool threads outlive the session; don't leave their connection open
+        connection.close()
+
+
+def run(user, *, sessions: int = 8, turns: int = 5, endpoints: Sequence[str] = ENDPOINTS,
+        questions: Sequence[str] = QUESTIONS) -> Dict[str, Any]:
+    """
+    Run ``sessions`` concurrent chat sessions of ``turns`` questions against
+    each endpoint, in-process through the Django test client (the whole
+    request path: auth, throttling, database, gateway, persistence). Each
+    question carries a letters-only tag so no request is answered from the
+    answer cache.
+
+    Reports, per endpoint, time to first token (the first SSE token event;
+    the whole response for the JSON endpoint), total latency and requests
+    per second, with the status of every failed request.
+    """
+    report: Dict[str, Any] = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'sessions': sessions,
+        'turns': turns,
+        'endpoints': {},
+    }
+    for endpoint in endpoints:
+        answer_cache.clear()
+        t0 = time.monotonic()
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix=f"bench-{endpoint}") as pool:
+            futures = [pool.submit(_pooled_session, user, endpoint, questions, turns, i) for i in range(sessions)]
+            samples = [s for f in futures for s in f.result()]
+        wall = time.monotonic() - t0
+        ok = [s for s in samples if s["status"] == 200]
+        failures: Dict[str, int] = {}
+        for s in samples:
+            if s["status"] != 200:
+                failures[str(s["status"])] = failures.get(str(s["status"]), 0) + 1
+        report['endpoints'][endpoint] = {
+            'requests': len(samples),
+            'ok': len(ok),
+            'failures': failures,
+            'wall_seconds': round(wall, 3),
+            'throughput_rps': round(len(ok) / wall, 2) if wall > 0 else None,
+            'ttft': latency_summary([s["ttft"] for s in ok if s["ttft"] is not None]),
+            'total': latency_summary([s["total"] for s in ok]),
+        }
+    return report
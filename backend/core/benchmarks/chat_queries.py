@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, Optional, Sequence
+import platform
+import re
+import time
+
+from core.services.query_parser import parse_query
+
+# Question shapes seen in investor chat sessions
+CORPUS: List[str] = [
+    "Show me the top 5 startups",
+    "top 10 companies by score",
+    "What are the best startups on the platform?",
+    "Rank the seed stage startups",
+    "Which companies have scores more than 100?",
+    "List startups with score above than 120",
+    "top 3 startups with scores greater than 60 in the UK",
+    "Give me a table of all companies",
+    "Show the company table with columns",
+    "Show startups in tabular form",
+    "Compare Alpha and Beta",
+    "Alpha vs Beta",
+    "What is the difference between Gamma and Delta?",
+    "Compare the top startups",
+    "List all companies",
+    "bullet list of pre-seed startups",
+    "Enumerate the startups in India",
+    "Tell me about Alpha",
+    "Give me details on Beta Labs",
+    "Who is the founder of Gamma?",
+    "What does Delta do?",
+    "information on Acme Robotics",
+    "What is the MRR of Alpha?",
+    "What's Beta's revenue?",
+    "How many active users does Gamma have?",
+    "paying customers of Delta",
+    "What is the burn rate of Acme?",
+    "How much is Alpha raising? amount raising please",
+    "What stage is Beta at?",
+    "What's the score and rating of Gamma?",
+    "Which country is Delta in?",
+    "Where is Acme located? location",
+    "valuation of Alpha",
+    "Give a quick summary of visible startups",
+    "Portfolio overview",
+    "Give me a chart of companies",
+    "plot revenue growth for seed companies",
+    "graph the scores",
+    "Recommend a growth stage company in the US",
+    "Suggest MVP startups from Germany",
+    "Which series A companies have the best traction?",
+    "Any idea stage startups worth a look?",
+    "What is the risk profile of our deal flow?",
+    "How much funding has Alpha raised?",
+    "ROI expectations for this round",
+    "hello",
+    "what's the weather like today?",
+    "Tell us a joke",
+    "Show me startups",
+    "top startups in the united kingdom with score more than 50",
+]
+
+
+def legacy_parse(question: str) -> Dict[str, Any]:
+    """
+    The keyword scans the chat path ran before ``parse_query`` (one substring
+    pass per keyword list plus separate regex searches), kept as the
+    reference for equivalence checks and benchmarks.
+    """
+    ql = (question or "").lower()
+    if any(k in ql for k in ["chart", "graph", "plot"]):
+        intent, unsupported = "unsupported", "chart"
+    elif any(k in ql for k in ["table", "tabular", "grid", "columns"]):
+        intent, unsupported = "table", None
+    elif any(k in ql for k in ["compare", "versus", "vs", "difference"]):
+        intent, unsupported = "compare", None
+    elif ("list" in ql) or any(k in ql for k in ["bullet", "bulleted", "enumerate"]):
+        intent, unsupported = "list", None
+    elif any(k in ql for k in ["top", "best", "rank", "ranking", "recommend", "suggest"]):
+        intent, unsupported = "rank", None
+    elif any(k in ql for k in ["about ", " about", "details", "detail", "information on", "info on", "tell me about", "who is", "what does"]):
+        intent, unsupported = "company_profile", None
+    elif any(k in ql for k in ["mrr", "revenue", "users", "active users", "paying customers", "burn", "burn rate", "stage", "score", "rating", "country", "valuation", "amount raising", "funding", "growth"]):
+        intent, unsupported = "company_metric", None
+    elif any(k in ql for k in ["summary", "overview"]):
+        intent, unsupported = "summary", None
+    else:
+        intent, unsupported = "chat", None
+
+    top_n: Optional[int] = None
+    min_score: Optional[float] = None
+    m = re.search(r"top\s+(\d+)", ql)
+    if m:
+        top_n = int(m.group(1))
+    ms = re.search(r"(?:score|scores)\s+(?:more|above|greater)\s+(?:than|that)\s*(\d+)", ql)
+    if ms:
+        min_score = float(ms.group(1))
+
+    metric: Optional[str] = None
+    if "mrr" in ql or "revenue" in ql:
+        metric = "mrr"
+    elif "users" in ql and "active" in ql:
+        metric = "active_users"
+    elif "paying" in ql or "customers" in ql:
+        metric = "paying_customers"
+    elif "burn" in ql:
+        metric = "burn_rate"
+    elif "amount" in ql and "raising" in ql:
+        metric = "amount_raising"
+    elif "stage" in ql:
+        metric = "stage"
+    elif "score" in ql or "rating" in ql:
+        metric = "score"
+    elif "country" in ql or "location" in ql:
+        metric = "country"
+
+    invest_terms = ["startup", "startups", "company", "companies", "funding", "valuation", "mrr", "revenue", "invest", "investment", "cap table", "roi", "risk", "traction", "deal", "round", "growth", "users", "burn", "raise", "score", "stage", "portfolio", "list"]
+    return {
+        "intent": intent,
+        "unsupported": unsupported,
+        "top_n": top_n,
+        "min_score": min_score,
+        "metric": metric,
+        "wants_rank": any(k in ql for k in ["top", "best", "rank", "ranking"]),
+        "unrelated": not any(t in ql for t in invest_terms),
+    }
+
+
+def _time_per_call(fn, corpus: Sequence[str], iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        for q in corpus:
+            fn(q)
+    return (time.perf_counter() - t0) / (iterations * len(corpus))
+
+
+def run(corpus: Sequence[str] = CORPUS, iterations: int = 200) -> Dict[str, Any]:
+    """Time ``parse_query`` (uncached) against the legacy scans over the corpus."""
+    uncached = parse_query.__wrapped__
+    legacy_s = _time_per_call(legacy_parse, corpus, iterations)
+    parser_s = _time_per_call(uncached, corpus, iterations)
+    parse_query.cache_clear()
+    cached_s = _time_per_call(parse_query, corpus, iterations)
+    return {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'questions': len(corpus),
+        'iterations': iterations,
+        'legacy_us_per_question': round(legacy_s * 1e6, 3),
+        'parser_us_per_question': round(parser_s * 1e6, 3),
+        'parser_cached_us_per_question': round(cached_s * 1e6, 3),
+        'speedup': round(legacy_s / parser_s, 2) if parser_s > 0 else None,
+    }
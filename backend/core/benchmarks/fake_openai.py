@@ -0,0 +1,216 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+import json
+import random
+import threading
+import time
+import uuid
+
+DEFAULT_REPLY = (
+    "Startup Overview: the company is early but shows credible traction for its stage. "
+    "Financial Metrics: revenue is growing while burn remains within a reasonable range. "
+    "Risk Analysis: execution and market competition are the main risks. "
+    "Key Insights: the team and market size support a closer look."
+)
+
+
+class FakeOpenAIServer:
+    """
+    Local HTTP server speaking the OpenAI chat-completions protocol, so the
+    chat endpoints can be load-tested offline (point OPENAI_BASE_URL at
+    ``url``). ``POST /v1/chat/completions`` answers ``reply`` (cut to the
+    request's max_tokens), streamed as SSE chunks when ``stream`` is set;
+    ``GET /v1/models`` lists ``model``.
+
+    Latency and faults are configurable: ``first_token_delay`` seconds
+    before the first token, then ``tokens_per_second``; ``error_rate`` of the
+    requests fail with ``error_status``, and ``drop_rate`` of the streams are
+    cut after their first token. ``seed`` makes the injected faults
+    repeatable.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *, tokens_per_second: float = 50.0,
+                 first_token_delay: float = 0.2, error_rate: float = 0.0, error_status: int = 500,
+                 drop_rate: float = 0.0, reply: str = DEFAULT_REPLY, model: str = "fake-gpt",
+                 seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.tokens_per_second = tokens_per_second
+        self.first_token_delay = first_token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.drop_rate = drop_rate
+        self.model = model
+        self.tokens = [word + " " for word in reply.split()]
+        if self.tokens:
+            self.tokens[-1] = self.tokens[-1].rstrip()
+        self._random = random.Random(seed)
+        self._counts: Dict[str, int] = {'requests': 0, 'streams': 0, 'errors': 0, 'dropped': 0, 'disconnects': 0}
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL for OPENAI_BASE_URL."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _bind(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self.port = self._httpd.server_address[1]
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve from a background thread; ``port=0`` picks a free port."""
+        self._bind()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve from the calling thread until interrupted."""
+        self._bind()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, key: str):
+        with self._lock:
+            self._counts[key] += 1
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def reply_tokens(self, max_tokens: Any) -> List[str]:
+        try:
+            limit = int(max_tokens)
+        except (TypeError, ValueError):
+            return list(self.tokens)
+        return self.tokens[:max(1, limit)]
+
+    def token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeOpenAI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def fake(self) -> FakeOpenAIServer:
+        return self.server.fake
+
+    def _json(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str, kind: str = "server_error"):
+        self._json(status, {"error": {"message": message, "type": kind, "param": None, "code": None}})
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/v1/models":
+            return self._error(404, f"Unknown path {self.path}", "invalid_request_error")
+        self._json(200, {"object": "list", "data": [{"id": self.fake.model, "object": "model", "created": 0, "owned_by": "fake"}]})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._error(400, "Request body is not JSON.", "invalid_request_error")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            return self._error(404, f"Unknown path {self.path}", "invalid_request_error")
+        if not isinstance(body.get("messages"), list) or not body["messages"]:
+            return self._error(400, "messages is required.", "invalid_request_error")
+        fake = self.fake
+        fake.count('requests')
+        if fake.roll(fake.error_rate):
+            fake.count('errors')
+            return self._error(fake.error_status, "Injected failure.")
+        tokens = fake.reply_tokens(body.get("max_tokens"))
+        prompt_tokens = sum(len(str(m.get("content") or "")) // 4 for m in body["messages"] if isinstance(m, dict))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model") or fake.model
+        if body.get("stream"):
+            fake.count('streams')
+            return self._stream(completion_id, model, tokens)
+        time.sleep(fake.first_token_delay + fake.token_delay() * max(0, len(tokens) - 1))
+        self._json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens), "total_tokens": prompt_tokens + len(tokens)},
+        })
+
+    def _chunk(self, completion_id: str, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+        event = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(event)}\n\n".encode("utf-8")
+
+    def _write(self, data: bytes):
+        # One HTTP/1.1 chunk per SSE event, flushed straight away
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, completion_id: str, model: str, tokens: List[str]):
+        fake = self.fake
+        drop = fake.roll(fake.drop_rate)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._write(self._chunk(completion_id, model, {"role": "assistant", "content": ""}))
+            time.sleep(fake.first_token_delay)
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(fake.token_delay())
+                self._write(self._chunk(completion_id, model, {"content": token}))
+                if drop:
+                    fake.count('dropped')
+                    self.close_connection = True
+                    return
+            self._write(self._chunk(completion_id, model, {}, "stop"))
+            self._write(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client (e.g. a cancelled hedge) went away mid-stream
+            fake.count('disconnects')
+            self.close_connection = True
@@ -0,0 +1,46 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+import asyncio
+
+
+class FakeProvider:
+    """
+    In-process stand-in for an LLM provider, for exercising the gateway
+    without the network: it streams ``tokens`` after ``first_token_delay``
+    seconds (then ``token_delay`` between tokens), or raises ``error``.
+
+    ``calls``, ``completed`` and ``cancelled`` record what the gateway did
+    with it.
+    """
+
+    def __init__(self, name: str, tokens: Sequence[str] = ("ok",), *, first_token_delay: float = 0.0,
+                 token_delay: float = 0.0, error: Optional[BaseException] = None, model: str = "fake"):
+        self.name = name
+        self.model = model
+        self.tokens = list(tokens)
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.error = error
+        self.calls = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.requests: List[Dict[str, Any]] = []
+
+    async def stream(self, messages, *, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        self.calls += 1
+        self.requests.append({'messages': messages, 'max_tokens': max_tokens, 'temperature': temperature})
+        try:
+            await asyncio.sleep(self.first_token_delay)
+            if self.error is not None:
+                raise self.error
+            for i, token in enumerate(self.tokens):
+                if i and self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                yield token
+            self.completed += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except GeneratorExit:
+            # Closed by the consumer before the last token
+            self.cancelled += 1
+            raise
@@ -0,0 +1,236 @@
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+import json
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+
+from core.services.engine_input import flatten_steps
+from core.services.scoring_engine import StartupScoringEngine
+from core.services.scoring_rules import get_rules
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+CHUNK_ROWS = 50000
+
+STAGES = ('IDEA', 'MVP', 'SEED', 'Series A', 'GROWTH', 'pre-seed', None)
+STAGE_WEIGHTS = (0.18, 0.22, 0.28, 0.12, 0.08, 0.07, 0.05)
+LEGAL_STRUCTURES = ('LTD', 'LLC', 'C-Corp', 'Pvt Ltd', 'Sole Trader', '', None)
+COUNTRIES = ('UK', 'US', 'IN', 'DE', 'NG', '')
+EXIT_STRATEGIES = ('Acquisition', 'IPO', '', None)
+BAD_STRINGS = ('n/a', 'abc', '', ' 42 ', '1,000', '~5k', 'unknown')
+
+MISSING_RATE = 0.05
+BAD_STRING_RATE = 0.02
+
+
+def _metric(rng: np.random.Generator, n: int, median: float, sigma: float, zero_rate: float) -> np.ndarray:
+    """Log-normal metric with a share of zeros, missing values and malformed strings."""
+    values = np.round(rng.lognormal(np.log(median), sigma, n)).astype(np.int64)
+    values[rng.random(n) < zero_rate] = 0
+    out = values.astype(object)
+    out[rng.random(n) < MISSING_RATE] = None
+    bad = rng.random(n) < BAD_STRING_RATE
+    out[bad] = rng.choice(np.array(BAD_STRINGS, dtype=object), int(bad.sum()))
+    return out
+
+
+def synthetic_columns(n: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    A synthetic population of ``n`` engine inputs in the columnar layout of
+    ``score_batch``: skewed metrics, every stage, and a share of missing values
+    and unparseable strings in the numeric fields.
+    """
+    rng = np.random.default_rng(seed)
+
+    def pick(options: Sequence[Any], p: Optional[Sequence[float]] = None) -> np.ndarray:
+        return np.array(options, dtype=object)[rng.choice(len(options), n, p=p)]
+
+    years = rng.integers(2008, 2027, n).astype(object)
+    years[rng.random(n) < MISSING_RATE] = None
+    technical = pick((True, False, None), (0.55, 0.4, 0.05))
+    competitors = pick(('Medium', None), (0.7, 0.3))
+    return {
+        'company_name': np.array([f"Synthetic {i}" for i in range(n)], dtype=object),
+        'legal_structure': pick(LEGAL_STRUCTURES),
+        'incorporation_year': years,
+        'country': pick(COUNTRIES),
+        'stage': pick(STAGES, STAGE_WEIGHTS),
+        'funding_raised': _metric(rng, n, 150000, 2.0, 0.35),
+        'tam_size': _metric(rng, n, 300, 1.8, 0.02),
+        'competition_level': competitors,
+        'active_users': _metric(rng, n, 800, 2.2, 0.25),
+        'mrr': _metric(rng, n, 6000, 2.0, 0.4),
+        'burn_rate': _metric(rng, n, 20000, 1.2, 0.1),
+        'founders_count': _metric(rng, n, 2, 0.4, 0.0),
+        'has_technical_founder': technical,
+        'exit_strategy': pick(EXIT_STRATEGIES),
+    }
+
+
+def records_from_columns(columns: Dict[str, np.ndarray], start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+    keys = list(columns)
+    sliced = [columns[k][start:stop].tolist() for k in keys]
+    return [dict(zip(keys, row)) for row in zip(*sliced)]
+
+
+def steps_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The step1..step8 form payload that flattens back to ``record``."""
+    return {
+        'step1': {
+            'companyName': record.get('company_name'),
+            'legalStructure': record.get('legal_structure'),
+            'incorporationYear': record.get('incorporation_year'),
+            'country': record.get('country'),
+            'stage': record.get('stage'),
+            'previousFunding': record.get('funding_raised'),
+        },
+        'step2': {'coreProblem': "Synthetic problem", 'solution': "Synthetic solution"},
+        'step3': {'tam': record.get('tam_size'), 'competitors': record.get('competition_level')},
+        'step4': {'activeUsers': record.get('active_users'), 'monthlyRevenue': record.get('mrr')},
+        'step5': {'foundersCount': record.get('founders_count'), 'hasTechnicalFounder': record.get('has_technical_founder')},
+        'step6': {'burnRate': record.get('burn_rate')},
+        'step7': {'vision': "Synthetic vision"},
+        'step8': {'exitStrategy': record.get('exit_strategy')},
+    }
+
+
+def _chunks(n: int) -> Iterator[tuple]:
+    for start in range(0, n, CHUNK_ROWS):
+        yield start, min(start + CHUNK_ROWS, n)
+
+
+def _result(rows: int, seconds: float, **extra) -> Dict[str, Any]:
+    return {
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else None,
+        **extra,
+    }
+
+
+def bench_calculate(columns: Dict[str, np.ndarray], max_rows: int) -> Dict[str, Any]:
+    """Per-row ``StartupScoringEngine.calculate()`` over the first ``max_rows`` rows."""
+    rows = min(len(columns['mrr']), max_rows)
+    rules = get_rules()
+    errors = 0
+    elapsed = 0.0
+    for start, stop in _chunks(rows):
+        records = records_from_columns(columns, start, stop)
+        t0 = time.perf_counter()
+        for record in records:
+            try:
+                StartupScoringEngine(record, rules=rules).calculate()
+            except Exception:
+                errors += 1
+        elapsed += time.perf_counter() - t0
+    return _result(rows, elapsed, errors=errors)
+
+
+def bench_score_batch(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """The vectorized path on prebuilt columns."""
+    rows = len(columns['mrr'])
+    rules = get_rules()
+    t0 = time.perf_counter()
+    StartupScoringEngine.score_batch(columns, rules=rules)
+    return _result(rows, time.perf_counter() - t0)
+
+
+def bench_records_to_batch(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """The batch path from engine input dicts: ``columns_from_records`` + ``score_batch``, in chunks."""
+    rows = len(columns['mrr'])
+    rules = get_rules()
+    elapsed = 0.0
+    for start, stop in _chunks(rows):
+        records = records_from_columns(columns, start, stop)
+        t0 = time.perf_counter()
+        StartupScoringEngine.score_batch(StartupScoringEngine.columns_from_records(records), rules=rules)
+        elapsed += time.perf_counter() - t0
+    return _result(rows, elapsed)
+
+
+def bench_flatten_steps(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """The submit endpoint's step1..step8 flattening."""
+    rows = len(columns['mrr'])
+    elapsed = 0.0
+    for start, stop in _chunks(rows):
+        payloads = [steps_from_record(r) for r in records_from_columns(columns, start, stop)]
+        t0 = time.perf_counter()
+        for payload in payloads:
+            flatten_steps(payload)
+        elapsed += time.perf_counter() - t0
+    return _result(rows, elapsed)
+
+
+def run(sizes: Sequence[int] = DEFAULT_SIZES, seed: int = 0, calculate_max_rows: int = 100000,
+        log=None) -> Dict[str, Any]:
+    """
+    Run every benchmark at every population size.
+
+    Returns:
+        The report: environment info plus {size: {benchmark: result}}.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for n in sizes:
+        columns = synthetic_columns(n, seed)
+        results[str(n)] = {}
+        for name, fn in (
+            ('calculate', lambda: bench_calculate(columns, calculate_max_rows)),
+            ('score_batch', lambda: bench_score_batch(columns)),
+            ('records_to_batch', lambda: bench_records_to_batch(columns)),
+            ('flatten_steps', lambda: bench_flatten_steps(columns)),
+        ):
+            result = fn()
+            results[str(n)][name] = result
+            if log:
+                log(f"{n:>9} {name:<17} {result['rows']:>9} rows {result['seconds']:>9.3f}s {result['rows_per_sec'] or 0:>14,.0f} rows/sec")
+    return {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'rules': get_rules().fingerprint,
+        'seed': seed,
+        'results': results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], margin: float) -> List[Dict[str, Any]]:
+    """
+    Benchmarks whose throughput fell more than ``margin`` (a fraction) below the
+    baseline. Sizes or benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    for size, benches in (baseline.get('results') or {}).items():
+        current = (report.get('results') or {}).get(size) or {}
+        for name, base in benches.items():
+            now = current.get(name)
+            if not now or not base.get('rows_per_sec') or not now.get('rows_per_sec'):
+                continue
+            floor = base['rows_per_sec'] * (1 - margin)
+            if now['rows_per_sec'] < floor:
+                regressions.append({
+                    'size': size,
+                    'benchmark': name,
+                    'baseline_rows_per_sec': base['rows_per_sec'],
+                    'rows_per_sec': now['rows_per_sec'],
+                    'change': round(now['rows_per_sec'] / base['rows_per_sec'] - 1, 4),
+                })
+    return regressions
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def default_report_path(name: str) -> str:
+    """Where a benchmark writes its report when no --output is given (the temp dir, not the source tree)."""
+    return os.path.join(tempfile.gettempdir(), f"{name}.json")
+
+
+def write_json(path: str, data: Dict[str, Any]):
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, indent=2)
+        fh.write('\n')
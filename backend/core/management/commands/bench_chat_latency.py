@@ -0,0 +1,100 @@
+import os
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from core.benchmarks import chat_latency
+from core.benchmarks.fake_openai import FakeOpenAIServer
+from core.benchmarks.scoring import default_report_path, write_json
+from core.models.chat import ChatSession
+from core.services import llm_providers
+from core.services.llm_gateway import get_gateway, reset_gateway
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the investor chat endpoints with concurrent sessions against the bundled fake "
+        "OpenAI server and reports p50/p95/p99 time to first token, total latency and throughput"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=8, help="Concurrent chat sessions")
+        parser.add_argument("--turns", type=int, default=5, help="Questions per session")
+        parser.add_argument("--endpoint", choices=("both",) + chat_latency.ENDPOINTS, default="both")
+        parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Fake server streaming rate")
+        parser.add_argument("--first-token-delay", type=float, default=0.2, help="Fake server seconds before the first token")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake server requests that fail")
+        parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+        parser.add_argument("--drop-rate", type=float, default=0.0, help="Share of fake streams cut after their first token")
+        parser.add_argument("--seed", type=int, default=None, help="Seed for repeatable fault injection")
+        parser.add_argument("--real-providers", action="store_true", help="Use the configured providers instead of the fake server (not offline)")
+        parser.add_argument("--user", default="chat-bench@matchpoint.local", help="Investor account the sessions run as (created if missing)")
+        parser.add_argument("--keep-sessions", action="store_true", help="Keep the benchmark's chat sessions afterwards")
+        parser.add_argument("--output", default=None, help="JSON report path (default: bench_chat_latency.json in the temp dir)")
+
+    def handle(self, *args, **options):
+        if options["sessions"] <= 0 or options["turns"] <= 0:
+            raise CommandError("--sessions and --turns must be positive")
+        if not options["real_providers"] and llm_providers.OpenAI is None:
+            raise CommandError("The fake server is reached through the OpenAI client: install the openai package")
+        endpoints = chat_latency.ENDPOINTS if options["endpoint"] == "both" else (options["endpoint"],)
+
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(
+            email=options["user"], defaults={"username": options["user"], "is_investor": True, "is_founder": False},
+        )
+        if not (user.is_investor or user.is_staff):
+            raise CommandError(f"{options['user']} is not an investor account")
+        existing = set(ChatSession.objects.filter(investor=user).values_list("id", flat=True))
+
+        server = None
+        with ExitStack() as stack:
+            overrides = {"INVESTOR_CHAT_THROTTLE_RATE": None}
+            if not options["real_providers"]:
+                server = stack.enter_context(FakeOpenAIServer(
+                    tokens_per_second=options["tokens_per_second"],
+                    first_token_delay=options["first_token_delay"],
+                    error_rate=options["error_rate"],
+                    error_status=options["error_status"],
+                    drop_rate=options["drop_rate"],
+                    seed=options["seed"],
+                ))
+                overrides.update(OPENAI_API_KEY="fake-key", OPENAI_BASE_URL=server.url, GEMINI_API_KEY="")
+            stack.enter_context(override_settings(**overrides))
+            # Providers and gateway are process-wide: rebuild them on the overridden settings, and back after
+            stack.callback(self._reset_providers)
+            self._reset_providers()
+            if not get_gateway().available:
+                raise CommandError("No LLM provider is configured")
+            report = chat_latency.run(user, sessions=options["sessions"], turns=options["turns"], endpoints=endpoints)
+
+        if server is not None:
+            report["fake_server"] = {
+                "tokens_per_second": options["tokens_per_second"],
+                "first_token_delay": options["first_token_delay"],
+                "error_rate": options["error_rate"],
+                "drop_rate": options["drop_rate"],
+                **server.stats(),
+            }
+        if not options["keep_sessions"]:
+            ChatSession.objects.filter(investor=user).exclude(id__in=existing).delete()
+
+        report_path = options["output"] or default_report_path("bench_chat_latency")
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        write_json(report_path, report)
+        for endpoint, result in report["endpoints"].items():
+            ttft, total = result["ttft"] or {}, result["total"] or {}
+            self.stdout.write(
+                f"{endpoint:<6} {result['ok']}/{result['requests']} ok  "
+                f"ttft p50 {ttft.get('p50_ms')} p95 {ttft.get('p95_ms')} p99 {ttft.get('p99_ms')} ms  "
+                f"total p50 {total.get('p50_ms')} p95 {total.get('p95_ms')} p99 {total.get('p99_ms')} ms  "
+                f"{result['throughput_rps']} req/s" + (f"  failures {result['failures']}" if result["failures"] else "")
+            )
+        self.stdout.write(f"Report written to {report_path}")
+
+    @staticmethod
+    def _reset_providers():
+        llm_providers.get_providers().reset()
+        reset_gateway()
@@ -0,0 +1,38 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import chat_queries
+from core.benchmarks.scoring import default_report_path, write_json
+from core.services.query_parser import parse_query
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the chat query parser against the legacy keyword scans over a corpus of question shapes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000, help="Passes over the corpus")
+        parser.add_argument("--output", default=None, help="JSON report path (default: bench_chat_queries.json in the temp dir)")
+
+    def handle(self, *args, **options):
+        if options["iterations"] <= 0:
+            raise CommandError("--iterations must be positive")
+        mismatches = []
+        for question in chat_queries.CORPUS:
+            legacy = chat_queries.legacy_parse(question)
+            parsed = parse_query(question)._asdict()
+            if any(parsed[k] != v for k, v in legacy.items()):
+                mismatches.append(question)
+        report = chat_queries.run(iterations=options["iterations"])
+        report["mismatches"] = mismatches
+
+        report_path = options["output"] or default_report_path("bench_chat_queries")
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        write_json(report_path, report)
+        self.stdout.write(
+            f"legacy {report['legacy_us_per_question']:.2f}us  parser {report['parser_us_per_question']:.2f}us  "
+            f"cached {report['parser_cached_us_per_question']:.2f}us per question ({report['speedup']}x)"
+        )
+        self.stdout.write(f"Report written to {report_path}")
+        if mismatches:
+            raise CommandError(f"Parser disagrees with the legacy scans on {len(mismatches)} question(s)")
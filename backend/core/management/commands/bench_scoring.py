@@ -0,0 +1,61 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import scoring
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(scoring.__file__), "scoring_baseline.json")
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the scoring engine on synthetic populations and fails on throughput regressions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default=",".join(str(n) for n in scoring.DEFAULT_SIZES), help="Comma-separated population sizes")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic population")
+        parser.add_argument("--calculate-max-rows", type=int, default=100000, help="Rows timed through per-row calculate() at each size")
+        parser.add_argument("--output", default=None, help="JSON report path (default: bench_scoring.json in the temp dir)")
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Stored baseline report to compare against")
+        parser.add_argument("--margin", type=float, default=float(getattr(settings, "BENCHMARK_REGRESSION_MARGIN", 0.25)),
+                            help="Allowed throughput drop vs. the baseline, as a fraction")
+        parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline instead of comparing")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+        if not sizes or min(sizes) <= 0:
+            raise CommandError("--sizes must be positive")
+        if not 0 <= options["margin"] < 1:
+            raise CommandError("--margin must be in [0, 1)")
+
+        report = scoring.run(sizes, seed=options["seed"], calculate_max_rows=options["calculate_max_rows"], log=self.stdout.write)
+
+        if options["update_baseline"]:
+            scoring.write_json(options["baseline"], report)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        regressions = []
+        if os.path.exists(options["baseline"]):
+            regressions = scoring.compare(report, scoring.load_json(options["baseline"]), options["margin"])
+        else:
+            self.stdout.write(self.style.WARNING(f"No baseline at {options['baseline']}; skipping regression check"))
+        report["margin"] = options["margin"]
+        report["regressions"] = regressions
+
+        report_path = options["output"] or scoring.default_report_path("bench_scoring")
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        scoring.write_json(report_path, report)
+        self.stdout.write(f"Report written to {report_path}")
+
+        if regressions:
+            for r in regressions:
+                self.stdout.write(self.style.ERROR(
+                    f"{r['benchmark']} @ {r['size']}: {r['rows_per_sec']:,.0f} rows/sec vs baseline "
+                    f"{r['baseline_rows_per_sec']:,.0f} ({r['change']:+.1%})"
+                ))
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed by more than {options['margin']:.0%}")
+        self.stdout.write(self.style.SUCCESS("No throughput regressions"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.fake_openai import FakeOpenAIServer
+
+
+class Command(BaseCommand):
+    help = "Runs a local server speaking the OpenAI chat-completions protocol (set OPENAI_BASE_URL to its URL) for offline load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Streaming rate after the first token")
+        parser.add_argument("--first-token-delay", type=float, default=0.2, help="Seconds before the first token")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail with --error-status")
+        parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures (e.g. 429, 500, 503)")
+        parser.add_argument("--drop-rate", type=float, default=0.0, help="Share of streams cut after their first token")
+        parser.add_argument("--seed", type=int, default=None, help="Seed for repeatable fault injection")
+
+    def handle(self, *args, **options):
+        for key in ("error_rate", "drop_rate"):
+            if not 0.0 <= options[key] <= 1.0:
+                raise CommandError(f"--{key.replace('_', '-')} must be between 0 and 1")
+        server = FakeOpenAIServer(
+            options["host"], options["port"],
+            tokens_per_second=options["tokens_per_second"],
+            first_token_delay=options["first_token_delay"],
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            drop_rate=options["drop_rate"],
+            seed=options["seed"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Fake OpenAI server on {server.url} (OPENAI_BASE_URL); Ctrl-C to stop"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Served {server.stats()}")
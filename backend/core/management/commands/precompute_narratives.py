@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models.evaluation import StartupEvaluation
+from core.services.narrative_service import write_narrative
+
+
+class Command(BaseCommand):
+    help = "Writes the investor narratives of evaluations still PENDING (e.g. queued before a restart, or submitted before narratives were stored)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retry-failed", action="store_true", help="Also rewrite narratives the model failed to write")
+        parser.add_argument("--limit", type=int, default=None, help="Maximum number of evaluations to process")
+
+    def handle(self, *args, **options):
+        statuses = [StartupEvaluation.NarrativeStatus.PENDING]
+        if options["retry_failed"]:
+            statuses.append(StartupEvaluation.NarrativeStatus.FAILED)
+        ids = StartupEvaluation.objects.filter(narrative_status__in=statuses).order_by("-created_at").values_list("id", flat=True)
+        if options["limit"] is not None:
+            ids = ids[:options["limit"]]
+
+        started = time.monotonic()
+        counts = {StartupEvaluation.NarrativeStatus.READY: 0, StartupEvaluation.NarrativeStatus.FAILED: 0}
+        for evaluation_id in list(ids):
+            status = write_narrative(evaluation_id)
+            if status in counts:
+                counts[status] += 1
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {counts[StartupEvaluation.NarrativeStatus.READY]} narratives "
+            f"({counts[StartupEvaluation.NarrativeStatus.FAILED]} fell back to platform records) in {elapsed:.2f}s"
+        ))
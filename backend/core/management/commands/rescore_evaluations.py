@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models.evaluation import StartupEvaluation
+from core.repositories.evaluation_repository import EvaluationRepository
+from core.services.engine_input import has_steps, flatten_steps
+from core.services.scoring_engine import StartupScoringEngine
+from core.services.scoring_rules import CompiledRules, get_rules
+
+_worker_rules: Optional[CompiledRules] = None
+
+
+def _init_worker(rule_source: Dict[str, Any]):
+    """Process-pool initializer: make sure Django is set up and pin the rule table."""
+    global _worker_rules
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    _worker_rules = CompiledRules(rule_source)
+
+
+# (total_score, rating, section_scores, section_details)
+ScoredRow = Tuple[int, str, Dict[str, Dict[str, int]], Dict[str, Dict[str, Any]]]
+
+
+def _score_chunk(engine_inputs: List[Dict[str, Any]], rules: Optional[CompiledRules] = None) -> List[Optional[ScoredRow]]:
+    """Score one chunk into ScoredRows; rows the engine rejects come back as None."""
+    rules = rules or _worker_rules
+    try:
+        out = StartupScoringEngine.score_batch(
+            StartupScoringEngine.columns_from_records(engine_inputs), include_details=True, rules=rules
+        )
+    except Exception:
+        results: List[Optional[ScoredRow]] = []
+        for data in engine_inputs:
+            try:
+                engine = StartupScoringEngine(data, rules=rules)
+                res = engine.calculate()
+                details = {
+                    k: {kind: section[kind] for kind in ('strengths', 'weaknesses', 'risk_flags')}
+                    for k, section in engine.calculate_sections().items()
+                }
+                results.append((res['total_score'], res['rating'], res['section_scores'], details))
+            except Exception:
+                results.append(None)
+        return results
+    sections = {k: v.tolist() for k, v in out['section_scores'].items()}
+    messages = out['section_messages']
+    results = []
+    for i, (total, rating) in enumerate(zip(out['total_score'].tolist(), out['rating'].tolist())):
+        # calculate_incremental()'s layout without the input fingerprints (hashing them costs more than the
+        # scoring): the next form edit rescores every section once instead of reusing them
+        details = {
+            k: {kind: messages[k][kind][i] for kind in ('strengths', 'weaknesses', 'risk_flags')}
+            for k in StartupScoringEngine.SECTION_MAX
+        }
+        scores = {k: {'score': sections[k][i], 'outOf': out_of} for k, out_of in StartupScoringEngine.SECTION_MAX.items()}
+        results.append((total, rating, scores, details))
+    return results
+
+
+class Command(BaseCommand):
+    help = "Recomputes total_score / rating / section_scores / section_details for stored evaluations with the active scoring rules"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per streamed chunk / scoring task")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes (<=1 scores in-process)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk UPDATE")
+        parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: rescore_evaluations.checkpoint.json in the temp dir)")
+        parser.add_argument("--resume", action="store_true", help="Continue after the last checkpointed evaluation")
+        parser.add_argument("--dry-run", action="store_true", help="Score without writing results")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size must be positive")
+        workers = options["workers"]
+        dry_run = options["dry_run"]
+        checkpoint_path = options["checkpoint"] or os.path.join(tempfile.gettempdir(), "rescore_evaluations.checkpoint.json")
+
+        state = {"last_id": None, "processed": 0, "updated": 0, "skipped": 0}
+        if options["resume"]:
+            try:
+                with open(checkpoint_path, "r", encoding="utf-8") as fh:
+                    state.update(json.load(fh))
+                self.stdout.write(f"Resuming after {state['last_id']} ({state['processed']} rows already processed)")
+            except FileNotFoundError:
+                self.stdout.write(self.style.WARNING(f"No checkpoint at {checkpoint_path}; starting from the beginning"))
+
+        rules = get_rules()
+        qs = StartupEvaluation.objects.only(
+            "id", "form_data", "total_score", "rating", "section_scores", "section_details"
+        ).order_by("id")
+        if state["last_id"]:
+            qs = qs.filter(id__gt=state["last_id"])
+
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rules.source,))
+
+        started = time.monotonic()
+        run_processed = 0
+        pending: deque = deque()
+
+        def submit(rows: List[StartupEvaluation], inputs: List[Dict[str, Any]]):
+            if pool is not None:
+                pending.append((rows, pool.submit(_score_chunk, inputs)))
+            else:
+                pending.append((rows, _score_chunk(inputs, rules)))
+
+        def drain_one():
+            nonlocal run_processed
+            rows, result = pending.popleft()
+            scores = result.result() if pool is not None else result
+            changed = []
+            for evaluation, scored in zip(rows, scores):
+                if scored is None:
+                    state["skipped"] += 1
+                    continue
+                total, rating, section_scores, section_details = scored
+                if (evaluation.total_score != total or evaluation.rating != rating
+                        or evaluation.section_scores != section_scores
+                        or evaluation.section_details != section_details):
+                    evaluation.total_score = total
+                    evaluation.rating = rating
+                    evaluation.section_scores = section_scores
+                    evaluation.section_details = section_details
+                    changed.append(evaluation)
+            if not dry_run:
+                EvaluationRepository.bulk_update_scores(changed, batch_size=options["batch_size"])
+            state["updated"] += len(changed)
+            state["processed"] += len(rows)
+            state["last_id"] = str(rows[-1].id)
+            run_processed += len(rows)
+            if not dry_run:
+                self._write_checkpoint(checkpoint_path, state)
+            elapsed = time.monotonic() - started
+            rate = run_processed / elapsed if elapsed > 0 else 0.0
+            self.stdout.write(f"processed {state['processed']} updated {state['updated']} skipped {state['skipped']} ({rate:,.0f} rows/sec)")
+
+        try:
+            rows: List[StartupEvaluation] = []
+            inputs: List[Dict[str, Any]] = []
+            for evaluation in qs.iterator(chunk_size=chunk_size):
+                if has_steps(evaluation.form_data):
+                    rows.append(evaluation)
+                    inputs.append(flatten_steps(evaluation.form_data)[1])
+                else:
+                    # Legacy flat submissions did not store the engine input
+                    state["skipped"] += 1
+                if len(rows) >= chunk_size:
+                    submit(rows, inputs)
+                    rows, inputs = [], []
+                    while len(pending) > max(workers, 1) * 2:
+                        drain_one()
+            if rows:
+                submit(rows, inputs)
+            while pending:
+                drain_one()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        rate = run_processed / elapsed if elapsed > 0 else 0.0
+        if not dry_run and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        verb = "Would update" if dry_run else "Updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {state['updated']} of {state['processed']} evaluations "
+            f"(skipped {state['skipped']}) in {elapsed:.2f}s, {rate:,.0f} rows/sec, rules {rules.fingerprint}"
+        ))
+
+    @staticmethod
+    def _write_checkpoint(path: str, state: Dict[str, Any]):
+        tmp = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh)
+        os.replace(tmp, path)
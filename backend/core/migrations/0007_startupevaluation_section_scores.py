@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_chatsession_chatmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startupevaluation',
+            name='section_scores',
+            field=models.JSONField(blank=True, null=True, verbose_name='Section Scores'),
+        ),
+        migrations.AddField(
+            model_name='startupevaluation',
+            name='section_details',
+            field=models.JSONField(blank=True, null=True, verbose_name='Section Details'),
+        ),
+    ]
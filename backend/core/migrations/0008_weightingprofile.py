@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_startupevaluation_section_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeightingProfile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('weights', models.JSONField(default=dict)),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('investor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weighting_profiles', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-updated_at',),
+                'constraints': [models.UniqueConstraint(fields=('investor', 'name'), name='unique_weighting_profile_name')],
+            },
+        ),
+    ]
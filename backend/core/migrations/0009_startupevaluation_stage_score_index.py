@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_weightingprofile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='startupevaluation',
+            index=models.Index(fields=['stage', '-total_score'], name='core_startu_stage_a9bf18_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_startupevaluation_stage_score_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startupevaluation',
+            name='narrative',
+            field=models.TextField(blank=True, default='', verbose_name='Narrative'),
+        ),
+        migrations.AddField(
+            model_name='startupevaluation',
+            name='narrative_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('READY', 'Ready'), ('FAILED', 'Failed')], default='PENDING', max_length=10, verbose_name='Narrative Status'),
+        ),
+        migrations.AddField(
+            model_name='startupevaluation',
+            name='narrative_generated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Narrative Generated At'),
+        ),
+    ]
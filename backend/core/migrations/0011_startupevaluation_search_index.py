@@ -0,0 +1,111 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Free-text form answers searched next to company_name (as in core.services.text_index.TEXT_FIELDS
+# when this migration was written)
+SEARCH_FIELDS = (
+    ('step2', 'coreProblem'), ('step2', 'solution'), ('step2', 'whyNow'), ('step2', 'uniqueAdvantage'),
+    ('step3', 'targetCustomer'), ('step3', 'competitors'),
+    ('step5', 'founderBackground'), ('step5', 'domainExperience'), ('step5', 'keyHires'),
+    ('step6', 'fundUse'),
+    ('step7', 'vision'),
+)
+
+TABLE = 'core_startupevaluation'
+FTS_TABLE = 'core_startupevaluation_fts'
+FTS_IDS_TABLE = 'core_startupevaluation_fts_ids'
+
+
+def _sqlite_text(row: str) -> str:
+    return " || ' ' || ".join(
+        f"COALESCE(json_extract({row}.form_data, '$.{step}.{key}'), '')" for step, key in SEARCH_FIELDS
+    )
+
+
+def _mysql_text() -> str:
+    parts = ", ".join(f"JSON_UNQUOTE(JSON_EXTRACT(form_data, '$.{step}.{key}'))" for step, key in SEARCH_FIELDS)
+    return f"CONCAT_WS(' ', {parts})"
+
+
+def create_sqlite_triggers(schema_editor):
+    """
+    Keep the FTS5 table in sync with the evaluation table. Rows are keyed on
+    the evaluation id; FTS_IDS_TABLE maps each id to its FTS5 rowid so a
+    trigger deletes by rowid instead of scanning the UNINDEXED eid column.
+    """
+    docid = f"(SELECT docid FROM {FTS_IDS_TABLE} WHERE eid = new.id)"
+    insert = (
+        f"INSERT INTO {FTS_IDS_TABLE} (eid) VALUES (new.id); "
+        f"INSERT INTO {FTS_TABLE} (rowid, eid, company_name, search_text) "
+        f"VALUES ({docid}, new.id, new.company_name, {_sqlite_text('new')});"
+    )
+    delete = (
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = (SELECT docid FROM {FTS_IDS_TABLE} WHERE eid = old.id); "
+        f"DELETE FROM {FTS_IDS_TABLE} WHERE eid = old.id;"
+    )
+    schema_editor.execute(f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN {insert} END")
+    schema_editor.execute(f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN {delete} END")
+    schema_editor.execute(
+        f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF company_name, form_data ON {TABLE} BEGIN {delete} {insert} END"
+    )
+
+
+def create_search_index(apps, schema_editor):
+    """
+    MySQL: a stored generated column of the form text, with FULLTEXT indexes
+    on (company_name, search_text) and company_name. SQLite: an FTS5 table
+    keyed on the evaluation id (an UNINDEXED eid column) and kept in sync by
+    triggers. Other databases (and SQLite builds without FTS5) use the
+    in-process index.
+
+    A later migration that makes SQLite rebuild the evaluation table drops
+    the triggers with it, so it must call create_sqlite_triggers() again;
+    the indexed rows themselves stay valid.
+    """
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(
+            f"ALTER TABLE {TABLE} ADD COLUMN search_text LONGTEXT GENERATED ALWAYS AS ({_mysql_text()}) STORED"
+        )
+        schema_editor.execute(f"ALTER TABLE {TABLE} ADD FULLTEXT INDEX core_startu_search_ft (company_name, search_text)")
+        schema_editor.execute(f"ALTER TABLE {TABLE} ADD FULLTEXT INDEX core_startu_name_ft (company_name)")
+    elif connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(eid UNINDEXED, "
+                f"company_name, search_text, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except OperationalError:
+            return
+        schema_editor.execute(f"CREATE TABLE {FTS_IDS_TABLE} (docid INTEGER PRIMARY KEY, eid char(32) NOT NULL UNIQUE)")
+        create_sqlite_triggers(schema_editor)
+        schema_editor.execute(f"INSERT INTO {FTS_IDS_TABLE} (eid) SELECT id FROM {TABLE}")
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, eid, company_name, search_text) "
+            f"SELECT ids.docid, {TABLE}.id, {TABLE}.company_name, {_sqlite_text(TABLE)} "
+            f"FROM {TABLE} JOIN {FTS_IDS_TABLE} ids ON ids.eid = {TABLE}.id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(f"ALTER TABLE {TABLE} DROP INDEX core_startu_name_ft")
+        schema_editor.execute(f"ALTER TABLE {TABLE} DROP INDEX core_startu_search_ft")
+        schema_editor.execute(f"ALTER TABLE {TABLE} DROP COLUMN search_text")
+    elif connection.vendor == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_IDS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_startupevaluation_narrative'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
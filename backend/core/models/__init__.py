@@ -1,5 +1,6 @@
 from .user import User
 from .evaluation import StartupEvaluation
 from .leads import InvestorInterestLead, AcceleratorInterestLead
+from .investor_profile import WeightingProfile
 
-__all__ = ['User', 'StartupEvaluation', 'InvestorInterestLead', 'AcceleratorInterestLead']
+__all__ = ['User', 'StartupEvaluation', 'InvestorInterestLead', 'AcceleratorInterestLead', 'WeightingProfile']
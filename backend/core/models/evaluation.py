@@ -22,6 +22,11 @@ class StartupEvaluation(models.Model):
         STRONG = 'STRONG', _('Strong')
         HIGH_POTENTIAL = 'HIGH_POTENTIAL', _('High Potential')
 
+    class NarrativeStatus(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        READY = 'READY', _('Ready')
+        FAILED = 'FAILED', _('Failed')
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
@@ -73,6 +78,23 @@ class StartupEvaluation(models.Model):
         db_index=True
     )
     
+    # Per-section breakdown ({section: {score, outOf}}) and, per section, the
+    # input fingerprint plus strengths / weaknesses / risk flags it produced.
+    # Used to rescore only the sections whose inputs changed.
+    section_scores = models.JSONField(_('Section Scores'), null=True, blank=True)
+    section_details = models.JSONField(_('Section Details'), null=True, blank=True)
+
+    # Investor narrative, generated in the background after submission
+    # (core.services.narrative_service) and served from here once READY.
+    narrative = models.TextField(_('Narrative'), blank=True, default='')
+    narrative_status = models.CharField(
+        _('Narrative Status'),
+        max_length=10,
+        choices=NarrativeStatus.choices,
+        default=NarrativeStatus.PENDING
+    )
+    narrative_generated_at = models.DateTimeField(_('Narrative Generated At'), null=True, blank=True)
+    
     created_at = models.DateTimeField(_('Created At'), auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
 
@@ -83,6 +105,7 @@ class StartupEvaluation(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['rating', 'total_score']),
+            models.Index(fields=['stage', '-total_score']),
         ]
 
     def __str__(self):
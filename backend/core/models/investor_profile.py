@@ -0,0 +1,23 @@
+from django.db import models
+from django.conf import settings
+
+
+class WeightingProfile(models.Model):
+    """Investor-defined weights over the scoring sections, used to re-rank startups."""
+
+    investor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="weighting_profiles")
+    name = models.CharField(max_length=120)
+    # {section: weight}; sections left out keep weight 1.0
+    weights = models.JSONField(default=dict)
+    is_default = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-updated_at",)
+        constraints = [
+            models.UniqueConstraint(fields=["investor", "name"], name="unique_weighting_profile_name"),
+        ]
+
+    def __str__(self) -> str:
+        return f"WeightingProfile<{self.id}> {self.name} investor={self.investor_id}"
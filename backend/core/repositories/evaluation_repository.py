@@ -1,6 +1,8 @@
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 from uuid import UUID
 from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
 from core.models.evaluation import StartupEvaluation
 from django.contrib.auth import get_user_model
@@ -58,6 +60,67 @@ class EvaluationRepository:
         # Fetch the fresh instance
         return StartupEvaluation.objects.get(id=evaluation_id)
 
+    @staticmethod
+    def bulk_update_scores(evaluations: List[StartupEvaluation], batch_size: int = 1000) -> int:
+        """
+        Writes total_score / rating / section_scores / section_details for many evaluations
+        in chunked bulk UPDATEs.
+        
+        Args:
+            evaluations: Instances carrying the new total_score, rating, section_scores
+                and section_details.
+            batch_size: Number of rows per UPDATE statement.
+            
+        Returns:
+            Number of rows updated.
+        """
+        if not evaluations:
+            return 0
+        now = timezone.now()
+        for evaluation in evaluations:
+            evaluation.updated_at = now
+        return StartupEvaluation.objects.bulk_update(
+            evaluations, ['total_score', 'rating', 'section_scores', 'section_details', 'updated_at'], batch_size=batch_size
+        )
+
+    @staticmethod
+    def get_evaluation_for_update(evaluation_id: UUID, user: User) -> Optional[StartupEvaluation]:
+        """
+        Retrieves an evaluation with a row lock for a read-modify-write update.
+        Must be called inside a transaction.
+        
+        Args:
+            evaluation_id: UUID of the evaluation.
+            user: The user editing it (owner, or staff for any evaluation).
+            
+        Returns:
+            Locked StartupEvaluation instance or None if not found / not allowed.
+        """
+        qs = StartupEvaluation.objects.select_for_update()
+        if not getattr(user, "is_staff", False):
+            qs = qs.filter(user=user)
+        try:
+            return qs.get(id=evaluation_id)
+        except StartupEvaluation.DoesNotExist:
+            return None
+
+    @staticmethod
+    def save_form_update(evaluation: StartupEvaluation, **fields) -> StartupEvaluation:
+        """
+        Applies form data, model fields and scoring results to a (locked) evaluation.
+        
+        Args:
+            evaluation: The instance returned by get_evaluation_for_update.
+            **fields: Model fields to set.
+            
+        Returns:
+            Updated StartupEvaluation instance.
+        """
+        for name, value in fields.items():
+            setattr(evaluation, name, value)
+        evaluation.save(update_fields=[*fields.keys(), 'updated_at'])
+        return evaluation
+
     @staticmethod
     def get_user_evaluations(user: User) -> List[StartupEvaluation]:
         """
@@ -97,3 +160,84 @@ class EvaluationRepository:
             return qs.get(id=evaluation_id, user=user)
         except StartupEvaluation.DoesNotExist:
             return None
+
+    @staticmethod
+    def get_narrative(evaluation_id: UUID) -> Optional[Tuple[str, str]]:
+        """
+        Reads the stored narrative of an evaluation, without loading the row.
+        
+        Args:
+            evaluation_id: UUID of the evaluation.
+            
+        Returns:
+            (narrative, narrative_status), or None if the evaluation does not exist.
+        """
+        return (
+            StartupEvaluation.objects.filter(id=evaluation_id)
+            .values_list('narrative', 'narrative_status')
+            .first()
+        )
+
+    @staticmethod
+    def save_narrative(evaluation_id: UUID, narrative: str, narrative_status: str) -> bool:
+        """
+        Stores a generated narrative. A queryset update, so saving it does not
+        touch updated_at or re-run the post_save index signals.
+        
+        Args:
+            evaluation_id: UUID of the evaluation.
+            narrative: Narrative text.
+            narrative_status: StartupEvaluation.NarrativeStatus value.
+            
+        Returns:
+            True if the evaluation still exists.
+        """
+        return bool(StartupEvaluation.objects.filter(id=evaluation_id).update(
+            narrative=narrative,
+            narrative_status=narrative_status,
+            narrative_generated_at=timezone.now(),
+        ))
+
+    @staticmethod
+    def iter_by_score(queryset: QuerySet, fields: Sequence[str], chunk_size: int = 200,
+                      limit: Optional[int] = None) -> Iterator[List[Tuple[Any, ...]]]:
+        """
+        Walks a queryset from the highest total_score down, in chunks fetched
+        with keyset pagination on (total_score, created_at, id). Every chunk is
+        its own short query that resumes after the last row seen, so memory
+        stays flat on any backend (MySQL buffers whole result sets, which rules
+        out a single streaming cursor) and deep chunks cost no OFFSET scans.
+        
+        Args:
+            queryset: Filtered StartupEvaluation queryset; its ordering is replaced.
+            fields: Columns to read for each row.
+            chunk_size: Rows per query.
+            limit: Maximum number of rows overall.
+            
+        Yields:
+            Lists of value tuples, one per row, in ``fields`` order.
+        """
+        keys = ('total_score', 'created_at', 'id')
+        qs = queryset.order_by('-total_score', '-created_at', '-id').values_list(*fields, *keys)
+        width = len(fields)
+        remaining = limit
+        last = None
+        while remaining is None or remaining > 0:
+            page = qs
+            if last is not None:
+                score, created_at, pk = last
+                page = page.filter(
+                    Q(total_score__lt=score)
+                    | Q(total_score=score, created_at__lt=created_at)
+                    | Q(total_score=score, created_at=created_at, id__lt=pk)
+                )
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = list(page[:size])
+            if not chunk:
+                return
+            yield [row[:width] for row in chunk]
+            if len(chunk) < size:
+                return
+            last = chunk[-1][width:]
+            if remaining is not None:
+                remaining -= len(chunk)
@@ -84,11 +84,14 @@ class EvaluationDetailSerializer(serializers.ModelSerializer):
             'total_score',
             'rating',
             'formatted_rating',
+            'section_scores',
+            'narrative',
+            'narrative_status',
             'created_at',
             'updated_at',
             'form_data'
         ]
-        read_only_fields = ['total_score', 'rating', 'created_at', 'updated_at']
+        read_only_fields = ['total_score', 'rating', 'section_scores', 'narrative', 'narrative_status', 'created_at', 'updated_at']
 
     def get_formatted_rating(self, obj):
         """
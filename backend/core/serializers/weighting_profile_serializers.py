@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from core.models.investor_profile import WeightingProfile
+from core.services.weighted_ranking import normalize_weights
+
+
+class WeightingProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WeightingProfile
+        fields = ["id", "name", "weights", "is_default", "created_at", "updated_at"]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+    def validate_weights(self, value):
+        try:
+            return normalize_weights(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate_name(self, value):
+        investor = self.context["request"].user
+        qs = WeightingProfile.objects.filter(investor=investor, name=value)
+        if self.instance is not None:
+            qs = qs.exclude(pk=self.instance.pk)
+        if qs.exists():
+            raise serializers.ValidationError("A profile with this name already exists.")
+        return value
@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'answers'
+_HITS = 'answer-cache:hits'
+_MISSES = 'answer-cache:misses'
+_TRAILING = re.compile(r"[\s?.!]+$")
+_SPACES = re.compile(r"\s+")
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def normalize_question(question: str) -> str:
+    """Case, spacing and trailing punctuation do not change the answer."""
+    return _TRAILING.sub("", _SPACES.sub(" ", (question or "").strip().lower()))
+
+
+def context_fingerprint(ctx: Dict[str, Any], model: str, prompt: str = "") -> str:
+    """
+    Fingerprint of what the model is shown: the model name, the system prompt
+    and every company row in the context (ids and values, so a changed
+    evaluation changes the fingerprint).
+    """
+    rows = {key: ctx.get(key) for key in ("companies", "mentioned", "relevant") if isinstance(ctx, dict) and ctx.get(key)}
+    payload = json.dumps([model, prompt, rows], sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def answer_key(question: str, ctx: Dict[str, Any], model: str, prompt: str = "") -> str:
+    digest = hashlib.sha1(normalize_question(question).encode('utf-8')).hexdigest()
+    return f"answer:{digest}:{context_fingerprint(ctx, model, prompt)}"
+
+
+def _count(name: str):
+    cache = _cache()
+    try:
+        cache.incr(name)
+    except ValueError:
+        # First count since the cache started (or since the counter was evicted)
+        cache.add(name, 0, timeout=None)
+        cache.incr(name)
+
+
+def get_answer(key: str) -> Optional[Dict[str, Any]]:
+    """The cached {"answer", "chunks", "provider"} for ``key``, counting the hit or miss."""
+    try:
+        entry = _cache().get(key)
+        _count(_HITS if entry is not None else _MISSES)
+    except Exception as e:
+        logger.error(f"[answer_cache] get failed: {e}")
+        return None
+    return entry
+
+
+def set_answer(key: str, answer: str, chunks: Optional[List[str]] = None, provider: str = ""):
+    """
+    Cache a model answer. ``chunks`` are the streamed deltas, kept so a hit
+    replays over SSE with the same token events as the original stream.
+    """
+    if not answer:
+        return
+    try:
+        _cache().set(key, {'answer': answer, 'chunks': list(chunks) if chunks else [answer], 'provider': provider})
+    except Exception as e:
+        logger.error(f"[answer_cache] set failed: {e}")
+
+
+def stats() -> Dict[str, Any]:
+    cache = _cache()
+    hits = cache.get(_HITS) or 0
+    misses = cache.get(_MISSES) or 0
+    conf = settings.CACHES.get(CACHE_ALIAS, {})
+    return {
+        'backend': conf.get('BACKEND'),
+        'ttl_seconds': conf.get('TIMEOUT'),
+        'max_entries': (conf.get('OPTIONS') or {}).get('MAX_ENTRIES'),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
+def clear():
+    _cache().clear()
@@ -0,0 +1,251 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import heapq
+
+NO_COMPANIES = "No companies found in platform records."
+NOT_AVAILABLE = "Information not available in platform records."
+# Rows a table answer shows; larger result sets are streamed (stream_table) rather than rendered at once
+TABLE_MAX_ROWS = 500
+
+# Positions in a normalized company row
+NAME, SCORE, STAGE, MRR, COUNTRY, RATING = range(6)
+Row = Tuple[Any, Any, Any, Any, Any, Any]
+
+
+def fmt_val(v: Any) -> str:
+    if v is None:
+        return "—"
+    return str(v)
+
+
+def extract_companies(ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The company records of a chat context ("companies", or the older "startups"/"results")."""
+    if isinstance(ctx, dict):
+        for key in ("companies", "startups", "results"):
+            if isinstance(ctx.get(key), list):
+                return ctx[key]
+    return []
+
+
+def _score(r: Dict[str, Any]) -> Any:
+    v = r.get("total_score")
+    return v if v is not None else r.get("score")
+
+
+def normalize(records: Sequence[Dict[str, Any]]) -> List[Row]:
+    """
+    One tuple per company record, read once: display name ("—" when
+    missing), score (total_score, else score), stage, mrr, country, rating.
+    """
+    return [
+        (
+            r.get("company_name") or r.get("name") or "—",
+            s if (s := r.get("total_score")) is not None else r.get("score"),
+            r.get("stage"), r.get("mrr"), r.get("country"), r.get("rating"),
+        )
+        for r in records
+    ]
+
+
+def _score_float(v: Any) -> float:
+    try:
+        return float(v)
+    except Exception:
+        return -1.0
+
+
+def _score_number(v: Any) -> Any:
+    return v if isinstance(v, (int, float)) else "—"
+
+
+class CompanyRows:
+    """
+    Company records of a chat answer and their row buffer. Records are
+    normalized once, on first use, and only the ones a layout shows:
+    ``unique``, ``ranked`` and ``head`` narrow the records first, so a top-3
+    answer over 10k companies normalizes three of them. Every layout renders
+    from ``rows``.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]], rows: Optional[List[Row]] = None):
+        self.records = records if isinstance(records, list) else list(records)
+        self._rows = rows
+
+    @classmethod
+    def from_context(cls, ctx: Dict[str, Any]) -> "CompanyRows":
+        return cls(extract_companies(ctx))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def rows(self) -> List[Row]:
+        if self._rows is None:
+            self._rows = normalize(self.records)
+        return self._rows
+
+    def _take(self, indices: Sequence[int]) -> "CompanyRows":
+        records = self.records
+        rows = self._rows
+        return CompanyRows([records[i] for i in indices], [rows[i] for i in indices] if rows is not None else None)
+
+    def head(self, n: int) -> "CompanyRows":
+        if n >= len(self.records):
+            return self
+        return CompanyRows(self.records[:n], self._rows[:n] if self._rows is not None else None)
+
+    def unique(self) -> "CompanyRows":
+        """Drop repeated companies (same id, or same name, stage and score when there is no id)."""
+        ids = [r.get("id") for r in self.records]
+        if all(ids) and len(set(ids)) == len(ids):
+            return self
+        seen = set()
+        keep: List[int] = []
+        for i, r in enumerate(self.records):
+            key = ids[i] or (r.get("company_name") or r.get("name"), r.get("stage"), r.get("score") or r.get("total_score"))
+            if key in seen:
+                continue
+            seen.add(key)
+            keep.append(i)
+        return self._take(keep)
+
+    def ranked(self, min_score: Any = None, limit: Optional[int] = None) -> "CompanyRows":
+        """
+        Rows by score, highest first (ties keep their order), at or above
+        ``min_score`` when it is a number; the first ``limit`` of them when given.
+        """
+        if self._rows is not None:
+            scores = [_score_float(row[SCORE]) for row in self._rows]
+        else:
+            scores = [_score_float(_score(r)) for r in self.records]
+        indices: Sequence[int] = range(len(scores))
+        if min_score is not None:
+            try:
+                threshold = float(min_score)
+                indices = [i for i in indices if scores[i] >= threshold]
+            except Exception:
+                pass
+        if limit is not None and limit < len(indices):
+            order = heapq.nlargest(limit, indices, key=scores.__getitem__)
+        else:
+            order = sorted(indices, key=scores.__getitem__, reverse=True)
+        return self._take(order)
+
+
+def _score_heading(min_score: Any) -> str:
+    title = "Top companies by score"
+    if min_score is not None:
+        try:
+            title += f" ≥ {int(min_score)}"
+        except Exception:
+            pass
+    return title
+
+
+def render_summary(rows: CompanyRows) -> str:
+    if not rows:
+        return NOT_AVAILABLE
+    lines = [f"- {r[NAME]}: score {_score_number(r[SCORE])}, stage {r[STAGE] or '—'}" for r in rows.head(5).rows]
+    return "Summary of visible startups:\n" + "\n".join(lines)
+
+
+def render_companies(rows: CompanyRows) -> str:
+    if not rows:
+        return NO_COMPANIES
+    lines = [f"- {r[NAME]} (score {_score_number(r[SCORE])}, stage {r[STAGE] or '—'})" for r in rows.rows]
+    return "Company list:\n" + "\n".join(lines)
+
+
+LIST_HEADER = ["Company List:"]
+TABLE_HEADER = ["Company Table:", "Name | Stage | Score | MRR | Country | Rating", "-|-|-|-|-|-"]
+
+
+def _list_lines(rows: Sequence[Row]) -> List[str]:
+    return [f"- {n}: stage {st or '—'}, score {'—' if sc is None else sc}" for n, sc, st, _, _, _ in rows]
+
+
+def _table_lines(rows: Sequence[Row]) -> List[str]:
+    return [
+        f"{n} | {'—' if st is None else st} | {'—' if sc is None else sc} | {'—' if m is None else m}"
+        f" | {'—' if c is None else c} | {'—' if ra is None else ra}"
+        for n, sc, st, m, c, ra in rows
+    ]
+
+
+def _stream(header: List[str], format_rows: Callable[[Sequence[Row]], List[str]],
+            chunks: Iterable[Sequence[Row]]) -> Iterator[List[str]]:
+    started = False
+    for rows in chunks:
+        if not rows:
+            continue
+        lines = format_rows(rows)
+        if not started:
+            started = True
+            lines = header + lines
+        yield lines
+    if not started:
+        yield [NO_COMPANIES]
+
+
+def stream_list(chunks: Iterable[Sequence[Row]]) -> Iterator[List[str]]:
+    """The list layout over chunks of rows, one list of lines per chunk, formatted as each chunk arrives."""
+    return _stream(LIST_HEADER, _list_lines, chunks)
+
+
+def stream_table(chunks: Iterable[Sequence[Row]]) -> Iterator[List[str]]:
+    """The table layout over chunks of (unique) rows, one list of lines per chunk."""
+    return _stream(TABLE_HEADER, _table_lines, chunks)
+
+
+def render_list(rows: CompanyRows) -> str:
+    if not rows:
+        return NO_COMPANIES
+    return "\n".join(LIST_HEADER + _list_lines(rows.rows))
+
+
+def render_table(rows: CompanyRows, max_rows: int = TABLE_MAX_ROWS) -> str:
+    """The table layout of the first ``max_rows`` unique companies, with a line counting the rest."""
+    if not rows:
+        return NO_COMPANIES
+    unique = rows.unique()
+    lines = TABLE_HEADER + _table_lines(unique.head(max_rows).rows)
+    hidden = len(unique) - max_rows
+    if hidden > 0:
+        lines.append(f"… {hidden} more companies not shown")
+    return "\n".join(lines)
+
+
+def render_top(rows: CompanyRows, top_n: int = 3, min_score: Optional[float] = None) -> str:
+    if not rows:
+        return NO_COMPANIES
+    top = rows.unique().ranked(min_score, limit=max(1, top_n))
+    lines = [f"- {r[NAME]} (score {_score_float(r[SCORE])}, stage {r[STAGE] or '—'})" for r in top.rows]
+    return _score_heading(min_score) + ":\n" + "\n".join(lines)
+
+
+def render_rank_table(rows: CompanyRows, top_n: int = 10, min_score: Optional[float] = None) -> str:
+    if not rows:
+        return NO_COMPANIES
+    top = rows.unique().ranked(min_score, limit=max(1, top_n))
+    lines = [
+        f"{i} | {n} | {_score_float(sc)} | {'—' if st is None else st} | {'—' if c is None else c} | {'—' if ra is None else ra}"
+        for i, (n, sc, st, m, c, ra) in enumerate(top.rows, start=1)
+    ]
+    return f"{_score_heading(min_score)}:\nRank | Company | Score | Stage | Country | Rating\n-|-|-|-|-|-\n" + "\n".join(lines)
+
+
+# Rows of the comparison matrix: (label, row position)
+COMPARE_FIELDS = (("Stage", STAGE), ("Score", SCORE), ("MRR", MRR), ("Country", COUNTRY), ("Rating", RATING))
+
+
+def render_compare(rows: CompanyRows, top_n: Optional[int] = 2) -> str:
+    """Comparison matrix of the ``top_n`` highest-scoring rows, or of every row in order when ``top_n`` is None."""
+    if not rows:
+        return NO_COMPANIES
+    if top_n is not None:
+        rows = rows.ranked(limit=max(1, top_n))
+    if len(rows) == 1:
+        return render_summary(rows)
+    lines = ["Metric | " + " | ".join(str(r[NAME]) for r in rows.rows), "-|" + "|".join(["-"] * len(rows))]
+    for label, pos in COMPARE_FIELDS:
+        lines.append(" | ".join([label, *(fmt_val(r[pos]) for r in rows.rows)]))
+    return "Comparison:\n" + "\n".join(lines)
@@ -0,0 +1,171 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import json
+import math
+import re
+import threading
+
+from django.conf import settings
+
+from core.services.query_parser import ChatQuery
+
+# Company columns in the order the encoded table shows them
+COLUMNS = ("name", "stage", "country", "score", "weighted_score", "rating",
+           "mrr", "active_users", "paying_customers", "burn_rate", "amount_raising")
+OVERVIEW_COLUMNS = ("name", "stage", "country", "score", "weighted_score", "rating")
+# Columns each intent needs; intents not listed (chat, company_profile) get every column
+INTENT_COLUMNS = {
+    "rank": OVERVIEW_COLUMNS,
+    "list": OVERVIEW_COLUMNS,
+    "summary": OVERVIEW_COLUMNS,
+    "table": OVERVIEW_COLUMNS,
+    "unsupported": OVERVIEW_COLUMNS,
+}
+# Extra columns a single-metric question keeps next to the company name
+METRIC_COLUMNS = {
+    "score": ("score", "weighted_score", "rating"),
+}
+MAX_CELL_CHARS = 80
+
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+
+class EncodedContext(NamedTuple):
+    """A context encoded for the prompt, with its size against the JSON encoding."""
+    text: str
+    columns: Tuple[str, ...]
+    rows: int
+    omitted: int
+    tokens: int
+    baseline_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.baseline_tokens - self.tokens
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.saved_tokens / self.baseline_tokens if self.baseline_tokens else 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate BPE token count: a token per 4 letters of a word, per 3
+    digits of a number and per punctuation mark. Close enough to the OpenAI
+    tokenizers to compare encodings and enforce a budget without one.
+    """
+    total = 0
+    for piece in _PIECES.findall(text or ""):
+        if piece[0].isdigit():
+            total += math.ceil(len(piece) / 3)
+        elif piece[0].isalpha():
+            total += math.ceil(len(piece) / 4)
+        else:
+            total += 1
+    return total
+
+
+def baseline_text(ctx: Dict[str, Any]) -> str:
+    """The context as it used to be sent: the whole dict as JSON."""
+    return json.dumps(ctx, default=str)
+
+
+def columns_for(query: Optional[ChatQuery]) -> Tuple[str, ...]:
+    if query is None:
+        return COLUMNS
+    if query.intent == "company_metric" and query.metric in COLUMNS:
+        return ("name",) + METRIC_COLUMNS.get(query.metric, (query.metric,))
+    return INTENT_COLUMNS.get(query.intent, COLUMNS)
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float):
+        return f"{round(value, 2):g}"
+    text = " ".join(str(value).split()).replace("|", "/")
+    return text[:MAX_CELL_CHARS]
+
+
+def _rows(ctx: Dict[str, Any]) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    """(section, company) pairs: the companies the question names first, then the ones matching its topic, then the ranked ones."""
+    seen = set()
+    for section in ("mentioned", "relevant", "companies"):
+        for company in ctx.get(section) or []:
+            if not isinstance(company, dict):
+                continue
+            key = company.get("id") or company.get("name")
+            if key in seen:
+                continue
+            seen.add(key)
+            yield section, company
+
+
+def encode_context(ctx: Dict[str, Any], query: Optional[ChatQuery] = None, *,
+                   budget_tokens: Optional[int] = None) -> EncodedContext:
+    """
+    Encode the chat context as one header line of column names followed by
+    pipe-separated rows, instead of repeating every key for every company.
+
+    Only the columns the question's intent needs are kept (and, of those,
+    only columns with a value in some row); ids, the investor id and the
+    echoed question are left out. Rows the question names come first, then
+    the ones matching its topic, then the ranked companies; rows past ``budget_tokens`` (default
+    CHAT_CONTEXT_TOKEN_BUDGET) are trimmed from the end and counted in a
+    closing line.
+    """
+    if budget_tokens is None:
+        budget_tokens = int(getattr(settings, 'CHAT_CONTEXT_TOKEN_BUDGET', 1500))
+    rows = list(_rows(ctx if isinstance(ctx, dict) else {}))
+    columns = tuple(c for c in columns_for(query) if any(company.get(c) not in (None, "") for _, company in rows))
+    lines: List[str] = [f"columns: {'|'.join(columns)}"] if rows else ["No companies found in platform records."]
+    used = estimate_tokens(lines[0])
+    kept = 0
+    section = None
+    for row_section, company in rows:
+        line = "|".join(_cell(company.get(c)) for c in columns)
+        cost = estimate_tokens(line) + (estimate_tokens(row_section) + 1 if row_section != section else 0)
+        if kept and used + cost > budget_tokens:
+            break
+        if row_section != section:
+            section = row_section
+            lines.append(f"{section}:")
+        lines.append(line)
+        used += cost
+        kept += 1
+    omitted = len(rows) - kept
+    if omitted:
+        lines.append(f"({omitted} more companies omitted)")
+    text = "\n".join(lines)
+    encoded = EncodedContext(
+        text=text,
+        columns=columns,
+        rows=kept,
+        omitted=omitted,
+        tokens=estimate_tokens(text),
+        baseline_tokens=estimate_tokens(baseline_text(ctx)),
+    )
+    _record(encoded)
+    return encoded
+
+
+_totals: Dict[str, int] = {'encoded': 0, 'tokens': 0, 'baseline_tokens': 0, 'omitted_rows': 0}
+_totals_lock = threading.Lock()
+
+
+def _record(encoded: EncodedContext):
+    with _totals_lock:
+        _totals['encoded'] += 1
+        _totals['tokens'] += encoded.tokens
+        _totals['baseline_tokens'] += encoded.baseline_tokens
+        _totals['omitted_rows'] += encoded.omitted
+
+
+def stats() -> Dict[str, Any]:
+    """Prompt context tokens sent since the process started, against the JSON encoding."""
+    with _totals_lock:
+        out: Dict[str, Any] = dict(_totals)
+    out['budget_tokens'] = int(getattr(settings, 'CHAT_CONTEXT_TOKEN_BUDGET', 1500))
+    out['saved_ratio'] = round(1 - out['tokens'] / out['baseline_tokens'], 4) if out['baseline_tokens'] else None
+    return out
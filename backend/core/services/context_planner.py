@@ -0,0 +1,84 @@
+from typing import NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+from core.services.query_parser import COUNTRY_ALIASES, ChatQuery
+
+DEFAULT_LIMIT = 10
+# Rows each deterministic answer shows when the question gives no count
+INTENT_LIMITS = {
+    "rank": 3,
+    "compare": 2,
+    "summary": 5,
+    "list": DEFAULT_LIMIT,
+    "table": DEFAULT_LIMIT,
+    "unsupported": DEFAULT_LIMIT,
+}
+ORDER_BY = ("-total_score", "-created_at", "-id")
+# Layouts that list every matching company when the question asks for "all"
+FULL_LISTING_INTENTS = ("list", "table", "unsupported")
+
+
+class ContextPlan(NamedTuple):
+    """The one StartupEvaluation query that answers a chat question."""
+    limit: int
+    stage: Optional[str] = None
+    country: Optional[str] = None
+    min_score: Optional[int] = None
+    order_by: Tuple[str, ...] = ORDER_BY
+
+
+def plan_context(query: Optional[ChatQuery], *, stage: Optional[str] = None, min_score: Optional[int] = None,
+                 limit: Optional[int] = None, max_rows: Optional[int] = None) -> ContextPlan:
+    """
+    Turn a parsed question into filters, ordering and a row limit.
+
+    Explicit request filters (``stage``, ``min_score``, ``limit``) win over the
+    ones read from the question. For list, table, rank, compare and summary
+    questions the limit is the "top N" asked for, or the number of rows the
+    answer shows; other questions get DEFAULT_LIMIT rows of context (or more
+    when they ask for a larger top N). A list or table of "all" companies
+    asks for as many rows as the cap allows. Limits are capped at ``max_rows``
+    (CHAT_CONTEXT_MAX_ROWS by default).
+    """
+    if max_rows is None:
+        max_rows = int(getattr(settings, 'CHAT_CONTEXT_MAX_ROWS', 50))
+    if query is None:
+        return ContextPlan(limit=min(limit or DEFAULT_LIMIT, max_rows), stage=stage, min_score=min_score)
+    top_n = query.top_n if query.top_n and query.top_n > 0 else None
+    if limit is None:
+        if query.wants_all and not top_n and query.intent in FULL_LISTING_INTENTS:
+            limit = max_rows
+        elif query.intent in INTENT_LIMITS:
+            limit = top_n or INTENT_LIMITS[query.intent]
+        else:
+            limit = max(DEFAULT_LIMIT, top_n or 0)
+    if min_score is None and query.min_score is not None:
+        min_score = int(query.min_score)
+    return ContextPlan(
+        limit=max(1, min(int(limit), max_rows)),
+        stage=stage or query.stage,
+        country=query.country,
+        min_score=min_score,
+    )
+
+
+def country_filter(country: str) -> Q:
+    """Match a country code against every spelling of it (countries are free text on evaluations)."""
+    q = Q(country__iexact=country)
+    for alias, code in COUNTRY_ALIASES.items():
+        if code == country:
+            q |= Q(country__iexact=alias)
+    return q
+
+
+def apply_plan(qs: QuerySet, plan: ContextPlan, *, limit: bool = True) -> QuerySet:
+    if plan.stage:
+        qs = qs.filter(stage=plan.stage)
+    if plan.country:
+        qs = qs.filter(country_filter(plan.country))
+    if plan.min_score is not None:
+        qs = qs.filter(total_score__gte=plan.min_score)
+    qs = qs.order_by(*plan.order_by)
+    return qs[:plan.limit] if limit else qs
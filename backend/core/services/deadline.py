@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from typing import Optional
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """
+    Time budget of one chat request, shared by its database queries, the
+    model call and the platform-data fallback. The fallback's share
+    (CHAT_FALLBACK_RESERVE_SECONDS) is held back from the model call, so a
+    slow model still leaves time to answer from platform data.
+    """
+
+    def __init__(self, seconds: float, *, reserve: float = 0.0):
+        self.seconds = seconds
+        self.reserve = reserve
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_request(cls) -> "Deadline":
+        return cls(
+            float(getattr(settings, 'CHAT_REQUEST_DEADLINE_SECONDS', 25)),
+            reserve=float(getattr(settings, 'CHAT_FALLBACK_RESERVE_SECONDS', 1)),
+        )
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def llm_budget(self) -> float:
+        """Seconds the model call may take; 0 means answer from platform data straight away."""
+        return max(0.0, self.remaining() - self.reserve)
+
+
+@contextmanager
+def db_time_limit(deadline: Optional[Deadline]):
+    """
+    Bound the SELECTs run inside the block by the deadline's model budget
+    (MySQL max_execution_time, PostgreSQL statement_timeout). Other backends
+    are not limited.
+    """
+    if deadline is None or connection.vendor not in ('mysql', 'postgresql'):
+        yield
+        return
+    ms = max(1, int(deadline.llm_budget() * 1000))
+    setting = 'max_execution_time' if connection.vendor == 'mysql' else 'statement_timeout'
+    with connection.cursor() as cursor:
+        cursor.execute(f"SET SESSION {setting} = %s", [ms])
+    try:
+        yield
+    finally:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SET SESSION {setting} = 0")
+        except Exception as e:
+            logger.error(f"[deadline] could not reset {setting}: {e}")
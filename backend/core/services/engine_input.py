@@ -0,0 +1,137 @@
+from typing import Dict, Any, Tuple
+import math
+
+from core.models.evaluation import StartupEvaluation
+
+STEP_KEYS = ('step1', 'step2', 'step3', 'step4', 'step5', 'step6', 'step7', 'step8')
+
+# Form fields (step, key) that feed each engine input field
+ENGINE_SOURCE_FIELDS = {
+    'company_name': (('step1', 'companyName'),),
+    'legal_structure': (('step1', 'legalStructure'),),
+    'incorporation_year': (('step1', 'incorporationYear'),),
+    'country': (('step1', 'country'),),
+    'stage': (('step1', 'stage'),),
+    'funding_raised': (('step1', 'previousFunding'),),
+    'tam_size': (('step3', 'tam'),),
+    'competition_level': (('step3', 'competitors'),),
+    'active_users': (('step4', 'activeUsers'),),
+    'mrr': (('step4', 'monthlyRevenue'),),
+    'burn_rate': (('step6', 'burnRate'),),
+    'founders_count': (('step5', 'foundersCount'),),
+    'has_technical_founder': (('step5', 'hasTechnicalFounder'),),
+    'exit_strategy': (('step8', 'exitStrategy'),),
+}
+# Engine fields read as text, whole years, and numbers; anything else is passed through as is
+ENGINE_TEXT_FIELDS = ('company_name', 'legal_structure', 'country', 'stage', 'competition_level', 'exit_strategy')
+ENGINE_YEAR_FIELDS = ('incorporation_year',)
+ENGINE_NUMBER_FIELDS = ('funding_raised', 'tam_size', 'active_users', 'mrr', 'burn_rate', 'founders_count', 'team_size')
+
+
+def engine_value(field: str, value: Any) -> Any:
+    """
+    ``value`` if the engine can read it for ``field``, else None, so a
+    half-typed answer ("20x" as a year, a number as the company name) scores
+    as unanswered instead of failing.
+    """
+    if value is None:
+        return None
+    if field in ENGINE_TEXT_FIELDS:
+        return value if isinstance(value, str) else None
+    if field in ENGINE_YEAR_FIELDS:
+        try:
+            int(value)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return value
+    if field in ENGINE_NUMBER_FIELDS:
+        try:
+            ok = math.isfinite(float(value))
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return value if ok else None
+    return value
+
+
+def has_steps(payload: Any) -> bool:
+    """True when the payload uses the step1..step8 form layout."""
+    return isinstance(payload, dict) and all(k in payload for k in STEP_KEYS)
+
+
+def readable_steps(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a (possibly partial) step1..step8 payload without the answers
+    engine_value() rejects, so a half-typed draft scores as if they were
+    not filled in yet.
+    """
+    out = {step: dict(data) for step, data in payload.items() if isinstance(data, dict)}
+    for field, sources in ENGINE_SOURCE_FIELDS.items():
+        for step, key in sources:
+            if step in out and key in out[step] and engine_value(field, out[step][key]) is None:
+                del out[step][key]
+    return out
+
+
+def provided_fields(payload: Dict[str, Any]) -> set:
+    """Engine fields for which the (possibly partial) form payload has a value."""
+    out = set()
+    for field, sources in ENGINE_SOURCE_FIELDS.items():
+        for step, key in sources:
+            step_data = payload.get(step)
+            value = step_data.get(key) if isinstance(step_data, dict) else None
+            if value not in (None, ''):
+                out.add(field)
+    return out
+
+
+def flatten_steps(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Flatten a step1..step8 form payload.
+
+    Returns:
+        (flat_for_model, engine_input): the base model fields used for validation,
+        and the input dict for StartupScoringEngine.
+    """
+    s1 = payload.get('step1', {}) or {}
+    s3 = payload.get('step3', {}) or {}
+    s4 = payload.get('step4', {}) or {}
+    s5 = payload.get('step5', {}) or {}
+    s6 = payload.get('step6', {}) or {}
+    s7 = payload.get('step7', {}) or {}
+    s8 = payload.get('step8', {}) or {}
+
+    flat_for_model = {
+        'company_name': s1.get('companyName'),
+        'legal_structure': s1.get('legalStructure'),
+        'incorporation_year': s1.get('incorporationYear'),
+        'country': s1.get('country'),
+        'stage': (s1.get('stage') or 'IDEA').upper().replace('-', '_'),
+        'funding_raised': s1.get('previousFunding') or 0,
+        'founder_profile_url': s5.get('founderProfileUrl') or s7.get('founderProfileUrl'),
+    }
+    valid_stages = {c for c, _ in StartupEvaluation.Stage.choices}
+    st = flat_for_model['stage']
+    if st not in valid_stages:
+        if isinstance(st, str) and (st.startswith('SERIES_') or st == 'PUBLIC'):
+            flat_for_model['stage'] = 'GROWTH'
+        else:
+            flat_for_model['stage'] = 'IDEA'
+
+    # Build engine input from raw steps
+    engine_input = {
+        'company_name': flat_for_model['company_name'],
+        'legal_structure': flat_for_model['legal_structure'],
+        'incorporation_year': flat_for_model['incorporation_year'],
+        'country': flat_for_model['country'],
+        'stage': flat_for_model['stage'],
+        'funding_raised': flat_for_model['funding_raised'],
+        'tam_size': s3.get('tam'),
+        'competition_level': s3.get('competitors') and 'Medium' or None,
+        'active_users': s4.get('activeUsers'),
+        'mrr': s4.get('monthlyRevenue'),
+        'burn_rate': s6.get('burnRate'),
+        'founders_count': s5.get('foundersCount'),
+        'has_technical_founder': s5.get('hasTechnicalFounder'),
+        'exit_strategy': s8.get('exitStrategy'),
+    }
+    return flat_for_model, engine_input
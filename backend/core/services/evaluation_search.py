@@ -0,0 +1,314 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import heapq
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from core.models.evaluation import StartupEvaluation
+from core.services.text_index import evaluation_text, words
+
+logger = logging.getLogger(__name__)
+
+# Written by migration 0011 (SQLite FTS5 table, MySQL FULLTEXT indexes)
+FTS_TABLE = 'core_startupevaluation_fts'
+# A word in the company name counts this many times a word in the form text
+NAME_WEIGHT = 4.0
+
+
+class SearchHit(NamedTuple):
+    id: str
+    relevance: float
+
+
+def search_terms(query: str) -> List[str]:
+    """The distinct words of a search query (at most SEARCH_MAX_TERMS), each matched as a prefix."""
+    terms: List[str] = []
+    for word in words(query or ""):
+        if word not in terms:
+            terms.append(word)
+    return terms[:int(getattr(settings, 'SEARCH_MAX_TERMS', 8))]
+
+
+_fts_tables: Dict[str, bool] = {}
+
+
+def search_backend() -> str:
+    """
+    'mysql' (FULLTEXT indexes), 'fts5' (SQLite FTS5 table) or 'memory' (the
+    in-process index: other databases, SQLite builds without FTS5, or
+    EVALUATION_SEARCH_BACKEND = 'memory').
+    """
+    if getattr(settings, 'EVALUATION_SEARCH_BACKEND', 'auto') == 'memory':
+        return 'memory'
+    if connection.vendor == 'mysql':
+        return 'mysql'
+    if connection.vendor == 'sqlite':
+        if connection.alias not in _fts_tables:
+            _fts_tables[connection.alias] = FTS_TABLE in connection.introspection.table_names()
+        if _fts_tables[connection.alias]:
+            return 'fts5'
+    return 'memory'
+
+
+def _pk(value: Any) -> str:
+    return str(StartupEvaluation._meta.pk.to_python(value))
+
+
+def _fts5_search(terms: List[str], offset: int, limit: int) -> Tuple[int, List[SearchHit]]:
+    match = " ".join(f'"{t}"*' for t in terms)
+    table = StartupEvaluation._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        total = cursor.fetchone()[0]
+        if not total or not limit or offset >= total:
+            return total, []
+        # Ranked inside FTS5 (bm25() is lower for better matches, company_name weighs NAME_WEIGHT);
+        # only the page is joined back to the evaluations
+        cursor.execute(
+            f"SELECT e.id, hits.rank FROM (SELECT eid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"AND rank MATCH 'bm25(0.0, {NAME_WEIGHT}, 1.0)' ORDER BY rank LIMIT %s OFFSET %s) hits "
+            f"JOIN {table} e ON e.id = hits.eid ORDER BY hits.rank, e.total_score DESC",
+            [match, limit, offset],
+        )
+        return total, [SearchHit(_pk(eid), round(-rank, 4)) for eid, rank in cursor.fetchall()]
+
+
+def _mysql_search(terms: List[str], offset: int, limit: int) -> Tuple[int, List[SearchHit]]:
+    match = " ".join(f"+{t}*" for t in terms)
+    table = StartupEvaluation._meta.db_table
+    against = "MATCH(company_name, search_text) AGAINST (%s IN BOOLEAN MODE)"
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {against}", [match])
+        total = cursor.fetchone()[0]
+        if not total or not limit or offset >= total:
+            return total, []
+        cursor.execute(
+            f"SELECT id, {against} + {NAME_WEIGHT} * MATCH(company_name) AGAINST (%s IN BOOLEAN MODE) AS relevance "
+            f"FROM {table} WHERE {against} ORDER BY relevance DESC, total_score DESC LIMIT %s OFFSET %s",
+            [match, match, match, limit, offset],
+        )
+        return total, [SearchHit(_pk(eid), round(float(relevance), 4)) for eid, relevance in cursor.fetchall()]
+
+
+def _doc_weights(name: str, form_data: Any) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for counts, boost in ((Counter(words(name)), NAME_WEIGHT), (Counter(words(evaluation_text(form_data))), 1.0)):
+        for word, tf in counts.items():
+            weights[word] = weights.get(word, 0.0) + boost * (1.0 + math.log(tf))
+    return weights
+
+
+class EvaluationSearchIndex:
+    """
+    In-process inverted index of company names and free-text form answers,
+    used for search when the database has no full-text index.
+
+    Each word posts the evaluations it appears in with a tf weight (name
+    words weigh NAME_WEIGHT); the vocabulary is kept sorted so a query word
+    is expanded to the indexed words it prefixes (at most
+    SEARCH_PREFIX_EXPANSIONS of them). Every query word must match, and
+    matches are ranked by their summed idf x tf, then total_score.
+
+    Like the company name index, saves and deletes update it in place (via
+    model signals) once it is loaded, and it is rebuilt from the database
+    every SEARCH_INDEX_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._refresh_at = 0.0
+        self._reset()
+
+    def _reset(self):
+        # id -> (total_score, {word: weight})
+        self._docs: Dict[str, Tuple[int, Dict[str, float]]] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocab: List[str] = []
+
+    def _add(self, eid: str, name: str, form_data: Any, score: int):
+        weights = _doc_weights(name, form_data)
+        self._docs[eid] = (score, weights)
+        for word, weight in weights.items():
+            posting = self._postings.get(word)
+            if posting is None:
+                posting = self._postings[word] = {}
+                if self._loaded:
+                    insort(self._vocab, word)
+            posting[eid] = weight
+
+    def _discard(self, eid: str):
+        entry = self._docs.pop(eid, None)
+        if entry is None:
+            return
+        for word in entry[1]:
+            posting = self._postings.get(word)
+            if posting is None:
+                continue
+            posting.pop(eid, None)
+            if not posting:
+                del self._postings[word]
+                i = bisect_left(self._vocab, word)
+                if i < len(self._vocab) and self._vocab[i] == word:
+                    del self._vocab[i]
+
+    def load(self, rows: Iterable[Tuple[Any, str, Any, Any]]):
+        """Replace the index with (id, company_name, form_data, total_score) rows."""
+        # Built aside and swapped in, so searches are not blocked during a reload
+        fresh = EvaluationSearchIndex()
+        for eid, name, form_data, score in rows:
+            fresh._add(str(eid), name or "", form_data, int(score or 0))
+        with self._lock:
+            self._docs = fresh._docs
+            self._postings = fresh._postings
+            self._vocab = sorted(fresh._postings)
+            self._loaded = True
+            self._refresh_at = time.monotonic() + float(getattr(settings, 'SEARCH_INDEX_REFRESH_SECONDS', 300))
+
+    def refresh(self, force: bool = False):
+        if not force and self._loaded and time.monotonic() < self._refresh_at:
+            return
+        qs = StartupEvaluation.objects.values_list('id', 'company_name', 'form_data', 'total_score').order_by()
+        self.load(qs.iterator(chunk_size=2000))
+        logger.info(f"[search_index] reloaded docs={len(self._docs)} words={len(self._vocab)}")
+
+    def invalidate(self):
+        with self._lock:
+            self._refresh_at = 0.0
+
+    def upsert(self, evaluation: StartupEvaluation):
+        with self._lock:
+            if not self._loaded:
+                return
+            eid = str(evaluation.id)
+            self._discard(eid)
+            self._add(eid, evaluation.company_name or "", evaluation.form_data, int(evaluation.total_score or 0))
+
+    def remove(self, evaluation_id: Any):
+        with self._lock:
+            self._discard(str(evaluation_id))
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _term_scores(self, term: str) -> Dict[str, float]:
+        """Best idf x tf of each evaluation over the indexed words ``term`` prefixes."""
+        n = len(self._docs)
+        cap = int(getattr(settings, 'SEARCH_PREFIX_EXPANSIONS', 64))
+        scores: Dict[str, float] = {}
+        i = bisect_left(self._vocab, term)
+        for word in self._vocab[i:i + cap]:
+            if not word.startswith(term):
+                break
+            posting = self._postings[word]
+            idf = math.log(1.0 + n / len(posting))
+            for eid, weight in posting.items():
+                score = idf * weight
+                if score > scores.get(eid, 0.0):
+                    scores[eid] = score
+        return scores
+
+    def search(self, terms: List[str], offset: int = 0, limit: int = 20) -> Tuple[int, List[SearchHit]]:
+        """
+        Evaluations matching every term (as a prefix), best first.
+
+        Args:
+            terms: Query words, as from search_terms().
+            offset: Matches to skip.
+            limit: Matches to return.
+
+        Returns:
+            (number of matches, the page of SearchHits).
+        """
+        if not terms:
+            return 0, []
+        with self._lock:
+            per_term = sorted((self._term_scores(t) for t in terms), key=len)
+            matched = dict(per_term[0])
+            for scores in per_term[1:]:
+                matched = {eid: s + scores[eid] for eid, s in matched.items() if eid in scores}
+                if not matched:
+                    break
+            totals = {eid: self._docs[eid][0] for eid in matched}
+        page = heapq.nsmallest(offset + limit, matched.items(), key=lambda kv: (-kv[1], -totals[kv[0]], kv[0]))[offset:]
+        return len(matched), [SearchHit(eid, round(score, 4)) for eid, score in page]
+
+
+search_index = EvaluationSearchIndex()
+
+
+def get_search_index() -> EvaluationSearchIndex:
+    """Return the process-wide search index, (re)loading it from the database when due."""
+    search_index.refresh()
+    return search_index
+
+
+def search_evaluations(query: str, offset: int = 0, limit: int = 20, backend: Optional[str] = None) -> Tuple[int, List[SearchHit]]:
+    """
+    Full-text search over company names and the free-text form answers.
+
+    Args:
+        query: Search words; each is matched as a prefix and all must match.
+        offset: Matches to skip.
+        limit: Matches to return (0 only counts them).
+        backend: 'mysql', 'fts5' or 'memory' (default: search_backend()).
+
+    Returns:
+        (number of matches, the page of SearchHits, best first).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return 0, []
+    limit = max(int(limit), 0)
+    backend = backend or search_backend()
+    if backend == 'mysql':
+        return _mysql_search(terms, offset, limit)
+    if backend == 'fts5':
+        return _fts5_search(terms, offset, limit)
+    return get_search_index().search(terms, offset, limit)
+
+
+def _result_row(evaluation: StartupEvaluation, relevance: float) -> Dict[str, Any]:
+    return {
+        "id": str(evaluation.id),
+        "name": evaluation.company_name,
+        "stage": evaluation.stage,
+        "country": evaluation.country,
+        "total_score": evaluation.total_score,
+        "rating": evaluation.rating,
+        "relevance": relevance,
+    }
+
+
+class SearchResults:
+    """
+    The ranked matches of one query as a lazy sequence for Django's
+    Paginator: count() runs the count query once, and a slice fetches only
+    that page of hits and loads just those evaluations.
+    """
+
+    def __init__(self, query: str, backend: Optional[str] = None):
+        self.query = query
+        self.backend = backend or search_backend()
+        self._count: Optional[int] = None
+
+    def count(self) -> int:
+        if self._count is None:
+            self._count, _ = search_evaluations(self.query, 0, 0, self.backend)
+        return self._count
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, key: slice) -> List[Dict[str, Any]]:
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        self._count, hits = search_evaluations(self.query, start, stop - start, self.backend)
+        by_id = {str(k): v for k, v in StartupEvaluation.objects.in_bulk([h.id for h in hits]).items()}
+        return [_result_row(by_id[h.id], h.relevance) for h in hits if h.id in by_id]
@@ -0,0 +1,219 @@
+from typing import Any, Dict, List, Optional, Sequence
+import math
+
+from core.models.evaluation import StartupEvaluation
+from core.services.engine_input import STEP_KEYS
+from core.services.scoring_engine import StartupScoringEngine
+
+# Memo sections, in the order (and with the headings) SYSTEM_PROMPT asks for
+SECTION_TITLES = ("Startup Overview", "Financial Metrics", "Risk Analysis", "Key Insights")
+SCORING_SECTIONS = {
+    'identity': "Identity", 'market': "Market", 'traction': "Traction", 'financials': "Financials",
+    'funding': "Funding", 'team': "Team", 'exit': "Exit",
+}
+MAX_SCORE = sum(StartupScoringEngine.SECTION_MAX.values())
+# A scoring section at or below / at or above this share of its points is called out
+WEAK_SECTION_RATIO = 0.4
+STRONG_SECTION_RATIO = 0.75
+NOT_REPORTED = "No financial metrics were reported."
+NO_RISKS = "- No risk flags or weaknesses were raised by the scoring model."
+
+
+def form_fields(form_data: Any) -> Dict[str, Any]:
+    """
+    The form answers as one flat dict: the step1..step8 dicts merged (earlier
+    steps win on repeated keys), a list of step dicts merged the same way,
+    or a flat payload as it is.
+    """
+    if isinstance(form_data, dict):
+        if not any(k in form_data for k in STEP_KEYS):
+            return form_data
+        steps = [form_data.get(k) for k in reversed(STEP_KEYS)]
+    elif isinstance(form_data, list):
+        steps = list(reversed(form_data))
+    else:
+        return {}
+    out: Dict[str, Any] = {}
+    for step in steps:
+        if isinstance(step, dict):
+            out.update(step)
+    return out
+
+
+def _num(v: Any) -> Optional[float]:
+    if isinstance(v, bool) or v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return float(v) if math.isfinite(v) else None
+    try:
+        x = float(str(v).replace(",", "").strip())
+    except ValueError:
+        return None
+    return x if math.isfinite(x) else None
+
+
+def _fmt(x: float) -> str:
+    return f"{x:,.0f}" if x == int(x) else f"{x:,.2f}"
+
+
+def _money(x: float, currency: str) -> str:
+    return f"${_fmt(x)}" if currency == "USD" else f"{_fmt(x)} {currency}"
+
+
+def _text(v: Any) -> str:
+    return " ".join(str(v).split()) if v not in (None, "") and not isinstance(v, bool) else ""
+
+
+def _choice_label(choices: Any, value: Any) -> str:
+    key = _text(value).upper().replace("-", "_").replace(" ", "_")
+    try:
+        return str(choices(key).label)
+    except ValueError:
+        return _text(value)
+
+
+def _section_line(keys: Sequence[str], section_scores: Dict[str, Any]) -> str:
+    return ", ".join(
+        f"{SCORING_SECTIONS.get(k, k)} {section_scores[k]['score']}/{section_scores[k]['outOf']}" for k in keys
+    )
+
+
+def _overview(form: Dict[str, Any], name: str, stage: Any, country: Any, score: Optional[float], rating: Any) -> List[str]:
+    stage_label = _choice_label(StartupEvaluation.Stage, stage)
+    intro = f"{name} is a{'n' if stage_label[:1].upper() in 'AEIOU' else ''} {stage_label}-stage company" if stage_label else f"{name} is a company"
+    if _text(country):
+        intro += f" based in {_text(country)}"
+    details = [d for d in (_text(form.get("legalStructure")),
+                           f"incorporated {_text(form.get('incorporationYear'))}" if _text(form.get("incorporationYear")) else "") if d]
+    if details:
+        intro += f" ({', '.join(details)})"
+    lines = [intro + "."]
+    for key, label in (("coreProblem", "Problem"), ("solution", "Solution"), ("targetCustomer", "Target customer"),
+                       ("uniqueAdvantage", "Unique advantage"), ("competitors", "Competitors"),
+                       ("vision", "Vision")):
+        if _text(form.get(key)):
+            lines.append(f"{label}: {_text(form.get(key))}")
+    if score is not None:
+        rating_label = _choice_label(StartupEvaluation.Rating, rating) if rating else ""
+        lines.append(f"Platform score: {_fmt(score)}/{MAX_SCORE}" + (f" ({rating_label})" if rating_label else ""))
+    return lines
+
+
+def _financials(form: Dict[str, Any]) -> List[str]:
+    currency = _text(form.get("currency")).upper() or "USD"
+    lines = []
+    mrr = _num(form.get("monthlyRevenue"))
+    if mrr is not None:
+        lines.append(f"- MRR: {_money(mrr, currency)}" if mrr > 0 else "- MRR: pre-revenue")
+    for key, label, unit in (("revenueGrowth", "Revenue growth", "%"), ("activeUsers", "Active users", ""),
+                             ("payingCustomers", "Paying customers", ""), ("retentionRate", "Retention", "%")):
+        x = _num(form.get(key))
+        if x is not None:
+            lines.append(f"- {label}: {_fmt(x)}{unit}")
+    burn = _num(form.get("burnRate"))
+    if burn is not None and burn > 0:
+        line = f"- Burn rate: {_money(burn, currency)} per month"
+        if mrr is not None and mrr >= burn:
+            line += ", covered by revenue"
+        elif mrr:
+            line += f", net burn {_money(burn - mrr, currency)}"
+        lines.append(line)
+    raising = _num(form.get("amountRaising"))
+    if raising:
+        line = f"- Raising: {_money(raising, currency)}"
+        pre = _num(form.get("preMoneyValuation"))
+        if pre:
+            line += f" at a {_money(pre, currency)} pre-money valuation (post-money {_money(pre + raising, currency)})"
+        equity = _num(form.get("equityOffered"))
+        if equity:
+            line += f" for {_fmt(equity)}% equity"
+        lines.append(line)
+    previous = _num(form.get("previousFunding"))
+    if previous is not None:
+        lines.append(f"- Previously raised: {_money(previous, currency)}" if previous > 0 else "- Previously raised: none (bootstrapped)")
+    market = [f"{label} ${_fmt(x)}M" for key, label in (("tam", "TAM"), ("sam", "SAM"), ("som", "SOM"))
+              if (x := _num(form.get(key)))]
+    if market:
+        lines.append(f"- Market size: {', '.join(market)}")
+    if _text(form.get("fundUse")):
+        lines.append(f"- Use of funds: {_text(form.get('fundUse'))}")
+    return lines or [NOT_REPORTED]
+
+
+def _risks(risk_flags: Sequence[str], weaknesses: Sequence[str], section_scores: Dict[str, Any]) -> List[str]:
+    lines = [f"- Risk: {flag}" for flag in risk_flags]
+    lines.extend(f"- Weakness: {item}" for item in weaknesses)
+    weak = [k for k, s in section_scores.items() if s.get("outOf") and s.get("score", 0) / s["outOf"] <= WEAK_SECTION_RATIO]
+    if weak:
+        lines.append(f"- Weakest scoring sections: {_section_line(weak, section_scores)}")
+    return lines or [NO_RISKS]
+
+
+def _insights(form: Dict[str, Any], strengths: Sequence[str], section_scores: Dict[str, Any]) -> List[str]:
+    lines = [f"- Strength: {item}" for item in strengths]
+    strong = [k for k, s in section_scores.items() if s.get("outOf") and s.get("score", 0) / s["outOf"] >= STRONG_SECTION_RATIO]
+    if strong:
+        lines.append(f"- Strongest scoring sections: {_section_line(strong, section_scores)}")
+    exit_parts = []
+    if _text(form.get("exitStrategy")):
+        exit_parts.append(_text(form.get("exitStrategy")))
+    timeline = form.get("exitTimeline")
+    if _text(timeline):
+        exit_parts.append(f"within {_fmt(t)} years" if (t := _num(timeline)) is not None else _text(timeline))
+    target = _num(form.get("investorReturn"))
+    if target:
+        exit_parts.append(f"targeting a {_fmt(target)}x investor return")
+    if exit_parts:
+        lines.append(f"- Exit: {', '.join(exit_parts)}")
+    if section_scores:
+        lines.append(f"- Section scores: {_section_line(list(section_scores), section_scores)}")
+    return lines or ["- No strengths were identified by the scoring model."]
+
+
+def render_memo(form_data: Any, scoring: Optional[Dict[str, Any]] = None, *, name: Any = None,
+                stage: Any = None, country: Any = None) -> str:
+    """
+    Structured investor memo written from the scoring output (``calculate()``
+    shape: total_score, rating, strengths, weaknesses, risk_flags,
+    section_scores) and the form answers, with no model call. Values that
+    are missing are left out rather than guessed.
+
+    Args:
+        form_data: step1..step8 payload, or the flat form answers.
+        scoring: Scoring result; any key may be missing.
+        name, stage, country: Stored evaluation values, preferred over the form's.
+    """
+    form = form_fields(form_data)
+    scoring = scoring or {}
+    section_scores = {
+        k: v for k, v in (scoring.get("section_scores") or {}).items() if isinstance(v, dict)
+    }
+    name = _text(name) or _text(form.get("companyName")) or _text(form.get("company_name")) or _text(form.get("name")) or "The company"
+    sections = (
+        _overview(form, name, stage or form.get("stage"), country or form.get("country"),
+                  _num(scoring.get("total_score")), scoring.get("rating")),
+        _financials(form),
+        _risks(scoring.get("risk_flags") or [], scoring.get("weaknesses") or [], section_scores),
+        _insights(form, scoring.get("strengths") or [], section_scores),
+    )
+    return "\n\n".join(f"{title}\n" + "\n".join(lines) for title, lines in zip(SECTION_TITLES, sections))
+
+
+def evaluation_scoring(evaluation: StartupEvaluation) -> Dict[str, Any]:
+    """The stored scoring output of an evaluation, in ``calculate()`` shape."""
+    out: Dict[str, Any] = {
+        "total_score": evaluation.total_score,
+        "rating": evaluation.rating,
+        "section_scores": evaluation.section_scores or {},
+    }
+    details = evaluation.section_details or {}
+    for kind in ("strengths", "weaknesses", "risk_flags"):
+        out[kind] = [item for section in details.values() for item in (section or {}).get(kind) or []]
+    return out
+
+
+def evaluation_memo(evaluation: StartupEvaluation) -> str:
+    return render_memo(
+        evaluation.form_data, evaluation_scoring(evaluation),
+        name=evaluation.company_name, stage=evaluation.stage, country=evaluation.country,
+    )
@@ -0,0 +1,520 @@
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+from core.services.llm_providers import get_providers
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+class LLMUnavailable(Exception):
+    """Every provider failed (or none is configured)."""
+
+
+class OpenAIProvider:
+    name = 'openai'
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.model = registry.openai_model
+
+    async def stream(self, messages: Messages, *, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        client = self.registry.async_openai()
+        stream = await client.chat.completions.create(
+            model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True,
+        )
+        try:
+            async for part in stream:
+                try:
+                    delta = part.choices[0].delta.content or ""
+                except Exception:
+                    delta = ""
+                if delta:
+                    yield delta
+        finally:
+            # Closes the HTTP response when the gateway cancels this provider
+            await stream.response.aclose()
+
+
+class GeminiProvider:
+    name = 'gemini'
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.model = registry.gemini_model_name
+
+    async def stream(self, messages: Messages, *, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        model = self.registry.gemini()
+        prompt = "\n\n".join(m["content"] for m in messages)
+        response = await model.generate_content_async(
+            prompt, stream=True, generation_config={'max_output_tokens': max_tokens, 'temperature': temperature},
+        )
+        async for chunk in response:
+            try:
+                text = chunk.text or ""
+            except Exception:
+                # Chunks without text parts (e.g. safety metadata)
+                text = ""
+            if text:
+                yield text
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies (seconds) for one provider."""
+
+    def __init__(self, size: int):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._values.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            values = sorted(self._values)
+        if len(values) < max(min_samples, 1):
+            return None
+        return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one provider, over the outcomes of its last ``window``
+    calls. A call fails when it raises or is slower than the gateway's slow
+    call threshold.
+
+    closed: calls go through; once ``min_calls`` outcomes are recorded and the
+    share of failed ones reaches ``failure_ratio``, the circuit opens.
+    open: calls are refused for ``open_seconds``, then it turns half-open.
+    half_open: up to ``half_open_calls`` trial calls go through; a good one
+    closes the circuit, a failed one opens it again.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name: str, *, failure_ratio: float = 0.5, min_calls: int = 10, window: int = 20,
+                 open_seconds: float = 30.0, half_open_calls: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self._failed = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._counts = {'opened': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+
+    def _advance(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._trials = 0
+
+    def _open(self, reason: str):
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+        self._failed.clear()
+        self._counts['opened'] += 1
+        logger.warning(f"[llm_gateway] circuit open for {self.name}: {reason}")
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._failed.clear()
+        self._trials = 0
+        logger.info(f"[llm_gateway] circuit closed for {self.name}")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance()
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now (a half-open trial counts as taken)."""
+        with self._lock:
+            self._advance()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            self._counts['rejected'] += 1
+            return False
+
+    def record(self, ok: bool):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if ok:
+                    self._close()
+                else:
+                    self._open("trial call failed")
+                return
+            if self._state == self.OPEN:
+                # A call that started before the circuit opened
+                return
+            self._failed.append(not ok)
+            failures = sum(self._failed)
+            if len(self._failed) >= self.min_calls and failures >= self.failure_ratio * len(self._failed):
+                self._open(f"{failures}/{len(self._failed)} recent calls failed or were slow")
+
+    def release(self):
+        """A call ended without an outcome (cancelled early); free its half-open trial."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def reset(self):
+        with self._lock:
+            self._close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._advance()
+            out: Dict[str, Any] = {
+                'name': self.name,
+                'state': self._state,
+                'recent_calls': len(self._failed),
+                'recent_failures': sum(self._failed),
+                **self._counts,
+            }
+            if self._state == self.OPEN:
+                out['retry_in_s'] = round(max(0.0, self.open_seconds - (self.clock() - self._opened_at)), 3)
+            return out
+
+
+class LLMGateway:
+    """
+    Hedged requests across LLM providers.
+
+    The first provider is asked first. If it has not produced within its
+    hedge delay (the LLM_HEDGE_PERCENTILE of its recent latencies, or
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS until LLM_HEDGE_MIN_SAMPLES are seen), the
+    next provider is asked too; a provider that fails is replaced by the next
+    one straight away. The first good result wins and the others are
+    cancelled. Streams are raced on their first token, complete answers on
+    the whole answer.
+
+    Each provider has a CircuitBreaker: while it is open the provider is
+    skipped, so requests go straight to the next provider, or fail fast with
+    LLMUnavailable (and the caller answers from platform data) when every
+    circuit is open. A call ``timeout`` (the request's remaining deadline)
+    bounds each race below the gateway timeout.
+
+    The coroutines run on one long-lived event loop thread per process, so
+    the async provider clients and their connection pools outlive requests;
+    ``stream()`` and ``complete()`` are the blocking entry points for views.
+    """
+
+    def __init__(self, providers: Sequence[Any], *, hedge_percentile: float = 95.0, min_delay: float = 0.5,
+                 default_delay: float = 4.0, min_samples: int = 20, window: int = 200, timeout: float = 30.0,
+                 slow_first_token: float = 8.0, slow_answer: float = 20.0, breaker: Optional[Dict[str, Any]] = None):
+        self.providers = list(providers)
+        self.hedge_percentile = hedge_percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.timeout = timeout
+        # Calls slower than these count as failures for the circuit breakers
+        self.slow_call = {'first': slow_first_token, 'total': slow_answer}
+        self.breakers: Dict[str, CircuitBreaker] = {p.name: CircuitBreaker(p.name, **(breaker or {})) for p in self.providers}
+        self._latency: Dict[Tuple[str, str], LatencyWindow] = {
+            (p.name, kind): LatencyWindow(window) for p in self.providers for kind in ('first', 'total')
+        }
+        self._counts: Dict[str, int] = {'requests': 0, 'hedged': 0, 'failures': 0, 'short_circuited': 0}
+        self._wins: Dict[str, int] = {p.name: 0 for p in self.providers}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self.providers)
+
+    @property
+    def model_key(self) -> str:
+        return "|".join(f"{p.name}:{p.model}" for p in self.providers)
+
+    def hedge_delay(self, provider: Any, kind: str) -> float:
+        observed = self._latency[(provider.name, kind)].percentile(self.hedge_percentile, self.min_samples)
+        return max(self.min_delay, observed) if observed is not None else self.default_delay
+
+    def _count(self, key: str, provider: Optional[str] = None):
+        with self._lock:
+            if provider is None:
+                self._counts[key] += 1
+            else:
+                self._wins[provider] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counts)
+            out['wins'] = dict(self._wins)
+        out['providers'] = [
+            {
+                'name': p.name,
+                'model': p.model,
+                'samples': len(self._latency[(p.name, 'first')]),
+                'hedge_after_first_token_s': round(self.hedge_delay(p, 'first'), 3),
+                'hedge_after_answer_s': round(self.hedge_delay(p, 'total'), 3),
+                'breaker': self.breakers[p.name].snapshot(),
+            }
+            for p in self.providers
+        ]
+        return out
+
+    def breaker_states(self) -> List[Dict[str, Any]]:
+        return [self.breakers[p.name].snapshot() for p in self.providers]
+
+    async def _race(self, start: Callable[[Any], Any], kind: str, timeout: Optional[float] = None) -> Tuple[Any, Any]:
+        """
+        Run ``start(provider)`` coroutines with hedging; return (provider, result)
+        of the first to succeed. Providers with an open circuit are skipped.
+        Raises LLMUnavailable when all fail or are open, or when ``timeout``
+        (capped at the gateway timeout) passes.
+
+        ``start`` returns ``(stream, value)``; the streams of results that
+        finished but did not win are closed.
+        """
+        if not self.providers:
+            raise LLMUnavailable("No LLM provider is configured.")
+        self._count('requests')
+        budget = self.timeout if timeout is None else min(self.timeout, timeout)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget
+        waiting = list(self.providers)
+        running: Dict[asyncio.Task, Any] = {}
+        errors: List[str] = []
+
+        async def attempt(provider):
+            breaker = self.breakers[provider.name]
+            t0 = time.monotonic()
+            try:
+                result = await start(provider)
+            except asyncio.CancelledError:
+                # Lost the race or ran out of time: only counts when it was already too slow
+                if time.monotonic() - t0 > self.slow_call[kind]:
+                    breaker.record(False)
+                else:
+                    breaker.release()
+                raise
+            except BaseException:
+                breaker.record(False)
+                raise
+            breaker.record(time.monotonic() - t0 <= self.slow_call[kind])
+            return result
+
+        def launch():
+            while waiting:
+                provider = waiting.pop(0)
+                if self.breakers[provider.name].allow():
+                    running[asyncio.ensure_future(attempt(provider))] = provider
+                    return provider
+                self._count('short_circuited')
+                errors.append(f"{provider.name}: circuit open")
+            return None
+
+        last = launch()
+        try:
+            while True:
+                if not running:
+                    if not waiting:
+                        self._count('failures')
+                        raise LLMUnavailable("; ".join(errors) or "No answer.")
+                    last = launch()
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self._count('failures')
+                    raise LLMUnavailable(f"No answer within {budget:.1f}s.")
+                wait = min(self.hedge_delay(last, kind), remaining) if waiting else remaining
+                done, _ = await asyncio.wait(running, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if waiting and loop.time() < deadline:
+                        hedge = launch()
+                        if hedge is not None:
+                            last = hedge
+                            self._count('hedged')
+                            logger.info(f"[llm_gateway] hedged to {last.name} kind={kind}")
+                    continue
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is None:
+                        self._count('wins', provider.name)
+                        return provider, task.result()
+                    errors.append(f"{provider.name}: {task.exception()}")
+                    logger.error(f"[llm_gateway] {provider.name} failed: {task.exception()}")
+                    if waiting:
+                        last = launch() or last
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            # Tasks that finished in the same round as the winner, or before their cancel landed
+            for task in running:
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    await task.result()[0].aclose()
+
+    async def astream(self, messages: Messages, *, max_tokens: int = 400, temperature: float = 0.2,
+                      timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, str]]:
+        """Yield (provider name, delta) from the provider that produces a first token first."""
+        async def first_token(provider):
+            t0 = time.monotonic()
+            agen = provider.stream(messages, max_tokens=max_tokens, temperature=temperature)
+            try:
+                first = await agen.__anext__()
+            except StopAsyncIteration:
+                raise LLMUnavailable("empty answer")
+            except BaseException:
+                await agen.aclose()
+                raise
+            self._latency[(provider.name, 'first')].add(time.monotonic() - t0)
+            return agen, first
+
+        provider, (agen, first) = await self._race(first_token, 'first', timeout)
+        try:
+            yield provider.name, first
+            async for delta in agen:
+                yield provider.name, delta
+        finally:
+            await agen.aclose()
+
+    async def acomplete(self, messages: Messages, *, max_tokens: int = 400, temperature: float = 0.2,
+                        timeout: Optional[float] = None) -> Tuple[str, str]:
+        """(answer, provider name) from the provider that completes a non-empty answer first."""
+        async def answer(provider):
+            t0 = time.monotonic()
+            parts = []
+            agen = provider.stream(messages, max_tokens=max_tokens, temperature=temperature)
+            try:
+                async for delta in agen:
+                    parts.append(delta)
+            finally:
+                await agen.aclose()
+            content = "".join(parts).strip()
+            if not content:
+                raise LLMUnavailable("empty answer")
+            self._latency[(provider.name, 'total')].add(time.monotonic() - t0)
+            return agen, content
+
+        provider, (_, content) = await self._race(answer, 'total', timeout)
+        return content, provider.name
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def _budget(self, timeout: Optional[float]) -> float:
+        return self.timeout if timeout is None else max(0.0, min(self.timeout, timeout))
+
+    def complete(self, messages: Messages, *, timeout: Optional[float] = None, **kwargs) -> Tuple[str, str]:
+        """Blocking ``acomplete``."""
+        budget = self._budget(timeout)
+        future = asyncio.run_coroutine_threadsafe(self.acomplete(messages, timeout=budget, **kwargs), self._event_loop())
+        try:
+            return future.result(budget + 1)
+        except concurrent.futures.TimeoutError:
+            raise LLMUnavailable(f"No answer within {budget:.1f}s.")
+        finally:
+            future.cancel()
+
+    def stream(self, messages: Messages, *, timeout: Optional[float] = None, **kwargs) -> Iterator[Tuple[str, str]]:
+        """
+        Blocking ``astream``; closing the iterator early cancels the provider
+        call. ``timeout`` bounds the whole stream, not only the first token.
+        """
+        budget = self._budget(timeout)
+        ends_at = time.monotonic() + budget
+        out: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in self.astream(messages, timeout=budget, **kwargs):
+                    out.put(('delta', item))
+                out.put(('done', None))
+            except BaseException as e:
+                out.put(('error', e))
+                raise
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._event_loop())
+        try:
+            while True:
+                try:
+                    kind, value = out.get(timeout=max(0.0, ends_at - time.monotonic()) + 0.5)
+                except queue.Empty:
+                    raise LLMUnavailable(f"Answer not finished within {budget:.1f}s.")
+                if kind == 'delta':
+                    yield value
+                elif kind == 'done':
+                    return
+                else:
+                    raise value
+        finally:
+            future.cancel()
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def build_gateway(registry=None) -> LLMGateway:
+    """A gateway over the configured providers: OpenAI first, then Gemini."""
+    registry = registry or get_providers()
+    providers = []
+    if registry.openai_configured:
+        providers.append(OpenAIProvider(registry))
+    if registry.gemini_configured:
+        providers.append(GeminiProvider(registry))
+    return LLMGateway(
+        providers,
+        hedge_percentile=float(getattr(settings, 'LLM_HEDGE_PERCENTILE', 95)),
+        min_delay=float(getattr(settings, 'LLM_HEDGE_MIN_DELAY_SECONDS', 0.5)),
+        default_delay=float(getattr(settings, 'LLM_HEDGE_DEFAULT_DELAY_SECONDS', 4.0)),
+        min_samples=int(getattr(settings, 'LLM_HEDGE_MIN_SAMPLES', 20)),
+        window=int(getattr(settings, 'LLM_HEDGE_WINDOW', 200)),
+        timeout=float(getattr(settings, 'LLM_TIMEOUT_SECONDS', 30)),
+        slow_first_token=float(getattr(settings, 'LLM_BREAKER_SLOW_FIRST_TOKEN_SECONDS', 8)),
+        slow_answer=float(getattr(settings, 'LLM_BREAKER_SLOW_ANSWER_SECONDS', 20)),
+        breaker={
+            'failure_ratio': float(getattr(settings, 'LLM_BREAKER_FAILURE_RATIO', 0.5)),
+            'min_calls': int(getattr(settings, 'LLM_BREAKER_MIN_CALLS', 10)),
+            'window': int(getattr(settings, 'LLM_BREAKER_WINDOW', 20)),
+            'open_seconds': float(getattr(settings, 'LLM_BREAKER_OPEN_SECONDS', 30)),
+            'half_open_calls': int(getattr(settings, 'LLM_BREAKER_HALF_OPEN_CALLS', 1)),
+        },
+    )
+
+
+def get_gateway() -> LLMGateway:
+    """Return the process-wide gateway."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = build_gateway()
+    return _gateway
+
+
+def reset_gateway():
+    """Drop the process-wide gateway; the next ``get_gateway()`` builds one from the current settings."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
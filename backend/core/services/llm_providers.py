@@ -0,0 +1,151 @@
+from typing import Any, Dict, Optional
+import logging
+import threading
+
+from django.conf import settings
+
+try:
+    from openai import AsyncOpenAI, OpenAI  # optional; only used if API key present
+except Exception:
+    AsyncOpenAI = OpenAI = None
+try:
+    import google.generativeai as genai  # optional Gemini fallback
+except Exception:
+    genai = None
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """
+    Process-wide LLM provider clients.
+
+    Keys and model names are read from settings once. The OpenAI client is
+    built on first use and then shared by every request and thread: it sits
+    on one pooled, keep-alive httpx client (LLM_MAX_CONNECTIONS /
+    LLM_MAX_KEEPALIVE_CONNECTIONS), so consecutive questions reuse open TLS
+    connections. The pool ignores proxy environment variables (trust_env=False)
+    instead of removing them from os.environ. Gemini is configured once and its
+    model objects are reused.
+
+    ``async_openai()`` is the asyncio counterpart used by the LLM gateway; it
+    is bound to the gateway's event loop and must only be used from it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._openai: Any = None
+        self._http: Any = None
+        self._async_openai: Any = None
+        self._gemini_ready = False
+        self._gemini_models: Dict[str, Any] = {}
+        self.load()
+
+    def load(self):
+        """(Re)read provider keys and models from settings."""
+        self.openai_key = getattr(settings, 'OPENAI_API_KEY', '') or ''
+        self.openai_model = getattr(settings, 'OPENAI_MODEL', 'gpt-4o-mini')
+        # Another server speaking the OpenAI protocol (e.g. the bundled fake_openai_server)
+        self.openai_base_url = getattr(settings, 'OPENAI_BASE_URL', '') or None
+        self.gemini_key = getattr(settings, 'GEMINI_API_KEY', '') or ''
+        self.gemini_model_name = getattr(settings, 'GEMINI_MODEL', 'gemini-1.5-flash')
+
+    @property
+    def openai_configured(self) -> bool:
+        return bool(self.openai_key) and OpenAI is not None
+
+    @property
+    def gemini_configured(self) -> bool:
+        return bool(self.gemini_key) and genai is not None
+
+    def _pool_options(self) -> Dict[str, Any]:
+        limits = httpx.Limits(
+            max_connections=int(getattr(settings, 'LLM_MAX_CONNECTIONS', 20)),
+            max_keepalive_connections=int(getattr(settings, 'LLM_MAX_KEEPALIVE_CONNECTIONS', 10)),
+            keepalive_expiry=float(getattr(settings, 'LLM_KEEPALIVE_EXPIRY_SECONDS', 30)),
+        )
+        timeout = httpx.Timeout(
+            float(getattr(settings, 'LLM_TIMEOUT_SECONDS', 30)),
+            connect=float(getattr(settings, 'LLM_CONNECT_TIMEOUT_SECONDS', 5)),
+        )
+        return {'limits': limits, 'timeout': timeout, 'trust_env': False}
+
+    def openai(self) -> Optional[Any]:
+        """The shared OpenAI client, or None when OpenAI is not configured."""
+        client = self._openai
+        if client is not None or not self.openai_configured:
+            return client
+        with self._lock:
+            if self._openai is None:
+                if httpx is not None:
+                    self._http = httpx.Client(**self._pool_options())
+                    self._openai = OpenAI(api_key=self.openai_key, base_url=self.openai_base_url, http_client=self._http)
+                else:
+                    self._openai = OpenAI(api_key=self.openai_key, base_url=self.openai_base_url)
+                logger.info(f"[llm_providers] openai client ready model={self.openai_model}")
+            return self._openai
+
+    def async_openai(self) -> Optional[Any]:
+        """The shared AsyncOpenAI client (gateway event loop only), or None when OpenAI is not configured."""
+        client = self._async_openai
+        if client is not None or not self.openai_configured or AsyncOpenAI is None:
+            return client
+        with self._lock:
+            if self._async_openai is None:
+                if httpx is not None:
+                    self._async_openai = AsyncOpenAI(
+                        api_key=self.openai_key, base_url=self.openai_base_url, http_client=httpx.AsyncClient(**self._pool_options()),
+                    )
+                else:
+                    self._async_openai = AsyncOpenAI(api_key=self.openai_key, base_url=self.openai_base_url)
+            return self._async_openai
+
+    def gemini(self, model_name: Optional[str] = None) -> Optional[Any]:
+        """A reusable Gemini model, or None when Gemini is not configured."""
+        if not self.gemini_configured:
+            return None
+        name = model_name or self.gemini_model_name
+        model = self._gemini_models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if not self._gemini_ready:
+                genai.configure(api_key=self.gemini_key)
+                self._gemini_ready = True
+            model = self._gemini_models.get(name)
+            if model is None:
+                model = self._gemini_models[name] = genai.GenerativeModel(name)
+            return model
+
+    def gemini_list_models(self):
+        self.gemini()
+        return genai.list_models()
+
+    def close(self):
+        """Drop the clients (and their pooled connections); they are rebuilt on next use."""
+        with self._lock:
+            if self._http is not None:
+                try:
+                    self._http.close()
+                except Exception:
+                    pass
+            self._http = None
+            self._openai = None
+            self._async_openai = None
+            self._gemini_ready = False
+            self._gemini_models = {}
+
+    def reset(self):
+        self.close()
+        self.load()
+
+
+providers = ProviderRegistry()
+
+
+def get_providers() -> ProviderRegistry:
+    return providers
@@ -0,0 +1,149 @@
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from core.services.engine_input import STEP_KEYS, ENGINE_SOURCE_FIELDS, flatten_steps
+from core.services.scoring_engine import StartupScoringEngine
+from core.services.scoring_rules import get_rules
+
+# Engine inputs that may be given as a range / distribution
+SIMULATED_FIELDS = ('mrr', 'burn_rate', 'active_users', 'tam_size', 'funding_raised', 'founders_count')
+INTEGER_FIELDS = ('active_users', 'founders_count')
+
+DEFAULT_DRAWS = 5000
+
+
+def _num(spec: Dict[str, Any], key: str, field: str) -> float:
+    try:
+        value = float(spec[key])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Distribution for '{field}' needs a numeric '{key}'.")
+    if not np.isfinite(value):
+        raise ValueError(f"Distribution for '{field}' needs a finite '{key}'.")
+    return value
+
+
+def sample(field: str, spec: Dict[str, Any], draws: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw ``draws`` samples for one input. Supported specs:
+    {"min", "max"} (uniform), {"min", "max", "dist": "loguniform"},
+    {"min", "max", "mode"?, "dist": "triangular"}, {"mean", "std", "dist": "normal"}
+    and {"values": [...], "weights"?: [...]} (discrete).
+    """
+    dist = spec.get('dist', 'uniform')
+    if 'values' in spec:
+        try:
+            values = np.asarray(spec['values'], dtype=np.float64)
+            weights = spec.get('weights')
+            p = None if weights is None else np.asarray(weights, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid discrete distribution for '{field}'.")
+        if values.ndim != 1 or not len(values) or not np.isfinite(values).all():
+            raise ValueError(f"Discrete distribution for '{field}' needs a list of finite 'values'.")
+        if p is not None:
+            if p.shape != values.shape or not np.isfinite(p).all() or (p < 0).any() or not 0 < p.sum() < np.inf:
+                raise ValueError(f"Discrete distribution for '{field}' needs one finite, non-negative weight per value, summing to more than 0.")
+            p = p / p.sum()
+        out = rng.choice(values, size=draws, p=p)
+    elif dist == 'normal':
+        out = rng.normal(_num(spec, 'mean', field), max(_num(spec, 'std', field), 0.0), draws)
+    else:
+        lo, hi = _num(spec, 'min', field), _num(spec, 'max', field)
+        if hi < lo:
+            raise ValueError(f"Distribution for '{field}' has max < min.")
+        if dist == 'uniform':
+            out = rng.uniform(lo, hi, draws)
+        elif dist == 'loguniform':
+            if lo <= 0:
+                raise ValueError(f"Log-uniform distribution for '{field}' needs min > 0.")
+            out = np.exp(rng.uniform(np.log(lo), np.log(hi), draws))
+        elif dist == 'triangular':
+            mode = _num(spec, 'mode', field) if 'mode' in spec else (lo + hi) / 2
+            if not lo <= mode <= hi:
+                raise ValueError(f"Triangular distribution for '{field}' needs min <= mode <= max.")
+            out = rng.triangular(lo, mode, hi, draws) if hi > lo else np.full(draws, lo)
+        else:
+            raise ValueError(f"Unsupported distribution '{dist}' for '{field}'.")
+    # All simulated inputs are non-negative amounts or counts
+    out = np.maximum(out, 0.0)
+    if field in INTEGER_FIELDS:
+        # Round rather than truncate so the max of a range is drawn as often as the min
+        out = np.rint(out)
+    return out
+
+
+def simulate_scores(engine_input: Dict[str, Any], distributions: Dict[str, Dict[str, Any]],
+                    draws: int = DEFAULT_DRAWS, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Monte Carlo scoring: sample every ranged input and score all draws in one
+    ``score_batch`` call (point inputs are broadcast).
+
+    Returns the expected score, spread, P10/P50/P90 and the probability of
+    each rating bucket.
+    """
+    if not distributions:
+        raise ValueError("At least one range-valued input is required.")
+    unknown = [f for f in distributions if f not in SIMULATED_FIELDS]
+    if unknown:
+        raise ValueError(f"Unsupported distribution fields: {', '.join(unknown)}. Allowed: {', '.join(SIMULATED_FIELDS)}.")
+    max_draws = int(getattr(settings, 'MONTE_CARLO_MAX_DRAWS', 100000))
+    if not 0 < draws <= max_draws:
+        raise ValueError(f"draws must be between 1 and {max_draws}.")
+
+    rng = np.random.default_rng(seed)
+    rules = get_rules()
+    columns: Dict[str, np.ndarray] = {
+        key: np.array([value], dtype=object)
+        for key, value in engine_input.items()
+        if key in StartupScoringEngine.FIELD_DEFAULTS and key not in distributions
+    }
+    for field, spec in distributions.items():
+        columns[field] = sample(field, spec, draws, rng)
+    scored = StartupScoringEngine.score_batch(columns, rules=rules)
+
+    totals = scored['total_score']
+    p10, p50, p90 = np.percentile(totals, [10, 50, 90]).tolist()
+    counts = np.bincount(rules.rating.codes(totals), minlength=len(rules.rating.labels))
+    return {
+        'draws': draws,
+        'expected_score': round(float(totals.mean()), 2),
+        'std': round(float(totals.std()), 2),
+        'p10': p10,
+        'p50': p50,
+        'p90': p90,
+        'min_score': int(totals.min()),
+        'max_score': int(totals.max()),
+        'rating_probabilities': {
+            label: round(float(c) / draws, 4) for label, c in zip(rules.rating.labels, counts)
+        },
+        'section_expected': {
+            key: round(float(values.mean()), 2) for key, values in scored['section_scores'].items()
+        },
+    }
+
+
+def split_step_distributions(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Separate range-valued form fields from a (partial) step payload.
+
+    Returns:
+        (steps, distributions): the steps with ranged fields removed, and the
+        distribution specs keyed by engine field.
+    """
+    steps = {k: dict(payload[k]) for k in STEP_KEYS if isinstance(payload.get(k), dict)}
+    distributions: Dict[str, Dict[str, Any]] = {}
+    for field in SIMULATED_FIELDS:
+        for step, key in ENGINE_SOURCE_FIELDS[field]:
+            value = (steps.get(step) or {}).get(key)
+            if isinstance(value, dict):
+                distributions[field] = value
+                steps[step].pop(key)
+    return steps, distributions
+
+
+def simulate_steps(payload: Dict[str, Any], draws: int = DEFAULT_DRAWS, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Monte Carlo scoring for a step payload whose numeric fields may be ranges."""
+    steps, distributions = split_step_distributions(payload)
+    _, engine_input = flatten_steps(steps)
+    return simulate_scores(engine_input, distributions, draws=draws, seed=seed)
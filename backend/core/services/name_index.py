@@ -0,0 +1,284 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import difflib
+import logging
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+from core.models.evaluation import StartupEvaluation
+from core.services.query_parser import SUBSTRING_KEYWORDS, WORD_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# Trailing words dropped to form a company's short alias ("Acme Robotics Ltd" -> "acme robotics")
+LEGAL_SUFFIXES = {"ltd", "limited", "llc", "inc", "incorporated", "corp", "corporation", "co", "plc", "gmbh", "pvt", "sa", "bv"}
+
+# Question words that never identify a company on their own
+STOP_TOKENS = {
+    "a", "an", "and", "any", "are", "at", "between", "by", "can", "company", "companies", "do", "does", "for", "from",
+    "give", "have", "has", "how", "i", "in", "is", "it", "its", "me", "many", "much", "my", "of", "on", "or", "our",
+    "please", "s", "show", "startup", "startups", "tell", "that", "the", "their", "this", "to", "us", "we", "what",
+    "whats", "where", "which", "who", "with", "you", "about", "founder", "raised", "located",
+} | {kw for kw in list(SUBSTRING_KEYWORDS) + list(WORD_KEYWORDS) if kw.isalnum()}
+
+# Words dropped from "compare A and B" phrases before matching them to names
+PHRASE_STOP_TOKENS = {"compare", "between", "the", "companies", "company", "startups", "startup", "top", "of", "and"}
+
+# How many trigram-ranked names are scored exactly per phrase
+PHRASE_CANDIDATES = 32
+# Trigram postings read per phrase before the commoner trigrams are skipped
+PHRASE_POSTING_BUDGET = 5000
+PHRASE_MIN_SIMILARITY = 0.55
+
+
+def name_tokens(text: str) -> List[str]:
+    """Lower-cased alphanumeric tokens of ``text``, with accents folded."""
+    folded = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch.lower() if ch.isalnum() else " " for ch in folded if not unicodedata.combining(ch)).split()
+
+
+def normalize_name(text: str) -> str:
+    return " ".join(name_tokens(text))
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Blend of sequence similarity and token overlap between two names (0..1)."""
+    return _key_similarity(normalize_name(a), normalize_name(b))
+
+
+def _key_similarity(an: str, bn: str, at_least: float = 0.0) -> float:
+    """``name_similarity`` of two normalized names; 0.0 once it cannot exceed ``at_least``."""
+    if not an or not bn:
+        return 0.0
+    at = set(an.split())
+    bt = set(bn.split())
+    jacc = len(at & bt) / (len(at | bt) or 1)
+    matcher = difflib.SequenceMatcher(a=an, b=bn)
+    # quick_ratio() bounds ratio() from above and is much cheaper
+    if at_least and 0.6 * matcher.quick_ratio() + 0.4 * jacc <= at_least:
+        return 0.0
+    # More weight on the sequence, but keep the token overlap signal
+    return 0.6 * matcher.ratio() + 0.4 * jacc
+
+
+def mention_phrases(question: str) -> List[str]:
+    """Candidate company names in a "compare A, B and C" question, in order."""
+    q = (question or "").replace(" vs ", " and ")
+    parts: List[str] = []
+    for chunk in q.split(","):
+        parts.extend(p.strip() for p in chunk.split(" and ") if p.strip())
+    out = []
+    for p in parts:
+        tokens = [t for t in name_tokens(p) if t not in PHRASE_STOP_TOKENS]
+        if tokens:
+            out.append(" ".join(tokens))
+    return out
+
+
+def name_keys(name: str, aliases: Iterable[str] = ()) -> Tuple[str, ...]:
+    """Normalized forms a company can be found under: its name, its name without a legal suffix, and any aliases."""
+    keys: List[str] = []
+    tokens = name_tokens(name)
+    for candidate in [" ".join(tokens)] + [normalize_name(a) for a in aliases]:
+        if candidate and candidate not in keys:
+            keys.append(candidate)
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens = tokens[:-1]
+        short = " ".join(tokens)
+        if short not in keys:
+            keys.append(short)
+    return tuple(keys)
+
+
+class CompanyNameIndex:
+    """
+    In-process index of every evaluation's company name, for resolving the
+    companies a chat question mentions without scanning the candidates.
+
+    Each name (plus its legal-suffix-free form and any aliases) is posted
+    under its tokens and its character trigrams. Whole-word mentions
+    ("What is the MRR of Acme?") are resolved through the token postings;
+    fuzzy "compare A and B" phrases are narrowed through the trigram
+    postings and only the best trigram candidates are scored exactly.
+
+    Like the section-score matrix, saves and deletes update the index in
+    place (via model signals) and it is rebuilt from the database every
+    NAME_INDEX_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._refresh_at = 0.0
+        self._reset()
+        self._aliases: Dict[str, Tuple[str, ...]] = {}
+
+    def _reset(self):
+        # id -> (company_name, total_score, keys)
+        self._entries: Dict[str, Tuple[str, int, Tuple[str, ...]]] = {}
+        self._token_postings: Dict[str, Set[str]] = {}
+        self._trigram_postings: Dict[str, Set[str]] = {}
+
+    def _add(self, eid: str, name: str, score: int):
+        keys = name_keys(name, self._aliases.get(eid, ()))
+        self._entries[eid] = (name, score, keys)
+        for key in keys:
+            for token in key.split():
+                self._token_postings.setdefault(token, set()).add(eid)
+            for gram in trigrams(key):
+                self._trigram_postings.setdefault(gram, set()).add(eid)
+
+    def _discard(self, eid: str):
+        entry = self._entries.pop(eid, None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            for token in key.split():
+                posting = self._token_postings.get(token)
+                if posting is not None:
+                    posting.discard(eid)
+                    if not posting:
+                        del self._token_postings[token]
+            for gram in trigrams(key):
+                posting = self._trigram_postings.get(gram)
+                if posting is not None:
+                    posting.discard(eid)
+                    if not posting:
+                        del self._trigram_postings[gram]
+
+    def load(self, rows: Iterable[Tuple[Any, str, Any]]):
+        """Replace the index with (id, company_name, total_score) rows."""
+        # Built aside and swapped in, so lookups are not blocked during a reload
+        fresh = CompanyNameIndex()
+        fresh._aliases = dict(self._aliases)
+        for eid, name, score in rows:
+            fresh._add(str(eid), name or "", int(score or 0))
+        with self._lock:
+            self._entries = fresh._entries
+            self._token_postings = fresh._token_postings
+            self._trigram_postings = fresh._trigram_postings
+            self._loaded = True
+            self._refresh_at = time.monotonic() + float(getattr(settings, 'NAME_INDEX_REFRESH_SECONDS', 300))
+
+    def refresh(self, force: bool = False):
+        if not force and self._loaded and time.monotonic() < self._refresh_at:
+            return
+        qs = StartupEvaluation.objects.values_list('id', 'company_name', 'total_score').order_by()
+        self.load(qs.iterator(chunk_size=5000))
+        logger.info(f"[name_index] reloaded names={len(self._entries)}")
+
+    def invalidate(self):
+        with self._lock:
+            self._refresh_at = 0.0
+
+    def upsert(self, evaluation: StartupEvaluation):
+        with self._lock:
+            if not self._loaded:
+                return
+            eid = str(evaluation.id)
+            self._discard(eid)
+            self._add(eid, evaluation.company_name or "", int(evaluation.total_score or 0))
+
+    def remove(self, evaluation_id: Any):
+        with self._lock:
+            eid = str(evaluation_id)
+            self._discard(eid)
+            self._aliases.pop(eid, None)
+
+    def set_aliases(self, evaluation_id: Any, aliases: Sequence[str]):
+        """Extra names ``evaluation_id`` can be found under (kept across reloads)."""
+        with self._lock:
+            eid = str(evaluation_id)
+            self._aliases[eid] = tuple(a for a in aliases if a)
+            entry = self._entries.get(eid)
+            if entry is not None:
+                self._discard(eid)
+                self._add(eid, entry[0], entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def best_match(self, question: str) -> Optional[str]:
+        """
+        Id of the company whose name shares the most words with ``question``;
+        ties go to the shorter name, then the higher score.
+        """
+        q_tokens = {t for t in name_tokens(question) if t not in STOP_TOKENS}
+        if not q_tokens:
+            return None
+        with self._lock:
+            # Rarest words first: once the best name found shares more words than
+            # the words left to scan, no unseen name can beat or tie it.
+            postings = sorted((p for p in (self._token_postings.get(t) for t in q_tokens) if p), key=len)
+            seen: Set[str] = set()
+            best = None
+            best_rank = None
+            for i, posting in enumerate(postings):
+                for eid in posting:
+                    if eid in seen:
+                        continue
+                    seen.add(eid)
+                    name, score, keys = self._entries[eid]
+                    for key in keys:
+                        tokens = key.split()
+                        overlap = sum(1 for t in tokens if t in q_tokens)
+                        rank = (-overlap, len(tokens), -score, name)
+                        if overlap and (best_rank is None or rank < best_rank):
+                            best, best_rank = eid, rank
+                if best_rank is not None and -best_rank[0] > len(postings) - i - 1:
+                    break
+        return best
+
+    def match_phrase(self, phrase: str, exclude: Iterable[str] = (), min_similarity: float = PHRASE_MIN_SIMILARITY) -> Optional[str]:
+        """Id of the company name most similar to ``phrase``, if similar enough."""
+        key = normalize_name(phrase)
+        if not key:
+            return None
+        excluded = set(exclude)
+        with self._lock:
+            # Candidates are gathered from the rarest trigrams first, stopping at a
+            # budget: a close name shares most of the phrase's trigrams, and the
+            # commonest ones ("ing", " co") would otherwise touch most of the index.
+            postings = sorted((p for p in (self._trigram_postings.get(g) for g in trigrams(key)) if p), key=len)
+            hits: Counter = Counter()
+            touched = 0
+            for i, posting in enumerate(postings):
+                if i >= 3 and touched + len(posting) > PHRASE_POSTING_BUDGET:
+                    break
+                hits.update(posting)
+                touched += len(posting)
+            best = None
+            best_score = 0.0
+            for eid, _ in hits.most_common(PHRASE_CANDIDATES + len(excluded)):
+                if eid in excluded:
+                    continue
+                score = max(_key_similarity(key, k, best_score) for k in self._entries[eid][2])
+                if score > best_score:
+                    best, best_score = eid, score
+        return best if best is not None and best_score >= min_similarity else None
+
+    def match_phrases(self, phrases: Sequence[str]) -> List[str]:
+        """Ids matched to each phrase in order, each company at most once."""
+        matched: List[str] = []
+        for phrase in phrases:
+            eid = self.match_phrase(phrase, exclude=matched)
+            if eid is not None:
+                matched.append(eid)
+        return matched
+
+
+name_index = CompanyNameIndex()
+
+
+def get_name_index() -> CompanyNameIndex:
+    """Return the process-wide company name index, (re)loading it from the database when due."""
+    name_index.refresh()
+    return name_index
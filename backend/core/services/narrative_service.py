@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from core.models.evaluation import StartupEvaluation
+from core.repositories.evaluation_repository import EvaluationRepository
+from core.services.ai_service import SYSTEM_PROMPT
+from core.services.investor_memo import evaluation_memo
+from core.services.llm_gateway import get_gateway
+
+logger = logging.getLogger(__name__)
+
+NARRATIVE_REQUEST = (
+    "Write the investor narrative for the startup below, using only the platform memo that follows. "
+    "Use the sections Startup Overview, Financial Metrics, Risk Analysis and Key Insights."
+)
+
+
+def build_narrative_messages(memo: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"{NARRATIVE_REQUEST}\n\n{memo}"},
+    ]
+
+
+def write_narrative(evaluation_id: UUID) -> Optional[str]:
+    """
+    Generate and store the narrative of one evaluation: the model's rewrite
+    of the investor memo when a provider is configured, else the memo itself.
+    A model failure stores the memo as FAILED, so it is served until a retry
+    (``precompute_narratives --retry-failed``) replaces it.
+
+    Returns the stored narrative status, or None if the evaluation is gone.
+    """
+    evaluation = StartupEvaluation.objects.filter(id=evaluation_id).first()
+    if evaluation is None:
+        return None
+    memo = evaluation_memo(evaluation)
+    gateway = get_gateway()
+    status = StartupEvaluation.NarrativeStatus.READY
+    if gateway.available:
+        try:
+            narrative, provider = gateway.complete(
+                build_narrative_messages(memo),
+                temperature=0.2,
+                max_tokens=int(getattr(settings, 'NARRATIVE_MAX_TOKENS', 600)),
+            )
+            logger.info(f"[narrative] {provider}_ok id={evaluation_id} chars={len(narrative)}")
+        except Exception as e:
+            logger.error(f"[narrative] llm_error id={evaluation_id}: {e}")
+            narrative = memo
+            status = StartupEvaluation.NarrativeStatus.FAILED
+    else:
+        narrative = memo
+    if not EvaluationRepository.save_narrative(evaluation_id, narrative, status):
+        return None
+    return status
+
+
+class NarrativeWorker:
+    """
+    Background pool that writes narratives after an evaluation is submitted
+    or edited, off the request path. An evaluation already queued is not
+    queued twice. Jobs live in memory only: evaluations still PENDING after a
+    restart are picked up by ``manage.py precompute_narratives``.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queued = set()
+        self._counts: Dict[str, int] = {'submitted': 0, 'written': 0, 'failed': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                workers = self.workers or int(getattr(settings, 'NARRATIVE_WORKERS', 2))
+                self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='narrative')
+            return self._executor
+
+    def submit(self, evaluation_id: UUID) -> bool:
+        """Queue an evaluation; False if it is already waiting."""
+        key = str(evaluation_id)
+        with self._lock:
+            if key in self._queued:
+                return False
+            self._queued.add(key)
+            self._counts['submitted'] += 1
+        self._pool().submit(self._run, key)
+        return True
+
+    def _run(self, key: str):
+        with self._lock:
+            self._queued.discard(key)
+        close_old_connections()
+        try:
+            status = write_narrative(key)
+            with self._lock:
+                if status == StartupEvaluation.NarrativeStatus.READY:
+                    self._counts['written'] += 1
+                elif status == StartupEvaluation.NarrativeStatus.FAILED:
+                    self._counts['failed'] += 1
+        except Exception as e:
+            logger.error(f"[narrative] worker_error id={key}: {e}")
+            with self._lock:
+                self._counts['errors'] += 1
+        finally:
+            # Pool threads outlive the job; don't leave their connection open
+            connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counts, 'queued': len(self._queued)}
+
+
+narrative_worker = NarrativeWorker()
+
+
+def get_narrative_worker() -> NarrativeWorker:
+    return narrative_worker
+
+
+def schedule_narrative(evaluation_id: UUID):
+    """Queue the evaluation's narrative once the current transaction commits."""
+    transaction.on_commit(lambda: narrative_worker.submit(evaluation_id))
+
@@ -0,0 +1,227 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, NamedTuple, Optional, Tuple
+import re
+
+# Keywords are matched as plain substrings of the lower-cased question (the
+# historical behaviour of the chat intent checks); each one carries the tags
+# it contributes. Intent tags are resolved in INTENT_PRECEDENCE order.
+SUBSTRING_KEYWORDS: Dict[str, Tuple[str, ...]] = {}
+
+
+def _tag(tag: str, *keywords: str):
+    for kw in keywords:
+        SUBSTRING_KEYWORDS[kw] = SUBSTRING_KEYWORDS.get(kw, ()) + (tag,)
+
+
+_tag('unsupported', "chart", "graph", "plot")
+_tag('table', "table", "tabular", "grid", "columns")
+_tag('compare', "compare", "versus", "vs", "difference")
+_tag('list', "list", "bullet", "bulleted", "enumerate")
+_tag('rank', "top", "best", "rank", "ranking", "recommend", "suggest")
+_tag('company_profile', "about ", " about", "details", "detail", "information on", "info on", "tell me about", "who is", "what does")
+_tag('company_metric', "mrr", "revenue", "users", "active users", "paying customers", "burn", "burn rate", "stage", "score",
+     "rating", "country", "valuation", "amount raising", "funding", "growth")
+_tag('summary', "summary", "overview")
+# Ranking words that turn an unmatched company question into a rank table
+_tag('rank_hint', "top", "best", "rank", "ranking")
+# Investment vocabulary; a question with none of it is off-topic
+_tag('invest', "startup", "startups", "company", "companies", "funding", "valuation", "mrr", "revenue", "invest", "investment",
+     "cap table", "roi", "risk", "traction", "deal", "round", "growth", "users", "burn", "raise", "score", "stage", "portfolio", "list")
+# Words selecting the metric of a single-company answer
+_tag('m:mrr', "mrr", "revenue")
+_tag('m:users', "users")
+_tag('m:active', "active")
+_tag('m:paying', "paying", "customers")
+_tag('m:burn', "burn")
+_tag('m:amount', "amount")
+_tag('m:raising', "raising")
+_tag('m:stage', "stage")
+_tag('m:score', "score", "rating")
+_tag('m:country', "country", "location")
+# Anchors for "top N" and "score(s) above N"
+_tag('anchor:top', "top")
+_tag('anchor:score', "score", "scores")
+
+# Whole-word filters: stage and country names
+STAGE_ALIASES = {
+    "idea": "IDEA", "idea stage": "IDEA", "idea-stage": "IDEA",
+    "mvp": "MVP",
+    "pre-seed": "PRE_SEED", "pre seed": "PRE_SEED", "preseed": "PRE_SEED",
+    "seed": "SEED", "seed stage": "SEED", "seed-stage": "SEED",
+    "series a": "SERIES_A", "series-a": "SERIES_A",
+    "growth stage": "GROWTH", "growth-stage": "GROWTH",
+}
+COUNTRY_ALIASES = {
+    "uk": "UK", "united kingdom": "UK", "britain": "UK", "great britain": "UK", "england": "UK",
+    "us": "US", "usa": "US", "united states": "US",
+    "india": "India", "germany": "Germany", "france": "France", "canada": "Canada", "nigeria": "Nigeria",
+    "kenya": "Kenya", "pakistan": "Pakistan", "uae": "UAE", "united arab emirates": "UAE", "singapore": "Singapore",
+    "australia": "Australia", "netherlands": "Netherlands", "spain": "Spain", "brazil": "Brazil", "ireland": "Ireland",
+}
+WORD_KEYWORDS: Dict[str, Tuple[str, ...]] = {}
+for _alias, _code in STAGE_ALIASES.items():
+    WORD_KEYWORDS[_alias] = WORD_KEYWORDS.get(_alias, ()) + (f"stage:{_code}",)
+for _alias, _code in COUNTRY_ALIASES.items():
+    WORD_KEYWORDS[_alias] = WORD_KEYWORDS.get(_alias, ()) + (f"country:{_code}",)
+# "list all companies" / "every startup": a full listing rather than the default top rows
+WORD_KEYWORDS["all"] = ("anchor:all",)
+WORD_KEYWORDS["every"] = ("anchor:all",)
+
+INTENT_PRECEDENCE = ('unsupported', 'table', 'compare', 'list', 'rank', 'company_profile', 'company_metric', 'summary')
+
+
+def _trie_pattern(keywords, word_bounded: bool) -> str:
+    """
+    Regex alternation for ``keywords`` factored as a character trie, so that at
+    any position the engine follows one branch instead of trying every keyword.
+    Branches are ordered so the longest keyword wins.
+    """
+    trie: Dict[str, dict] = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if '' in node:
+            branches.append(r"\b" if word_bounded else "")
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return emit(trie)
+
+
+def _build_matcher() -> Tuple['re.Pattern', Dict[str, FrozenSet[str]]]:
+    """
+    Compile every keyword into one scanning regex.
+
+    The caller re-searches from one character past each match start, so
+    overlapping keywords are all seen. At one position only the longest keyword
+    is reported, so each keyword's tags also include those of the keywords that
+    are prefixes of it (which necessarily match at the same spot).
+    """
+    tags: Dict[str, FrozenSet[str]] = {}
+    for kw in set(SUBSTRING_KEYWORDS) | set(WORD_KEYWORDS):
+        out = set()
+        for other, other_tags in SUBSTRING_KEYWORDS.items():
+            if kw.startswith(other):
+                out.update(other_tags)
+        for other, other_tags in WORD_KEYWORDS.items():
+            if kw == other or (kw.startswith(other) and kw in WORD_KEYWORDS and not kw[len(other)].isalnum()):
+                out.update(other_tags)
+        tags[kw] = frozenset(out)
+    words = [kw for kw in WORD_KEYWORDS if kw not in SUBSTRING_KEYWORDS]
+    # Whole-word keywords are tried first; none of them is a prefix of a longer substring keyword
+    pattern = (
+        r"(?P<kw>\b" + _trie_pattern(words, True) + "|" + _trie_pattern(SUBSTRING_KEYWORDS, False) + r")"
+        r"(?:\s+(?P<cmp>(?:more|above|greater)\s+(?:than|that))\s*(?P<cmp_num>\d+)|\s+(?P<num>\d+))?"
+    )
+    return re.compile(pattern), tags
+
+
+_MATCHER, _KEYWORD_TAGS = _build_matcher()
+
+# Flag tags are folded into one bitmask per keyword; stage / country tags become values
+_BIT = {
+    tag: 1 << i
+    for i, tag in enumerate(sorted({t for tags in _KEYWORD_TAGS.values() for t in tags if not t.startswith(('stage:', 'country:'))}))
+}
+
+
+def _value(tags: FrozenSet[str], prefix: str) -> Optional[str]:
+    values = sorted(t[len(prefix):] for t in tags if t.startswith(prefix))
+    return values[0] if values else None
+
+
+_KEYWORD_INFO: Dict[str, Tuple[int, Optional[str], Optional[str]]] = {
+    kw: (
+        sum(_BIT[t] for t in tags if t in _BIT),
+        _value(tags, 'stage:'),
+        _value(tags, 'country:'),
+    )
+    for kw, tags in _KEYWORD_TAGS.items()
+}
+_INTENT_BITS = [(_BIT[i], i) for i in INTENT_PRECEDENCE]
+_METRIC_BITS = [
+    (_BIT['m:mrr'], 'mrr'),
+    (_BIT['m:users'] | _BIT['m:active'], 'active_users'),
+    (_BIT['m:paying'], 'paying_customers'),
+    (_BIT['m:burn'], 'burn_rate'),
+    (_BIT['m:amount'] | _BIT['m:raising'], 'amount_raising'),
+    (_BIT['m:stage'], 'stage'),
+    (_BIT['m:score'], 'score'),
+    (_BIT['m:country'], 'country'),
+]
+_TOP = _BIT['anchor:top']
+_SCORE = _BIT['anchor:score']
+_US = re.compile(r"\bUS\b")
+
+
+class ChatQuery(NamedTuple):
+    """Everything the deterministic chat path needs from a question, parsed once."""
+    text: str
+    intent: str
+    unsupported: Optional[str] = None
+    top_n: Optional[int] = None
+    min_score: Optional[float] = None
+    stage: Optional[str] = None
+    country: Optional[str] = None
+    metric: Optional[str] = None
+    wants_rank: bool = False
+    unrelated: bool = False
+    wants_all: bool = False
+
+
+@lru_cache(maxsize=2048)
+def parse_query(question: str) -> ChatQuery:
+    """
+    Parse a chat question in a single left-to-right regex scan.
+
+    Returns:
+        ChatQuery with the response intent ('table', 'list', 'compare', 'rank',
+        'company_profile', 'company_metric', 'summary', 'unsupported' or
+        'chat'), the "top N" count, a "score above N" threshold, stage and
+        country filters, the metric asked about, and whether every company is
+        asked for ("all", "every").
+    """
+    text = question or ""
+    mask = 0
+    top_n = None
+    min_score = None
+    stage = None
+    country = None
+    ql = text.lower()
+    search = _MATCHER.search
+    m = search(ql)
+    while m is not None:
+        kw, cmp, cmp_num, num = m.groups()
+        m = search(ql, m.start() + 1)
+        kw_mask, kw_stage, kw_country = _KEYWORD_INFO[kw]
+        mask |= kw_mask
+        if num and top_n is None and kw_mask & _TOP:
+            top_n = int(num)
+        if cmp and min_score is None and kw_mask & _SCORE:
+            min_score = float(cmp_num)
+        # The first (and so outermost, e.g. "pre-seed" over "seed") stage wins
+        if kw_stage and stage is None:
+            stage = kw_stage
+        # "us" is only a country when written "US"
+        if kw_country and country is None and (kw != "us" or _US.search(text)):
+            country = kw_country
+    intent = next((name for bit, name in _INTENT_BITS if mask & bit), 'chat')
+    return ChatQuery(
+        text=text,
+        intent=intent,
+        unsupported='chart' if intent == 'unsupported' else None,
+        top_n=top_n,
+        min_score=min_score,
+        stage=stage,
+        country=country,
+        metric=next((name for bits, name in _METRIC_BITS if mask & bits == bits), None),
+        wants_rank=bool(mask & _BIT['rank_hint']),
+        unrelated=not mask & _BIT['invest'],
+        wants_all=bool(mask & _BIT['anchor:all']),
+    )
@@ -0,0 +1,146 @@
+from typing import Dict, Any, Iterable, Optional, Tuple
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count
+
+from core.models.evaluation import StartupEvaluation
+
+logger = logging.getLogger(__name__)
+
+ALL_STAGES = '__all__'
+
+
+class _Fenwick:
+    """Binary indexed tree of counts over integer scores 0..size-1."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.total = 0
+
+    def add(self, index: int, delta: int):
+        self.total += delta
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def count_below(self, index: int) -> int:
+        """Number of entries with score < index."""
+        i = min(index, self.size)
+        out = 0
+        while i > 0:
+            out += self.tree[i]
+            i -= i & -i
+        return out
+
+    def grown(self, size: int) -> '_Fenwick':
+        bigger = _Fenwick(size)
+        for idx in range(self.size):
+            c = self.count_below(idx + 1) - self.count_below(idx)
+            if c:
+                bigger.add(idx, c)
+        return bigger
+
+
+class ScoreDistribution:
+    """
+    In-process distribution of total scores, overall and per stage.
+
+    Scores are small bounded integers, so each distribution is a Fenwick tree of
+    counts: recording a score and answering a percentile are both O(log n).
+    The state is rebuilt from a GROUP BY (stage, total_score) query every
+    SCORE_DISTRIBUTION_REFRESH_SECONDS so workers converge on other workers'
+    submits and on rescoring runs.
+    """
+
+    def __init__(self, initial_size: int = 256):
+        self._lock = threading.Lock()
+        self._initial_size = initial_size
+        self._trees: Dict[str, _Fenwick] = {}
+        self._refresh_at = 0.0
+
+    def _tree(self, key: str, score: int) -> _Fenwick:
+        tree = self._trees.get(key)
+        if tree is None:
+            tree = self._trees[key] = _Fenwick(max(self._initial_size, score + 1))
+        elif score >= tree.size:
+            tree = self._trees[key] = tree.grown(max(tree.size * 2, score + 1))
+        return tree
+
+    def _add(self, stage: Optional[str], score: int, delta: int):
+        score = max(int(score or 0), 0)
+        self._tree(ALL_STAGES, score).add(score, delta)
+        if stage:
+            self._tree(stage, score).add(score, delta)
+
+    def load(self, rows: Iterable[Tuple[Optional[str], int, int]]):
+        """Replace the state with (stage, total_score, count) rows."""
+        with self._lock:
+            self._trees = {}
+            for stage, score, count in rows:
+                self._add(stage, score, count)
+            self._refresh_at = time.monotonic() + float(getattr(settings, 'SCORE_DISTRIBUTION_REFRESH_SECONDS', 300))
+
+    def refresh(self, force: bool = False):
+        if not force and time.monotonic() < self._refresh_at:
+            return
+        rows = (
+            StartupEvaluation.objects.values_list('stage', 'total_score')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        self.load(list(rows))
+        logger.info(f"[score_distribution] reloaded total={self.count()}")
+
+    def invalidate(self):
+        with self._lock:
+            self._refresh_at = 0.0
+
+    def add(self, stage: Optional[str], score: int):
+        with self._lock:
+            self._add(stage, score, 1)
+
+    def move(self, old: Tuple[Optional[str], int], new: Tuple[Optional[str], int]):
+        """Replace one recorded (stage, score) with another, e.g. after an edit."""
+        with self._lock:
+            self._add(old[0], old[1], -1)
+            self._add(new[0], new[1], 1)
+
+    def count(self, stage: Optional[str] = None) -> int:
+        tree = self._trees.get(stage or ALL_STAGES)
+        return tree.total if tree else 0
+
+    def percentile(self, score: int, stage: Optional[str] = None, include_self: bool = True) -> Optional[float]:
+        """
+        Share (0-100) of other evaluations scoring strictly lower than ``score``.
+        ``include_self`` means ``score`` itself is already recorded.
+        """
+        with self._lock:
+            tree = self._trees.get(stage or ALL_STAGES)
+            if tree is None:
+                return None
+            others = tree.total - (1 if include_self else 0)
+            if others <= 0:
+                return None
+            below = tree.count_below(max(int(score or 0), 0))
+        return round(100.0 * below / others, 1)
+
+    def percentiles(self, score: int, stage: Optional[str]) -> Dict[str, Any]:
+        return {
+            'overall': self.percentile(score),
+            'stage': self.percentile(score, stage) if stage else None,
+            'stage_name': stage,
+        }
+
+
+score_distribution = ScoreDistribution()
+
+
+def get_score_distribution() -> ScoreDistribution:
+    """Return the process-wide distribution, (re)loading it from the database when due."""
+    score_distribution.refresh()
+    return score_distribution
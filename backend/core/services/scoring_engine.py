@@ -1,9 +1,121 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Mapping, Sequence, Optional
 from decimal import Decimal
+import datetime
+import hashlib
+import json
 import logging
 
+import numpy as np
+
+from core.services.scoring_rules import CompiledRules, DEFAULT_RULES, get_rules
+
 logger = logging.getLogger(__name__)
 
+
+def _column(columns: Mapping[str, Any], key: str, default: Any) -> np.ndarray:
+    """Return ``columns[key]`` as an array, or a length-1 column holding the engine default."""
+    if key not in columns:
+        if default is None or isinstance(default, str):
+            return np.full(1, default, dtype=object)
+        return np.full(1, default)
+    return np.asarray(columns[key])
+
+
+def _at(values: Sequence[Any], i: int) -> Any:
+    """Row ``i`` of a column that may be broadcast from length 1."""
+    return values[i] if len(values) > 1 else values[0]
+
+
+def _is_numeric(col: np.ndarray) -> bool:
+    return col.dtype.kind in 'biuf'
+
+
+def _as_float(col: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized ``float(x)`` guarded by ``except (ValueError, TypeError)``.
+    Returns (values, valid_mask).
+    """
+    if _is_numeric(col):
+        return col.astype(np.float64), np.ones(col.shape[0], dtype=bool)
+    values = np.zeros(col.shape[0], dtype=np.float64)
+    valid = np.zeros(col.shape[0], dtype=bool)
+    for i, v in enumerate(col.tolist()):
+        try:
+            values[i] = float(v)
+            valid[i] = True
+        except (ValueError, TypeError):
+            pass
+    return values, valid
+
+
+_INT_CLAMP = 2 ** 62
+
+
+def _as_int(col: np.ndarray, catch_all: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized ``int(x)`` guarded either by ``except (ValueError, TypeError)``
+    or, when ``catch_all`` is set, by a bare ``except``.
+    Returns (values, valid_mask); values are clamped to the int64 range, which
+    does not change any comparison against the engine thresholds.
+    """
+    n = col.shape[0]
+    if col.dtype.kind in 'biu':
+        return col.astype(np.int64), np.ones(n, dtype=bool)
+    if col.dtype.kind == 'f':
+        valid = ~np.isnan(col)
+        inf = np.isinf(col)
+        if inf.any():
+            if not catch_all:
+                raise OverflowError("cannot convert float infinity to integer")
+            valid &= ~inf
+        values = np.where(valid, np.clip(np.trunc(col), -_INT_CLAMP, _INT_CLAMP), 0).astype(np.int64)
+        return values, valid
+    catch = Exception if catch_all else (ValueError, TypeError)
+    values = np.zeros(n, dtype=np.int64)
+    valid = np.zeros(n, dtype=bool)
+    for i, v in enumerate(col.tolist()):
+        try:
+            iv = int(v)
+        except catch:
+            continue
+        values[i] = min(max(iv, -_INT_CLAMP), _INT_CLAMP)
+        valid[i] = True
+    return values, valid
+
+
+def _truthy(col: np.ndarray) -> np.ndarray:
+    if _is_numeric(col):
+        return col != 0
+    if col.dtype.kind in 'US':
+        return np.char.str_len(col) > 0
+    return np.fromiter((bool(v) for v in col.tolist()), dtype=bool, count=col.shape[0])
+
+
+_MESSAGE_TARGETS = (('strength', 'strengths'), ('weakness', 'weaknesses'), ('risk_flag', 'risk_flags'))
+
+
+def _tier_scores(table, values: np.ndarray, valid: np.ndarray) -> Tuple[np.ndarray, List[Tuple[str, np.ndarray, str]]]:
+    """Vectorized tier lookup: points per row (0 where invalid) plus message events."""
+    idx = table.indices(values)
+    points = np.where(valid, table.points_arr[idx], 0)
+    events = []
+    for tier, messages in enumerate(table.messages):
+        if not messages:
+            continue
+        mask = valid & (idx == tier)
+        for kind, target in _MESSAGE_TARGETS:
+            if kind in messages:
+                events.append((target, mask, messages[kind]))
+    return points, events
+
+
+def _eq(col: np.ndarray, value: str) -> np.ndarray:
+    if _is_numeric(col):
+        return np.zeros(col.shape[0], dtype=bool)
+    if col.dtype.kind == 'U':
+        return col == value
+    return np.fromiter((v == value for v in col.tolist()), dtype=bool, count=col.shape[0])
+
 class StartupScoringEngine:
     """
     Professional Scoring Engine for Startup Evaluation.
@@ -24,23 +136,74 @@ class StartupScoringEngine:
     # Scoring Constants
     MAX_SCORE = 200  # Theoretical max, though rating scales to 180+
     
-    # Rating Thresholds
-    RATING_THRESHOLDS = {
-        'HIGH_POTENTIAL': 180,
-        'STRONG': 120,
-        'MODERATE': 60,
-        'HIGH_RISK': 0
+    # Default rating thresholds; the active values come from the rule table
+    # (see core.services.scoring_rules), which can be tuned without a deploy.
+    RATING_THRESHOLDS = DEFAULT_RULES['rating_thresholds']
+
+    # Section keys (in scoring order) and their maximum points
+    SECTION_MAX = {
+        'identity': 20,
+        'market': 40,
+        'traction': 40,
+        'financials': 30,
+        'funding': 20,
+        'team': 30,
+        'exit': 20,
+    }
+
+    # Values used by the scoring modules when a field is missing from the input
+    FIELD_DEFAULTS = {
+        'company_name': None,
+        'legal_structure': None,
+        'incorporation_year': None,
+        'tam_size': 0,
+        'competition_level': None,
+        'stage': None,
+        'active_users': 0,
+        'mrr': 0,
+        'burn_rate': 0,
+        'funding_raised': 0,
+        'founders_count': 1,
+        'has_technical_founder': False,
+        'team_size': 1,
+        'exit_strategy': None,
+    }
+
+    FORMAL_LEGAL_STRUCTURES = ('C-Corp', 'LLC', 'LTD', 'Pvt Ltd')
+
+    # Engine input fields read by each scoring module
+    SECTION_FIELDS = {
+        'identity': ('company_name', 'legal_structure', 'incorporation_year'),
+        'market': ('tam_size', 'competition_level'),
+        'traction': ('stage', 'active_users'),
+        'financials': ('mrr', 'burn_rate'),
+        'funding': ('funding_raised',),
+        'team': ('founders_count', 'has_technical_founder', 'team_size'),
+        'exit': ('exit_strategy',),
+    }
+
+    SECTION_METHODS = {
+        'identity': '_score_identity',
+        'market': '_score_market',
+        'traction': '_score_traction',
+        'financials': '_score_financial',
+        'funding': '_score_funding',
+        'team': '_score_team',
+        'exit': '_score_exit',
     }
 
-    def __init__(self, data: Dict[str, Any]):
+    def __init__(self, data: Dict[str, Any], rules: Optional[CompiledRules] = None):
         """
         Initialize the scoring engine with validated data.
         
         Args:
             data: A dictionary containing all the startup data points 
                   (flattened or nested as per the form structure).
+            rules: Optional compiled rule table; defaults to the active one.
         """
         self.data = data
+        self.rules = rules
+        self._rules: CompiledRules = rules or get_rules()
         self._total_score = 0
         self._risk_flags: List[str] = []
         self._strengths: List[str] = []
@@ -59,7 +222,8 @@ class StartupScoringEngine:
             - strengths (list)
             - weaknesses (list)
         """
-        # Reset state
+        # Reset state (pin one rule table for the whole evaluation)
+        self._rules = self.rules or get_rules()
         self._total_score = 0
         self._risk_flags = []
         self._strengths = []
@@ -86,18 +250,305 @@ class StartupScoringEngine:
             'section_scores': self._section_scores
         }
 
+    def section_fingerprints(self, rules: Optional[CompiledRules] = None) -> Dict[str, str]:
+        """
+        Fingerprint the inputs of every section. A section only needs rescoring
+        when its fingerprint changes; the active rule table is part of every
+        fingerprint, and the current year is part of the identity one.
+        """
+        rules = rules or self.rules or get_rules()
+        out: Dict[str, str] = {}
+        for key, fields in self.SECTION_FIELDS.items():
+            payload: Dict[str, Any] = {f: self.data.get(f, self.FIELD_DEFAULTS[f]) for f in fields}
+            payload['_rules'] = rules.fingerprint
+            if key == 'identity':
+                payload['_year'] = datetime.datetime.now().year
+            raw = json.dumps(payload, sort_keys=True, default=repr)
+            out[key] = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+        return out
+
+    def calculate_sections(self, sections: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Score only the requested sections (all by default), in engine order.
+        
+        Returns:
+            Dict of section -> {score, outOf, strengths, weaknesses, risk_flags}
+        """
+        self._rules = self.rules or get_rules()
+        return self._calculate_sections(self.SECTION_MAX if sections is None else sections)
+
+    def _calculate_sections(self, sections: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Score the given sections with the already pinned rule table."""
+        wanted = set(sections)
+        out: Dict[str, Dict[str, Any]] = {}
+        for key, method in self.SECTION_METHODS.items():
+            if key not in wanted:
+                continue
+            self._total_score = 0
+            self._risk_flags = []
+            self._strengths = []
+            self._weaknesses = []
+            getattr(self, method)()
+            out[key] = {
+                **self._section_scores[key],
+                'strengths': self._strengths,
+                'weaknesses': self._weaknesses,
+                'risk_flags': self._risk_flags,
+            }
+        return out
+
+    def calculate_incremental(self, section_scores: Optional[Dict[str, Any]] = None,
+                              section_details: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any], List[str]]:
+        """
+        Like ``calculate()``, but reuses the stored results of every section whose
+        input fingerprint is unchanged.
+        
+        Args:
+            section_scores: Stored {section: {score, outOf}} from a previous run.
+            section_details: Stored {section: {fingerprint, strengths, weaknesses, risk_flags}}.
+            
+        Returns:
+            (result, section_details, recomputed_sections) where result has the
+            same shape as ``calculate()``.
+        """
+        section_scores = section_scores or {}
+        section_details = section_details or {}
+        self._rules = self.rules or get_rules()
+        fingerprints = self.section_fingerprints(self._rules)
+        stale = [
+            key for key in self.SECTION_MAX
+            if key not in section_scores
+            or (section_details.get(key) or {}).get('fingerprint') != fingerprints[key]
+        ]
+        fresh = self._calculate_sections(stale)
+
+        scores: Dict[str, Dict[str, int]] = {}
+        details: Dict[str, Dict[str, Any]] = {}
+        result: Dict[str, Any] = {'risk_flags': [], 'strengths': [], 'weaknesses': []}
+        for key in self.SECTION_MAX:
+            section = fresh[key] if key in fresh else {**section_details[key], **section_scores[key]}
+            scores[key] = {'score': int(section['score']), 'outOf': int(section['outOf'])}
+            details[key] = {'fingerprint': fingerprints[key]}
+            for kind in ('strengths', 'weaknesses', 'risk_flags'):
+                details[key][kind] = list(section.get(kind) or [])
+                result[kind].extend(details[key][kind])
+        total = sum(s['score'] for s in scores.values())
+        result['total_score'] = int(total)
+        result['rating'] = self._rules.rating.rating(total)
+        result['section_scores'] = scores
+        return result, details, stale
+
+    @classmethod
+    def columns_from_records(cls, records: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Convert a list of engine input dicts into the columnar layout accepted by
+        ``score_batch``. Missing keys take the same defaults ``calculate()`` uses.
+        """
+        n = len(records)
+        columns: Dict[str, np.ndarray] = {}
+        for key, default in cls.FIELD_DEFAULTS.items():
+            col = np.empty(n, dtype=object)
+            col[:] = [r.get(key, default) for r in records]
+            columns[key] = col
+        return columns
+
+    @classmethod
+    def score_batch(cls, columns: Mapping[str, Any], include_details: bool = False,
+                    rules: Optional[CompiledRules] = None) -> Dict[str, Any]:
+        """
+        Score many startups at once from columnar inputs.
+
+        Args:
+            columns: Mapping of engine field name -> 1-D array (or sequence) with one
+                     entry per startup; length-1 columns are broadcast to every row.
+                     Absent fields use ``FIELD_DEFAULTS``.
+            include_details: Also materialize per-row strengths, weaknesses and risk
+                             flags (skipped by default as it is the costly part).
+            rules: Optional compiled rule table; defaults to the active one.
+
+        Returns:
+            Dict containing:
+            - total_score (int64 ndarray)
+            - rating (object ndarray of rating labels)
+            - section_scores (dict of section -> int64 ndarray)
+            - risk_flags, strengths, weaknesses (list of lists, only with include_details)
+            - section_messages (only with include_details): section -> {risk_flags,
+              strengths, weaknesses} -> list of lists, the same messages split by section
+
+        Results are identical to calling ``calculate()`` on each row.
+        """
+        present = [np.asarray(v) for v in columns.values()]
+        n = max((c.shape[0] for c in present if c.ndim == 1), default=0)
+        if any(c.ndim != 1 or c.shape[0] not in (1, n) for c in present):
+            raise ValueError("score_batch columns must be 1-D with equal length (or length 1 to broadcast).")
+
+        def col(key: str) -> np.ndarray:
+            return _column(columns, key, cls.FIELD_DEFAULTS[key])
+
+        rules = rules or get_rules()
+        zeros = np.zeros(n, dtype=np.int64)
+        # Each event is (list name, mask, message or per-row message builder)
+        events: List[Tuple[str, np.ndarray, Any]] = []
+        # (section, number of events once it is scored), in engine order
+        section_ends: List[Tuple[str, int]] = []
+
+        # Identity
+        company_name = col('company_name')
+        legal_structure = col('legal_structure')
+        incorporation_year = col('incorporation_year')
+        name_ok = np.fromiter(
+            (bool(v and len(v) > 2) for v in company_name.tolist()), dtype=bool, count=company_name.shape[0]
+        )
+        ls_formal = np.zeros(legal_structure.shape[0], dtype=bool)
+        for structure in cls.FORMAL_LEGAL_STRUCTURES:
+            ls_formal |= _eq(legal_structure, structure)
+        ls_other = ~ls_formal & _truthy(legal_structure)
+        iy_set = _truthy(incorporation_year)
+        years_active = np.zeros(incorporation_year.shape[0], dtype=np.int64)
+        if iy_set.any():
+            current_year = datetime.datetime.now().year
+            years_active[iy_set] = [current_year - int(v) for v in incorporation_year[iy_set].tolist()]
+        operating = iy_set & (years_active > 1)
+        identity = 5 * name_ok + np.where(ls_formal, 10, np.where(ls_other, 5, 0)) + 5 * operating
+        ls_values = legal_structure.tolist()
+        events += [
+            ('strengths', ls_formal, lambda i: f"Formal legal structure: {_at(ls_values, i)}"),
+            ('risk_flags', ~ls_formal & ~ls_other, "No legal structure defined"),
+            ('strengths', operating, lambda i: f"Operating for {_at(years_active, i)}+ years"),
+            ('risk_flags', iy_set & (years_active < 0), "Invalid incorporation year"),
+        ]
+        section_ends.append(('identity', len(events)))
+
+        # Market
+        tam, tam_ok = _as_float(col('tam_size'))
+        competition = col('competition_level')
+        comp_low = _eq(competition, 'Low')
+        comp_med = _eq(competition, 'Medium')
+        comp_high = _eq(competition, 'High')
+        tam_pts, tam_events = _tier_scores(rules.tam, tam, tam_ok)
+        market = tam_pts + np.where(comp_low, 20, np.where(comp_med, 10, np.where(comp_high, 5, 0)))
+        events += tam_events
+        events += [
+            ('strengths', comp_low, "First-mover advantage or low competition"),
+            ('risk_flags', comp_high, "High market competition"),
+        ]
+        section_ends.append(('market', len(events)))
+
+        # Traction
+        stage = col('stage')
+        stage_pts = zeros.copy()
+        for key in rules.stage.keys:
+            st_mask = _eq(stage, key)
+            stage_pts += rules.stage.points[key] * st_mask
+            for kind, target in _MESSAGE_TARGETS:
+                if kind in rules.stage.messages[key]:
+                    events.append((target, st_mask, rules.stage.messages[key][kind]))
+        st_idea = _eq(stage, 'IDEA')
+        users, users_ok = _as_int(col('active_users'))
+        user_pts, user_events = _tier_scores(rules.users, users.astype(np.float64), users_ok)
+        traction = stage_pts + user_pts
+        events += user_events
+        events += [
+            ('weaknesses', users_ok & (users <= 0) & ~st_idea, "Low user traction for current stage"),
+        ]
+        section_ends.append(('traction', len(events)))
+
+        # Financial
+        mrr, mrr_ok = _as_float(col('mrr'))
+        burn, burn_ok = _as_float(col('burn_rate'))
+        mrr_pts, mrr_events = _tier_scores(rules.mrr, mrr, mrr_ok)
+        burn_checked = mrr_ok & burn_ok & (burn > 0) & (mrr > 0)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            runway = np.where(burn_checked, mrr / np.where(burn_checked, burn, 1.0), 0.0)
+        high_burn = burn_checked & (runway < 0.5)
+        healthy = burn_checked & (runway > 1.5)
+        financials = mrr_pts + 10 * healthy
+        events += mrr_events
+        events += [
+            ('risk_flags', high_burn, "High Burn Rate relative to Revenue"),
+            ('strengths', healthy, "Healthy Cash Flow Management"),
+        ]
+        section_ends.append(('financials', len(events)))
+
+        # Funding
+        raised, raised_ok = _as_float(col('funding_raised'))
+        funding, funding_events = _tier_scores(rules.funding, raised, raised_ok)
+        events += funding_events
+        section_ends.append(('funding', len(events)))
+
+        # Team
+        founders, founders_ok = _as_int(col('founders_count'), catch_all=True)
+        technical = _truthy(col('has_technical_founder'))
+        team_size, team_size_ok = _as_int(col('team_size'), catch_all=True)
+        cofounders = founders_ok & (founders > 1)
+        team = 10 * cofounders + 10 * technical + 10 * (team_size_ok & (team_size > 5))
+        events += [
+            ('strengths', cofounders, "Co-founder team (Reduced founder risk)"),
+            ('risk_flags', founders_ok & ~(founders > 1), "Solo Founder (Key person risk)"),
+            ('strengths', technical, "Technical Founder present"),
+            ('weaknesses', ~technical, "Missing Technical Leadership"),
+        ]
+        section_ends.append(('team', len(events)))
+
+        # Exit
+        exit_strategy = col('exit_strategy')
+        ex_ipo = _eq(exit_strategy, 'IPO')
+        ex_acq = _eq(exit_strategy, 'Acquisition')
+        ex_other = ~ex_ipo & ~ex_acq & _truthy(exit_strategy)
+        exit_score = 20 * ex_ipo + 15 * ex_acq + 10 * ex_other
+        events += [
+            ('strengths', ex_ipo, "Ambitious Exit Strategy (IPO)"),
+            ('strengths', ex_acq, "Clear Exit Path (Acquisition)"),
+            ('weaknesses', ~ex_ipo & ~ex_acq & ~ex_other, "Undefined Exit Strategy"),
+        ]
+        section_ends.append(('exit', len(events)))
+
+        section_scores = {
+            'identity': identity,
+            'market': market,
+            'traction': traction,
+            'financials': financials,
+            'funding': funding,
+            'team': team,
+            'exit': exit_score,
+        }
+        section_scores = {k: np.broadcast_to(np.asarray(v, dtype=np.int64), (n,)).copy() for k, v in section_scores.items()}
+        total = sum(section_scores.values(), zeros.copy())
+
+        result: Dict[str, Any] = {
+            'total_score': total,
+            'rating': rules.rating.ratings(total),
+            'section_scores': section_scores,
+        }
+        if include_details:
+            # Messages per section and row; the flat lists join them in engine order, as calculate() does
+            kinds = ('risk_flags', 'strengths', 'weaknesses')
+            by_section: Dict[str, Dict[str, List[List[str]]]] = {}
+            start = 0
+            for key, end in section_ends:
+                lists = by_section[key] = {kind: [[] for _ in range(n)] for kind in kinds}
+                for target, mask, message in events[start:end]:
+                    rows = lists[target]
+                    for i in np.flatnonzero(np.broadcast_to(mask, (n,))).tolist():
+                        rows[i].append(message(i) if callable(message) else message)
+                start = end
+            for kind in kinds:
+                result[kind] = [[m for key, _ in section_ends for m in by_section[key][kind][i]] for i in range(n)]
+            result['section_messages'] = by_section
+        return result
+
     def _determine_rating(self) -> str:
         """Determines the rating label based on the total score."""
-        score = self._total_score
-        
-        if score >= self.RATING_THRESHOLDS['HIGH_POTENTIAL']:
-            return 'HIGH_POTENTIAL'
-        elif score >= self.RATING_THRESHOLDS['STRONG']:
-            return 'STRONG'
-        elif score >= self.RATING_THRESHOLDS['MODERATE']:
-            return 'MODERATE'
-        else:
-            return 'HIGH_RISK'
+        return self._rules.rating.rating(self._total_score)
+
+    def _apply_messages(self, messages: Dict[str, str]):
+        """Record the strength / weakness / risk flag attached to a rule tier."""
+        if 'strength' in messages:
+            self._strengths.append(messages['strength'])
+        if 'weakness' in messages:
+            self._weaknesses.append(messages['weakness'])
+        if 'risk_flag' in messages:
+            self._risk_flags.append(messages['risk_flag'])
 
     def _add_score(self, points: int, reason: str = None):
         """Helper to add score and log reason if needed."""
@@ -150,20 +601,12 @@ class StartupScoringEngine:
         tam = self.data.get('tam_size', 0)  # Total Addressable Market in millions
         competition = self.data.get('competition_level') # High, Medium, Low
         
-        # Market Size Logic
+        # Market Size Logic (TAM tiers from the rule table)
         try:
             tam_val = float(tam)
-            if tam_val > 1000: # > 1 Billion
-                score += 20
-                self._strengths.append("Massive Market Potential (>1B)")
-            elif tam_val > 100: # > 100 Million
-                score += 15
-                self._strengths.append("Large Market Potential (>100M)")
-            elif tam_val > 10:
-                score += 10
-            else:
-                score += 5
-                self._weaknesses.append("Niche or Small Market Size")
+            tier = self._rules.tam.index(tam_val)
+            score += self._rules.tam.points[tier]
+            self._apply_messages(self._rules.tam.messages[tier])
         except (ValueError, TypeError):
             pass # Handle missing or invalid data gracefully
 
@@ -190,35 +633,19 @@ class StartupScoringEngine:
         users = self.data.get('active_users', 0)
         
         # Stage Scoring
-        if stage == 'GROWTH':
-            score += 20
-            self._strengths.append("In Growth Stage")
-        elif stage == 'SERIES_A':
-            score += 18
-        elif stage == 'SEED':
-            score += 15
-        elif stage == 'MVP':
-            score += 10
-            self._strengths.append("MVP Launched")
-        elif stage == 'IDEA':
-            score += 2
-            self._weaknesses.append("Still in Idea Stage")
+        stage_key = self._rules.stage.get(stage)
+        if stage_key is not None:
+            score += self._rules.stage.points[stage_key]
+            self._apply_messages(self._rules.stage.messages[stage_key])
             
         # User Traction
         try:
             user_count = int(users)
-            if user_count > 10000:
-                score += 20
-                self._strengths.append("Significant User Traction (>10k users)")
-            elif user_count > 1000:
-                score += 15
-            elif user_count > 100:
-                score += 10
-            elif user_count > 0:
-                score += 5
-            else:
-                if stage not in ['IDEA']:
-                     self._weaknesses.append("Low user traction for current stage")
+            tier = self._rules.users.index(user_count)
+            score += self._rules.users.points[tier]
+            self._apply_messages(self._rules.users.messages[tier])
+            if user_count <= 0 and stage not in ['IDEA']:
+                self._weaknesses.append("Low user traction for current stage")
         except (ValueError, TypeError):
             pass
 
@@ -236,17 +663,9 @@ class StartupScoringEngine:
         
         try:
             mrr_val = float(mrr)
-            if mrr_val > 50000:
-                score += 20
-                self._strengths.append("Strong MRR (>$50k)")
-            elif mrr_val > 10000:
-                score += 15
-            elif mrr_val > 1000:
-                score += 10
-            elif mrr_val > 0:
-                score += 5
-            else:
-                self._weaknesses.append("Pre-revenue")
+            tier = self._rules.mrr.index(mrr_val)
+            score += self._rules.mrr.points[tier]
+            self._apply_messages(self._rules.mrr.messages[tier])
                 
             # Burn Rate Check
             burn_val = float(burn_rate)
@@ -274,18 +693,10 @@ class StartupScoringEngine:
         
         try:
             raised_val = float(raised)
-            if raised_val > 1000000:
-                score += 20
-                self._strengths.append("Proven Fundraising Ability (>$1M)")
-            elif raised_val > 100000:
-                score += 15
-            elif raised_val > 0:
-                score += 10
-            else:
-                # Bootstrapped can be good too depending on context, 
-                # but for scoring "funding" strictly:
-                score += 5 
-                self._strengths.append("Bootstrapped / Capital Efficient")
+            # Bootstrapped (the floor tier) can be good too depending on context
+            tier = self._rules.funding.index(raised_val)
+            score += self._rules.funding.points[tier]
+            self._apply_messages(self._rules.funding.messages[tier])
         except (ValueError, TypeError):
             pass
             
@@ -0,0 +1,96 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import json
+import threading
+
+from django.conf import settings
+
+from core.services.engine_input import STEP_KEYS, flatten_steps, provided_fields, readable_steps
+from core.services.scoring_engine import StartupScoringEngine
+from core.services.scoring_rules import get_rules
+
+
+class LRUCache:
+    """Small thread-safe LRU map."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_preview_cache = LRUCache(int(getattr(settings, 'SCORING_PREVIEW_CACHE_SIZE', 4096)))
+
+
+def _cache_key(engine_input: Dict[str, Any], rules_fingerprint: str) -> str:
+    return rules_fingerprint + json.dumps(engine_input, sort_keys=True, default=str, separators=(',', ':'))
+
+
+def preview_score(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Score a partial step1..step8 payload without touching the database.
+    Results are memoized on the normalized engine input, so keystrokes that do
+    not change any scored field are served from the cache.
+
+    Returns:
+        (result, cached)
+    """
+    # A draft is often half-typed: answers the engine cannot read count as not given yet
+    steps = readable_steps({k: payload.get(k) for k in STEP_KEYS if isinstance(payload.get(k), dict)})
+    _, engine_input = flatten_steps(steps)
+    # Fields with no scoring effect must not fragment the cache
+    engine_input.pop('country', None)
+    rules = get_rules()
+    # Which sections were answered depends on the payload, not the engine input (an empty stage
+    # scores like 'IDEA'), so it is worked out per call rather than cached with the score
+    provided = provided_fields(steps)
+    answered = [
+        section for section, fields in StartupScoringEngine.SECTION_FIELDS.items()
+        if provided.intersection(fields)
+    ]
+    key = _cache_key(engine_input, rules.fingerprint)
+    scored = _preview_cache.get(key)
+    cached = scored is not None
+    if not cached:
+        score = StartupScoringEngine(engine_input, rules=rules).calculate()
+        scored = {k: score[k] for k in ('total_score', 'rating', 'section_scores', 'strengths', 'weaknesses', 'risk_flags')}
+        _preview_cache.set(key, scored)
+    result = {
+        'total_score': scored['total_score'],
+        'rating': scored['rating'],
+        'section_scores': scored['section_scores'],
+        'answered_sections': answered,
+        'strengths': scored['strengths'],
+        'weaknesses': scored['weaknesses'],
+        'risk_flags': scored['risk_flags'],
+    }
+    return result, cached
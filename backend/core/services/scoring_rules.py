@@ -0,0 +1,223 @@
+from typing import Dict, Any, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Declarative scoring rule table.
+#
+# "tiers" map a numeric engine field to strictly-greater-than breakpoints: a value
+# scores the points of the highest tier whose "above" it exceeds, otherwise the
+# "floor". Any tier may carry a strength / weakness / risk_flag message.
+# "stage_points" map a stage value to points (plus optional messages).
+# "rating_thresholds" map a rating label to the minimum total score for it.
+DEFAULT_RULES: Dict[str, Any] = {
+    'tiers': {
+        'tam_size': {
+            'floor': {'points': 5, 'weakness': "Niche or Small Market Size"},
+            'above': [
+                {'value': 10, 'points': 10},
+                {'value': 100, 'points': 15, 'strength': "Large Market Potential (>100M)"},
+                {'value': 1000, 'points': 20, 'strength': "Massive Market Potential (>1B)"},
+            ],
+        },
+        'active_users': {
+            'floor': {'points': 0},
+            'above': [
+                {'value': 0, 'points': 5},
+                {'value': 100, 'points': 10},
+                {'value': 1000, 'points': 15},
+                {'value': 10000, 'points': 20, 'strength': "Significant User Traction (>10k users)"},
+            ],
+        },
+        'mrr': {
+            'floor': {'points': 0, 'weakness': "Pre-revenue"},
+            'above': [
+                {'value': 0, 'points': 5},
+                {'value': 1000, 'points': 10},
+                {'value': 10000, 'points': 15},
+                {'value': 50000, 'points': 20, 'strength': "Strong MRR (>$50k)"},
+            ],
+        },
+        'funding_raised': {
+            'floor': {'points': 5, 'strength': "Bootstrapped / Capital Efficient"},
+            'above': [
+                {'value': 0, 'points': 10},
+                {'value': 100000, 'points': 15},
+                {'value': 1000000, 'points': 20, 'strength': "Proven Fundraising Ability (>$1M)"},
+            ],
+        },
+    },
+    'stage_points': {
+        'GROWTH': {'points': 20, 'strength': "In Growth Stage"},
+        'SERIES_A': {'points': 18},
+        'SEED': {'points': 15},
+        'MVP': {'points': 10, 'strength': "MVP Launched"},
+        'IDEA': {'points': 2, 'weakness': "Still in Idea Stage"},
+    },
+    'rating_thresholds': {
+        'HIGH_POTENTIAL': 180,
+        'STRONG': 120,
+        'MODERATE': 60,
+        'HIGH_RISK': 0,
+    },
+}
+
+MESSAGE_KINDS = ('strength', 'weakness', 'risk_flag')
+
+
+class TierTable:
+    """
+    A numeric tier ladder compiled into a sorted breakpoint array.
+    Tier index 0 is the floor; index k + 1 means "above breakpoint k".
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        above = sorted(spec.get('above') or [], key=lambda t: float(t['value']))
+        floor = spec.get('floor') or {}
+        tiers = [floor] + above
+        self.breakpoints: List[float] = [float(t['value']) for t in above]
+        if len(set(self.breakpoints)) != len(self.breakpoints):
+            raise ValueError("Duplicate tier breakpoints")
+        self.points: List[int] = [int(t.get('points', 0)) for t in tiers]
+        self.messages: List[Dict[str, str]] = [
+            {k: t[k] for k in MESSAGE_KINDS if t.get(k)} for t in tiers
+        ]
+        self.breakpoints_arr = np.array(self.breakpoints, dtype=np.float64)
+        self.points_arr = np.array(self.points, dtype=np.int64)
+
+    def index(self, value: float) -> int:
+        # bisect_left counts breakpoints strictly below value; NaN lands on the floor
+        return bisect_left(self.breakpoints, value)
+
+    def indices(self, values: np.ndarray) -> np.ndarray:
+        idx = np.searchsorted(self.breakpoints_arr, values, side='left')
+        return np.where(np.isnan(values), 0, idx)
+
+
+class CategoryTable:
+    """Points (and optional messages) per categorical value."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.keys: List[str] = list(spec.keys())
+        self.points: Dict[str, int] = {k: int(v.get('points', 0)) for k, v in spec.items()}
+        self.messages: Dict[str, Dict[str, str]] = {
+            k: {m: v[m] for m in MESSAGE_KINDS if v.get(m)} for k, v in spec.items()
+        }
+
+    def get(self, value: Any) -> Optional[str]:
+        """Return the matching category key, or None."""
+        if isinstance(value, str) and value in self.points:
+            return value
+        return None
+
+
+class RatingTable:
+    """Rating thresholds compiled into an ascending breakpoint array."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        ordered = sorted(spec.items(), key=lambda kv: kv[1])
+        self.labels: List[str] = [k for k, _ in ordered]
+        self.thresholds: List[int] = [int(v) for _, v in ordered]
+        self.labels_arr = np.array(self.labels, dtype=object)
+        self.thresholds_arr = np.array(self.thresholds, dtype=np.int64)
+
+    def rating(self, score: int) -> str:
+        return self.labels[max(bisect_right(self.thresholds, score) - 1, 0)]
+
+    def codes(self, scores: np.ndarray) -> np.ndarray:
+        """Index into ``labels`` for every score."""
+        idx = np.searchsorted(self.thresholds_arr, scores, side='right') - 1
+        return np.maximum(idx, 0)
+
+    def ratings(self, scores: np.ndarray) -> np.ndarray:
+        return self.labels_arr[self.codes(scores)]
+
+
+class CompiledRules:
+    """Immutable, compiled form of a rule table."""
+
+    def __init__(self, rules: Dict[str, Any]):
+        self.source = rules
+        self.fingerprint = hashlib.sha1(
+            json.dumps(rules, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:16]
+        tiers = rules['tiers']
+        self.tam = TierTable(tiers['tam_size'])
+        self.users = TierTable(tiers['active_users'])
+        self.mrr = TierTable(tiers['mrr'])
+        self.funding = TierTable(tiers['funding_raised'])
+        self.stage = CategoryTable(rules['stage_points'])
+        self.rating = RatingTable(rules['rating_thresholds'])
+
+
+def merge_rules(overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Overlay a (possibly partial) rule table on top of DEFAULT_RULES."""
+    merged = copy.deepcopy(DEFAULT_RULES)
+    for key, value in (overrides or {}).items():
+        if key == 'tiers' and isinstance(value, dict):
+            merged['tiers'].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+
+_lock = threading.Lock()
+_active = CompiledRules(DEFAULT_RULES)
+_source_stamp: Optional[Tuple[str, float, int]] = None
+_next_check = 0.0
+
+
+def _rules_path() -> str:
+    return getattr(settings, 'SCORING_RULES_FILE', '') or ''
+
+
+def reload_rules(force: bool = False) -> CompiledRules:
+    """
+    Re-read the rule file if it changed and atomically swap the active table.
+    A malformed file is logged and the previous table stays in effect.
+    """
+    global _active, _source_stamp, _next_check
+    with _lock:
+        _next_check = time.monotonic() + float(getattr(settings, 'SCORING_RULES_CHECK_SECONDS', 5))
+        path = _rules_path()
+        stamp = None
+        if path:
+            try:
+                st = os.stat(path)
+                stamp = (path, st.st_mtime, st.st_size)
+            except OSError:
+                logger.error(f"[scoring_rules] rule file not found: {path}")
+                return _active
+        if stamp == _source_stamp and not force:
+            return _active
+        try:
+            if stamp is None:
+                compiled = CompiledRules(DEFAULT_RULES)
+            else:
+                with open(path, 'r', encoding='utf-8') as fh:
+                    compiled = CompiledRules(merge_rules(json.load(fh)))
+        except Exception as e:
+            logger.error(f"[scoring_rules] failed to load {path}: {e}")
+            return _active
+        if compiled.fingerprint != _active.fingerprint:
+            logger.info(f"[scoring_rules] loaded rule table {compiled.fingerprint}")
+        _active = compiled
+        _source_stamp = stamp
+        return _active
+
+
+def get_rules() -> CompiledRules:
+    """Return the active compiled rule table, checking the rule file at most every few seconds."""
+    if time.monotonic() < _next_check:
+        return _active
+    return reload_rules()
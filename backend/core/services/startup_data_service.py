@@ -1,7 +1,15 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List
 from core.models.evaluation import StartupEvaluation
+from core.models.investor_profile import WeightingProfile
 from django.db.models import QuerySet
 from core.repositories.evaluation_repository import EvaluationRepository
+from django.conf import settings
+from core.services.answer_renderer import Row
+from core.services.context_planner import ContextPlan, apply_plan, plan_context
+from core.services.name_index import get_name_index, mention_phrases
+from core.services.query_parser import ChatQuery
+from core.services.text_index import get_text_index
+from core.services.weighted_ranking import get_section_matrix
 
 
 def _safe_str(x: Any) -> str:
@@ -49,40 +57,144 @@ def _serialize_eval(e: StartupEvaluation) -> Dict[str, Any]:
         "rating": e.rating,
     }
 
-def fetch_investor_context(user, query: str, *, ids: List[str] | None = None, stage: str | None = None, min_score: int | None = None, limit: int = 10) -> Dict[str, Any]:
+def profile_weights(user, profile_id: Any = None) -> Dict[str, float] | None:
+    """
+    Weights of the investor's requested weighting profile, or of their default
+    profile when none is requested. None means rank by total_score.
+    """
+    if not getattr(user, "is_authenticated", False):
+        return None
+    qs = WeightingProfile.objects.filter(investor=user)
+    if profile_id:
+        try:
+            profile = qs.filter(id=int(profile_id)).first()
+        except (TypeError, ValueError):
+            profile = None
+    else:
+        profile = qs.filter(is_default=True).first()
+    return profile.weights if profile else None
+
+def _company_row(e: StartupEvaluation) -> Dict[str, Any]:
+    fd = e.form_data or {}
+    return {
+        "id": str(e.id),
+        "name": e.company_name,
+        "stage": e.stage,
+        "country": e.country,
+        "score": e.total_score,
+        "rating": e.rating,
+        "mrr": _get_field(fd, "monthlyRevenue"),
+        "active_users": _get_field(fd, "activeUsers"),
+        "paying_customers": _get_field(fd, "payingCustomers"),
+        "burn_rate": _get_field(fd, "burnRate"),
+        "amount_raising": _get_field(fd, "amountRaising"),
+    }
+
+def fetch_mentioned_companies(question: str, chat_query: ChatQuery) -> List[Dict[str, Any]]:
+    """
+    Companies the question names, resolved against every evaluation on the
+    platform through the name index; only the matched rows are loaded.
+    """
+    index = get_name_index()
+    if chat_query.intent == "compare":
+        ids = index.match_phrases(mention_phrases(question))
+    elif chat_query.intent in ("company_profile", "company_metric"):
+        best = index.best_match(question)
+        ids = [best] if best else []
+    else:
+        return []
+    if not ids:
+        return []
+    by_id = {str(k): v for k, v in StartupEvaluation.objects.in_bulk(ids).items()}
+    return [_company_row(by_id[i]) for i in ids if i in by_id]
+
+# Open questions that also get the companies whose free text matches them
+RELEVANT_INTENTS = ("chat",)
+
+def fetch_relevant_companies(question: str, plan: ContextPlan) -> List[Dict[str, Any]]:
+    """
+    Up to ``plan.limit`` companies whose free-text answers (problem,
+    solution, vision, ...) are most similar to the question, whatever their
+    score, found through the text index and narrowed by the plan's filters.
+    """
+    filtered = bool(plan.stage or plan.country or plan.min_score is not None)
+    # Filters drop some hits after the search, so ask for more
+    hits = get_text_index().search(question, k=plan.limit * 3 if filtered else plan.limit)
+    if not hits:
+        return []
+    qs = StartupEvaluation.objects.filter(id__in=[eid for eid, _ in hits])
+    if filtered:
+        qs = apply_plan(qs, plan, limit=False)
+    by_id = {str(e.id): e for e in qs}
+    rows = []
+    for eid, similarity in hits:
+        if eid in by_id and len(rows) < plan.limit:
+            rows.append(_company_row(by_id[eid]))
+            rows[-1]["relevance"] = similarity
+    return rows
+
+def fetch_investor_context(user, query: str, *, ids: List[str] | None = None, stage: str | None = None, min_score: int | None = None, limit: int | None = None, weights: Dict[str, float] | None = None, chat_query: ChatQuery | None = None) -> Dict[str, Any]:
     """
     Returns structured context for investor QA strictly from platform data.
+
+    Rows come from one query planned from the parsed ``chat_query`` (its
+    "top N", score threshold, stage and country) and the explicit filters,
+    which win over the question's. With ``weights`` (a weighting profile) and
+    no explicit ids, companies are ranked by their weighted section scores
+    instead of total_score. For a company or comparison question, the
+    companies it names are added as "mentioned", wherever they rank; for an
+    open question, the companies whose free text best matches it are added
+    as "relevant".
     """
-    qs: QuerySet[StartupEvaluation] = StartupEvaluation.objects.all().order_by("-total_score")
-    if ids:
-        qs = qs.filter(id__in=ids)
-    if stage:
-        qs = qs.filter(stage=stage)
-    if min_score is not None:
-        qs = qs.filter(total_score__gte=min_score)
-    qs = qs[:limit]
+    plan = plan_context(chat_query, stage=stage, min_score=min_score, limit=limit)
+    weighted: Dict[str, float] = {}
+    if weights and not ids:
+        only = None
+        if plan.country:
+            # The section matrix has no country column; narrow it to the matching ids
+            only = apply_plan(StartupEvaluation.objects.all(), plan, limit=False).values_list("id", flat=True)
+        ranked = get_section_matrix().rank(weights, stage=plan.stage, min_score=plan.min_score, limit=plan.limit, ids=only)
+        weighted = {r["id"]: r["weighted_score"] for r in ranked}
+        by_id = {str(k): v for k, v in StartupEvaluation.objects.in_bulk(list(weighted)).items()}
+        rows = [by_id[r["id"]] for r in ranked if r["id"] in by_id]
+    else:
+        qs: QuerySet[StartupEvaluation] = StartupEvaluation.objects.all()
+        if ids:
+            qs = qs.filter(id__in=ids)
+        rows = apply_plan(qs, plan)
     companies: List[Dict[str, Any]] = []
-    for e in qs:
-        fd = e.form_data or {}
-        companies.append(
-            {
-                "id": str(e.id),
-                "name": e.company_name,
-                "stage": e.stage,
-                "country": e.country,
-                "score": e.total_score,
-                "rating": e.rating,
-                "mrr": _get_field(fd, "monthlyRevenue"),
-                "active_users": _get_field(fd, "activeUsers"),
-                "paying_customers": _get_field(fd, "payingCustomers"),
-                "burn_rate": _get_field(fd, "burnRate"),
-                "amount_raising": _get_field(fd, "amountRaising"),
-            }
-        )
+    for e in rows:
+        companies.append(_company_row(e))
+        if weighted:
+            companies[-1]["weighted_score"] = weighted.get(str(e.id))
 
     ctx: Dict[str, Any] = {
         "investor_id": _safe_str(getattr(user, "id", "anon")),
         "query": _safe_str(query),
         "companies": companies,
     }
+    if chat_query is not None and chat_query.intent in ("company_profile", "company_metric", "compare"):
+        ctx["mentioned"] = fetch_mentioned_companies(query, chat_query)
+    elif chat_query is not None and chat_query.intent in RELEVANT_INTENTS:
+        ctx["relevant"] = fetch_relevant_companies(query, plan)
     return ctx
+
+STREAM_FIELDS = ("company_name", "total_score", "stage", "form_data", "country", "rating")
+
+def iter_company_rows(chat_query: ChatQuery, *, ids: List[str] | None = None, stage: str | None = None, min_score: int | None = None, limit: int | None = None) -> Iterator[List[Row]]:
+    """
+    The companies of a list or table answer as renderer rows, in chunks of
+    CHAT_STREAM_CHUNK_SIZE read straight from the database, highest score
+    first. Filters are planned as in fetch_investor_context, with up to
+    CHAT_STREAM_MAX_ROWS rows instead of the model context cap.
+    """
+    plan = plan_context(chat_query, stage=stage, min_score=min_score, limit=limit, max_rows=int(getattr(settings, "CHAT_STREAM_MAX_ROWS", 10000)))
+    qs: QuerySet[StartupEvaluation] = StartupEvaluation.objects.all()
+    if ids:
+        qs = qs.filter(id__in=ids)
+    chunks = EvaluationRepository.iter_by_score(apply_plan(qs, plan, limit=False), STREAM_FIELDS, chunk_size=int(getattr(settings, "CHAT_STREAM_CHUNK_SIZE", 200)), limit=plan.limit)
+    for chunk in chunks:
+        yield [
+            (name or "—", score, stg, _get_field(fd or {}, "monthlyRevenue"), country, rating)
+            for name, score, stg, fd, country, rating in chunk
+        ]
@@ -0,0 +1,307 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import itertools
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+from django.conf import settings
+
+from core.models.evaluation import StartupEvaluation
+
+logger = logging.getLogger(__name__)
+
+# Free-text form answers (step, key) an evaluation is found by
+TEXT_FIELDS = (
+    ('step2', 'coreProblem'), ('step2', 'solution'), ('step2', 'whyNow'), ('step2', 'uniqueAdvantage'),
+    ('step3', 'targetCustomer'), ('step3', 'competitors'),
+    ('step5', 'founderBackground'), ('step5', 'domainExperience'), ('step5', 'keyHires'),
+    ('step6', 'fundUse'),
+    ('step7', 'vision'),
+)
+# Terms are hashed into this many buckets (2**18: collisions are rare for a startup-pitch vocabulary)
+HASH_BITS = 18
+# English function words, plus the question and pitch filler that says nothing about what a company
+# works on. Deliberately separate from name_index.STOP_TOKENS: the chat parser's keywords (revenue,
+# growth, customers, country names, ...) are topics here.
+TEXT_STOP_TOKENS = frozenset({
+    "a", "about", "after", "all", "also", "am", "an", "and", "any", "are", "as", "at", "be", "been", "before",
+    "being", "between", "both", "but", "by", "can", "could", "did", "do", "does", "doing", "each", "few", "for",
+    "from", "further", "had", "has", "have", "having", "he", "her", "here", "him", "his", "how", "i", "if", "in",
+    "into", "is", "it", "its", "itself", "just", "me", "more", "most", "my", "no", "nor", "not", "now", "of",
+    "off", "on", "once", "only", "or", "other", "our", "ours", "out", "over", "own", "same", "she", "should",
+    "so", "some", "such", "than", "that", "the", "their", "theirs", "them", "then", "there", "these", "they",
+    "this", "those", "through", "to", "too", "under", "until", "up", "very", "was", "we", "were", "what",
+    "whats", "when", "where", "which", "while", "who", "whom", "why", "will", "with", "would", "you", "your",
+    # Question filler
+    "ask", "find", "give", "list", "please", "show", "tell", "us",
+    "company", "companies", "startup", "startups",
+    # Pitch filler
+    "build", "builds", "building", "help", "helps", "helping", "make", "makes", "making", "solve", "solves",
+    "solving", "use", "uses", "using", "work", "works", "working",
+})
+
+_WORDS = re.compile(r"[^\W_]+")
+
+
+def _fold(text: str) -> str:
+    text = (text or "").lower()
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return text
+
+
+def words(text: str) -> List[str]:
+    """Lower-cased words of ``text``, with accents folded."""
+    return _WORDS.findall(_fold(text))
+
+
+def _term(token: str) -> Optional[str]:
+    if len(token) < 2 or token in TEXT_STOP_TOKENS or token.isdigit():
+        return None
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def text_terms(text: str) -> List[str]:
+    """Index terms of ``text``: folded words without stop words, with plural "s" dropped."""
+    return [t for t in map(_term, words(text)) if t]
+
+
+@lru_cache(maxsize=1 << 17)
+def _bucket(token: str) -> int:
+    """Hash bucket of a folded word's term, or -1 for a word that is not indexed."""
+    term = _term(token)
+    if term is None:
+        return -1
+    digest = hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') & ((1 << HASH_BITS) - 1)
+
+
+def _buckets(text: str) -> List[int]:
+    return [b for b in map(_bucket, words(text)) if b >= 0]
+
+
+def hashed_terms(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(bucket ids, term counts) of ``text``, bucket ids ascending."""
+    buckets = _buckets(text)
+    if not buckets:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    ids, counts = np.unique(np.array(buckets, dtype=np.int64), return_counts=True)
+    return ids, counts.astype(np.float32)
+
+
+def evaluation_text(form_data: Any) -> str:
+    """The TEXT_FIELDS answers of a step1..step8 payload, as one string."""
+    if not isinstance(form_data, dict):
+        return ""
+    parts = []
+    for step, key in TEXT_FIELDS:
+        step_data = form_data.get(step)
+        value = step_data.get(key) if isinstance(step_data, dict) else None
+        if isinstance(value, str) and value.strip():
+            parts.append(value)
+    return " ".join(parts)
+
+
+def _weigh(ids: np.ndarray, counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """Sublinear tf x idf weights of one document, L2-normalized."""
+    if not len(ids):
+        return np.empty(0, dtype=np.float32)
+    weights = (1.0 + np.log(counts)) * idf[ids]
+    norm = float(np.linalg.norm(weights))
+    return (weights / norm).astype(np.float32) if norm else weights.astype(np.float32)
+
+
+class _Snapshot:
+    """Immutable inverted layout of every evaluation's tf-idf vector (postings per hash bucket)."""
+
+    _versions = itertools.count(1)
+
+    def __init__(self, ids: List[str], idf: np.ndarray, indptr: np.ndarray, docs: np.ndarray, weights: np.ndarray):
+        self.version = next(self._versions)
+        self.ids = ids
+        self.index = {eid: i for i, eid in enumerate(ids)}
+        self.idf = idf
+        self.indptr = indptr
+        self.docs = docs
+        self.weights = weights
+
+    @classmethod
+    def build(cls, ids: List[str], buckets: np.ndarray, lengths: np.ndarray) -> '_Snapshot':
+        """From every document's term buckets, concatenated in ``ids`` order (``lengths`` terms each)."""
+        n_buckets = 1 << HASH_BITS
+        # One unique over (doc, bucket) keys counts every document's terms at once
+        keys = (np.repeat(np.arange(len(ids), dtype=np.int64), lengths) << HASH_BITS) | buckets
+        keys, counts = np.unique(keys, return_counts=True)
+        doc_of = (keys >> HASH_BITS).astype(np.int32)
+        buckets = keys & (n_buckets - 1)
+        # Smoothed idf: a bucket no document uses still gets a finite weight for later upserts
+        df = np.bincount(buckets, minlength=n_buckets)
+        idf = (np.log((1.0 + len(ids)) / (1.0 + df)) + 1.0).astype(np.float32)
+        weights = (1.0 + np.log(counts)) * idf[buckets]
+        norms = np.sqrt(np.bincount(doc_of, weights=weights * weights, minlength=len(ids)))
+        weights = weights / np.where(norms > 0, norms, 1.0)[doc_of]
+        # Group the (bucket, doc, weight) triples by bucket
+        order = np.argsort(buckets, kind='stable')
+        indptr = np.zeros(n_buckets + 1, dtype=np.int64)
+        np.cumsum(df, out=indptr[1:])
+        return cls(ids, idf, indptr, doc_of[order], weights.astype(np.float32)[order])
+
+
+class StartupTextIndex:
+    """
+    In-process hashed tf-idf index over the free-text form answers
+    (TEXT_FIELDS), so chat questions about a topic ("fintech startups solving
+    payments fraud") can pull in relevant companies whatever their score.
+
+    Terms are hashed into 2**HASH_BITS buckets and each evaluation is an
+    L2-normalized sparse vector, stored as postings per bucket; a search
+    only reads the postings of the question's terms and takes the top k
+    cosine scores with argpartition.
+
+    Like the section-score matrix, the index is rebuilt from the database
+    every TEXT_INDEX_REFRESH_SECONDS. Saves and deletes in between are
+    kept aside (scored against the snapshot's idf) and the snapshot rows
+    they replace are masked; past TEXT_INDEX_MAX_PENDING of them the index
+    is rebuilt on the next lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snap: Optional[_Snapshot] = None
+        self._refresh_at = 0.0
+        self._reset_pending()
+
+    def _reset_pending(self):
+        # id -> {bucket: weight} of documents saved since the snapshot; masked snapshot rows
+        self._pending: Dict[str, Dict[int, float]] = {}
+        self._masked: Optional[np.ndarray] = None
+
+    def load(self, rows: Iterable[Tuple[Any, Any]]):
+        """Replace the index with (id, form_data) rows."""
+        ids: List[str] = []
+        buckets: List[int] = []
+        lengths: List[int] = []
+        for eid, form_data in rows:
+            terms = _buckets(evaluation_text(form_data))
+            ids.append(str(eid))
+            buckets.extend(terms)
+            lengths.append(len(terms))
+        snap = _Snapshot.build(ids, np.array(buckets, dtype=np.int64), np.array(lengths, dtype=np.int64))
+        with self._lock:
+            self._snap = snap
+            self._reset_pending()
+            self._refresh_at = time.monotonic() + float(getattr(settings, 'TEXT_INDEX_REFRESH_SECONDS', 300))
+
+    def refresh(self, force: bool = False):
+        if not force and self._snap is not None and time.monotonic() < self._refresh_at:
+            return
+        qs = StartupEvaluation.objects.values_list('id', 'form_data').order_by()
+        self.load(qs.iterator(chunk_size=2000))
+        logger.info(f"[text_index] reloaded rows={len(self._snap.ids)} postings={len(self._snap.docs)}")
+
+    def invalidate(self):
+        with self._lock:
+            self._refresh_at = 0.0
+
+    def _mask(self, snap: _Snapshot, eid: str):
+        i = snap.index.get(eid)
+        if i is None:
+            return
+        # Copy-on-write, so a search in progress keeps its mask
+        masked = self._masked.copy() if self._masked is not None else np.zeros(len(snap.ids), dtype=bool)
+        masked[i] = True
+        self._masked = masked
+
+    def _maybe_rebuild(self):
+        if len(self._pending) + (int(self._masked.sum()) if self._masked is not None else 0) > int(getattr(settings, 'TEXT_INDEX_MAX_PENDING', 500)):
+            self._refresh_at = 0.0
+
+    def upsert(self, evaluation: StartupEvaluation):
+        with self._lock:
+            snap = self._snap
+            if snap is None:
+                return
+            eid = str(evaluation.id)
+            ids, counts = hashed_terms(evaluation_text(evaluation.form_data))
+            self._mask(snap, eid)
+            vector = dict(zip(ids.tolist(), _weigh(ids, counts, snap.idf).tolist()))
+            self._pending = {**self._pending, eid: vector}
+            self._maybe_rebuild()
+
+    def remove(self, evaluation_id: Any):
+        with self._lock:
+            snap = self._snap
+            if snap is None:
+                return
+            eid = str(evaluation_id)
+            self._mask(snap, eid)
+            if eid in self._pending:
+                self._pending = {k: v for k, v in self._pending.items() if k != eid}
+            self._maybe_rebuild()
+
+    def __len__(self) -> int:
+        snap = self._snap
+        if snap is None:
+            return 0
+        masked = int(self._masked.sum()) if self._masked is not None else 0
+        return len(snap.ids) - masked + len(self._pending)
+
+    def search(self, text: str, k: int = 10, min_score: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        The ``k`` evaluations whose free text is most similar to ``text``.
+
+        Args:
+            text: Question or search phrase.
+            k: Number of results.
+            min_score: Minimum cosine similarity (default TEXT_INDEX_MIN_SCORE).
+
+        Returns:
+            (evaluation id, cosine similarity) pairs, most similar first.
+        """
+        if min_score is None:
+            min_score = float(getattr(settings, 'TEXT_INDEX_MIN_SCORE', 0.1))
+        with self._lock:
+            snap, pending, masked = self._snap, self._pending, self._masked
+        if snap is None or k <= 0:
+            return []
+        q_ids, q_counts = hashed_terms(text)
+        q_weights = _weigh(q_ids, q_counts, snap.idf)
+        if not len(q_ids):
+            return []
+
+        scores = np.zeros(len(snap.ids), dtype=np.float32)
+        for bucket, weight in zip(q_ids.tolist(), q_weights.tolist()):
+            start, end = snap.indptr[bucket], snap.indptr[bucket + 1]
+            if start != end:
+                # A bucket lists each document once, so the fancy-indexed add is safe
+                scores[snap.docs[start:end]] += weight * snap.weights[start:end]
+        if masked is not None:
+            scores[masked] = 0.0
+        hits: List[Tuple[str, float]] = []
+        if len(scores):
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            hits = [(snap.ids[i], float(scores[i])) for i in top.tolist() if scores[i] >= min_score]
+
+        query = list(zip(q_ids.tolist(), q_weights.tolist()))
+        for eid, vector in pending.items():
+            score = sum(w * vector.get(b, 0.0) for b, w in query)
+            if score >= min_score:
+                hits.append((eid, float(score)))
+        hits.sort(key=lambda h: (-h[1], h[0]))
+        return [(eid, round(score, 4)) for eid, score in hits[:k]]
+
+
+text_index = StartupTextIndex()
+
+
+def get_text_index() -> StartupTextIndex:
+    """Return the process-wide free-text index, (re)loading it from the database when due."""
+    text_index.refresh()
+    return text_index
@@ -0,0 +1,266 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import hashlib
+import itertools
+import json
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from core.models.evaluation import StartupEvaluation
+from core.services.engine_input import has_steps, flatten_steps
+from core.services.scoring_engine import StartupScoringEngine
+from core.services.scoring_preview import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SECTION_KEYS = tuple(StartupScoringEngine.SECTION_MAX)
+
+
+def normalize_weights(weights: Any) -> Dict[str, float]:
+    """
+    Validate a {section: weight} mapping and fill in the sections left out
+    with weight 1.0 (so an empty profile ranks exactly like total_score).
+    Raises ValueError on unknown sections or negative / non-finite weights.
+    """
+    if weights is None:
+        weights = {}
+    if not isinstance(weights, dict):
+        raise ValueError("weights must be an object of {section: weight}.")
+    unknown = [k for k in weights if k not in SECTION_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)}. Allowed: {', '.join(SECTION_KEYS)}.")
+    out: Dict[str, float] = {}
+    for key in SECTION_KEYS:
+        try:
+            value = float(weights.get(key, 1.0))
+        except (TypeError, ValueError):
+            raise ValueError(f"Weight for '{key}' must be a number.")
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"Weight for '{key}' must be a finite, non-negative number.")
+        out[key] = value
+    if not any(out.values()):
+        raise ValueError("At least one weight must be positive.")
+    return out
+
+
+def _weights_key(weights: Dict[str, float]) -> str:
+    return hashlib.sha1(json.dumps(weights, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _section_row(section_scores: Any, form_data: Any = None) -> List[int]:
+    """Section scores of one evaluation as a row in SECTION_KEYS order."""
+    if not isinstance(section_scores, dict) and has_steps(form_data):
+        # Rows saved before section scores were persisted
+        section_scores = StartupScoringEngine(flatten_steps(form_data)[1]).calculate()['section_scores']
+    if not isinstance(section_scores, dict):
+        return [0] * len(SECTION_KEYS)
+    row = []
+    for key in SECTION_KEYS:
+        entry = section_scores.get(key)
+        score = entry.get('score', 0) if isinstance(entry, dict) else 0
+        row.append(int(score or 0))
+    return row
+
+
+class _Snapshot:
+    """Immutable column store of every evaluation's section scores."""
+
+    _versions = itertools.count(1)
+
+    def __init__(self, ids: List[str], names: List[str], stages: np.ndarray, totals: np.ndarray, matrix: np.ndarray):
+        self.version = next(self._versions)
+        self.ids = ids
+        self.index = {eid: i for i, eid in enumerate(ids)}
+        self.names = names
+        self.stages = stages
+        self.totals = totals
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, ids: List[str], names: List[str], stages: List[str], totals: List[int], rows: List[List[int]]) -> '_Snapshot':
+        return cls(
+            ids, names, np.array(stages, dtype=object), np.array(totals, dtype=np.int64),
+            np.array(rows, dtype=np.float32).reshape(len(ids), len(SECTION_KEYS)),
+        )
+
+
+class SectionScoreMatrix:
+    """
+    In-process (n_startups x 7) matrix of section scores for weighted ranking.
+
+    A profile's ranking is one matrix-vector product plus a sort, memoized per
+    weight vector until the matrix is rebuilt. The whole matrix is rebuilt
+    from the database every SECTION_MATRIX_REFRESH_SECONDS so workers converge
+    on other workers' writes and bulk rescoring runs. Saves and deletes in
+    between (via model signals) are kept aside as pending rows and the
+    snapshot rows they replace are masked, as in the free-text index; past
+    SECTION_MATRIX_MAX_PENDING of them the matrix is rebuilt on the next
+    ranking.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snap: Optional[_Snapshot] = None
+        self._refresh_at = 0.0
+        self._rank_cache = LRUCache(int(getattr(settings, 'WEIGHTED_RANKING_CACHE_SIZE', 256)))
+        self._reset_pending()
+
+    def _reset_pending(self):
+        # id -> (name, stage, total_score, section row) of evaluations saved since the snapshot; masked snapshot rows
+        self._pending: Dict[str, Tuple[str, str, int, np.ndarray]] = {}
+        self._masked: Optional[np.ndarray] = None
+
+    def load(self, rows: Iterable[Tuple[Any, str, str, int, Any]]):
+        """Replace the state with (id, company_name, stage, total_score, section_row) rows."""
+        ids, names, stages, totals, matrix = [], [], [], [], []
+        for eid, name, stage, total, row in rows:
+            ids.append(str(eid))
+            names.append(name)
+            stages.append(stage)
+            totals.append(int(total or 0))
+            matrix.append(row)
+        snap = _Snapshot.build(ids, names, stages, totals, matrix)
+        with self._lock:
+            self._snap = snap
+            self._reset_pending()
+            self._refresh_at = time.monotonic() + float(getattr(settings, 'SECTION_MATRIX_REFRESH_SECONDS', 300))
+            self._rank_cache.clear()
+
+    def refresh(self, force: bool = False):
+        if not force and self._snap is not None and time.monotonic() < self._refresh_at:
+            return
+        qs = StartupEvaluation.objects.values_list(
+            'id', 'company_name', 'stage', 'total_score', 'section_scores', 'form_data'
+        ).order_by()
+        self.load(
+            (eid, name, stage, total, _section_row(sections, form_data))
+            for eid, name, stage, total, sections, form_data in qs.iterator(chunk_size=2000)
+        )
+        logger.info(f"[weighted_ranking] reloaded rows={len(self._snap.ids)}")
+
+    def invalidate(self):
+        with self._lock:
+            self._refresh_at = 0.0
+
+    def _mask(self, snap: _Snapshot, eid: str):
+        i = snap.index.get(eid)
+        if i is None:
+            return
+        # Copy-on-write, so a ranking in progress keeps its mask
+        masked = self._masked.copy() if self._masked is not None else np.zeros(len(snap.ids), dtype=bool)
+        masked[i] = True
+        self._masked = masked
+
+    def _maybe_rebuild(self):
+        if len(self._pending) + (int(self._masked.sum()) if self._masked is not None else 0) > int(getattr(settings, 'SECTION_MATRIX_MAX_PENDING', 500)):
+            self._refresh_at = 0.0
+
+    def upsert(self, evaluation: StartupEvaluation):
+        """Insert or replace one evaluation's row."""
+        row = np.array(_section_row(evaluation.section_scores, evaluation.form_data), dtype=np.float32)
+        with self._lock:
+            snap = self._snap
+            if snap is None:
+                return
+            eid = str(evaluation.id)
+            self._mask(snap, eid)
+            entry = (evaluation.company_name, evaluation.stage, int(evaluation.total_score or 0), row)
+            self._pending = {**self._pending, eid: entry}
+            self._maybe_rebuild()
+
+    def remove(self, evaluation_id: Any):
+        with self._lock:
+            snap = self._snap
+            if snap is None:
+                return
+            eid = str(evaluation_id)
+            self._mask(snap, eid)
+            if eid in self._pending:
+                self._pending = {k: v for k, v in self._pending.items() if k != eid}
+            self._maybe_rebuild()
+
+    def _ranked(self, snap: _Snapshot, weights: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        key = (snap.version, _weights_key(weights))
+        cached = self._rank_cache.get(key)
+        if cached is not None:
+            return cached
+        vector = np.array([weights[k] for k in SECTION_KEYS], dtype=np.float32)
+        scores = snap.matrix @ vector
+        # Highest weighted score first; ties fall back to total_score
+        order = np.lexsort((-snap.totals, -scores))
+        self._rank_cache.set(key, (scores, order))
+        return scores, order
+
+    def rank(self, weights: Dict[str, Any], *, stage: Optional[str] = None, min_score: Optional[int] = None,
+             limit: int = 10, ids: Optional[Iterable[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Top ``limit`` startups by the weighted sum of their section scores.
+
+        Args:
+            weights: {section: weight}; missing sections weigh 1.0.
+            stage: Optional stage filter.
+            min_score: Optional minimum total_score.
+            limit: Number of rows to return.
+            ids: Optional evaluation ids to rank among.
+
+        Returns:
+            Ranked rows with id, name, stage, total_score, weighted_score and
+            weighted_percent (of the best possible weighted score).
+        """
+        weights = normalize_weights(weights)
+        self.refresh()
+        with self._lock:
+            snap, pending, masked = self._snap, self._pending, self._masked
+        limit = max(int(limit), 0)
+        allowed_ids = {str(eid) for eid in ids} if ids is not None else None
+        scores, order = self._ranked(snap, weights)
+        if masked is not None or stage or min_score is not None or allowed_ids is not None:
+            mask = ~masked if masked is not None else np.ones(len(snap.ids), dtype=bool)
+            if stage:
+                mask &= snap.stages == stage
+            if min_score is not None:
+                mask &= snap.totals >= int(min_score)
+            if allowed_ids is not None:
+                allowed = np.zeros(len(snap.ids), dtype=bool)
+                allowed[[i for i in (snap.index.get(eid) for eid in allowed_ids) if i is not None]] = True
+                mask &= allowed
+            order = order[mask[order]]
+        # (weighted score, total_score, id, name, stage) of the best snapshot rows and the matching pending rows
+        top = [
+            (float(scores[i]), int(snap.totals[i]), snap.ids[i], snap.names[i], snap.stages[i])
+            for i in order[:limit].tolist()
+        ]
+        if pending:
+            vector = np.array([weights[k] for k in SECTION_KEYS], dtype=np.float32)
+            for eid, (name, row_stage, total, row) in pending.items():
+                if (stage and row_stage != stage) or (min_score is not None and total < int(min_score)):
+                    continue
+                if allowed_ids is not None and eid not in allowed_ids:
+                    continue
+                top.append((float(row @ vector), total, eid, name, row_stage))
+            top.sort(key=lambda r: (-r[0], -r[1]))
+            top = top[:limit]
+        best = sum(weights[k] * StartupScoringEngine.SECTION_MAX[k] for k in SECTION_KEYS)
+        return [
+            {
+                'id': eid,
+                'name': name,
+                'stage': row_stage,
+                'total_score': total,
+                'weighted_score': round(score, 2),
+                'weighted_percent': round(100.0 * score / best, 1),
+            }
+            for score, total, eid, name, row_stage in top
+        ]
+
+section_matrix = SectionScoreMatrix()
+
+
+def get_section_matrix() -> SectionScoreMatrix:
+    """Return the process-wide section-score matrix, (re)loading it from the database when due."""
+    section_matrix.refresh()
+    return section_matrix
@@ -0,0 +1,139 @@
+from typing import Dict, Any, Optional
+
+import numpy as np
+from django.conf import settings
+
+from core.services.engine_input import engine_value
+from core.services.scoring_engine import StartupScoringEngine
+from core.services.scoring_rules import get_rules
+
+# Engine inputs that can be varied over a range
+WHAT_IF_FIELDS = ('mrr', 'burn_rate', 'active_users', 'tam_size', 'funding_raised', 'founders_count')
+
+MAX_AXIS_STEPS = 1000
+
+
+def _base_number(base_input: Dict[str, Any], field: str) -> float:
+    try:
+        return float(base_input.get(field, StartupScoringEngine.FIELD_DEFAULTS[field]))
+    except (ValueError, TypeError):
+        raise ValueError(f"'{field}' has no numeric base value; use 'values' or 'min'/'max' instead of 'multipliers'.")
+
+
+def axis_values(base_input: Dict[str, Any], field: str, spec: Dict[str, Any]) -> np.ndarray:
+    """
+    Expand one range spec into the grid values for ``field``. Accepted forms:
+    {"values": [...]}, {"min": a, "max": b, "steps": n} or {"multipliers": [...]}
+    (relative to the evaluation's current value).
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Range for '{field}' must be an object.")
+    if 'multipliers' in spec:
+        base = _base_number(base_input, field)
+    elif 'values' not in spec and not ('min' in spec and 'max' in spec):
+        raise ValueError(f"Range for '{field}' needs 'values', 'multipliers' or 'min'/'max'.")
+    size_error = f"Range for '{field}' must have 1-{MAX_AXIS_STEPS} finite values."
+    # Sizes are checked before any array is built
+    listed = spec['values'] if 'values' in spec else spec.get('multipliers')
+    if 'values' in spec or 'multipliers' in spec:
+        if not isinstance(listed, list) or not 0 < len(listed) <= MAX_AXIS_STEPS:
+            raise ValueError(size_error)
+    else:
+        try:
+            steps = int(spec.get('steps', 10))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Invalid range for '{field}'.")
+        if not 0 < steps <= MAX_AXIS_STEPS:
+            raise ValueError(size_error)
+    try:
+        if 'values' in spec:
+            values = np.asarray(listed, dtype=np.float64)
+        elif 'multipliers' in spec:
+            values = base * np.asarray(listed, dtype=np.float64)
+        else:
+            values = np.linspace(float(spec['min']), float(spec['max']), steps)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid range for '{field}'.")
+    if values.ndim != 1 or not np.isfinite(values).all():
+        raise ValueError(size_error)
+    if field in ('active_users', 'founders_count'):
+        # Integer inputs: the engine truncates with int()
+        values = np.trunc(values)
+    return values
+
+
+def score_grid(base_input: Dict[str, Any], ranges: Dict[str, Any], overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Score the full cartesian grid of ``ranges`` around ``base_input`` in one
+    ``score_batch`` call. Fields not varied keep their base (or overridden)
+    value and are broadcast rather than repeated per grid point.
+
+    Returns a compact result: axes, the grid shape, flat C-order score and
+    rating-code arrays, and a summary of rating transitions from the
+    scenario base (the evaluation with ``overrides`` applied).
+    """
+    if not ranges:
+        raise ValueError("At least one range is required.")
+    unknown = [f for f in ranges if f not in WHAT_IF_FIELDS]
+    if unknown:
+        raise ValueError(f"Unsupported range fields: {', '.join(unknown)}. Allowed: {', '.join(WHAT_IF_FIELDS)}.")
+    overrides = overrides or {}
+    if not isinstance(overrides, dict):
+        raise ValueError("overrides must be an object of {field: value}.")
+    bad = [f for f in overrides if f not in StartupScoringEngine.FIELD_DEFAULTS]
+    if bad:
+        raise ValueError(f"Unsupported override fields: {', '.join(bad)}.")
+    unreadable = [f for f, v in overrides.items() if v is not None and engine_value(f, v) is None]
+    if unreadable:
+        raise ValueError(f"Invalid override values (text, a whole year or a finite number expected): {', '.join(unreadable)}.")
+
+    scenario = {**base_input, **overrides}
+    fields = [f for f in WHAT_IF_FIELDS if f in ranges]
+    axes = [axis_values(scenario, f, ranges[f]) for f in fields]
+    shape = tuple(a.shape[0] for a in axes)
+    points = int(np.prod(shape))
+    max_points = int(getattr(settings, 'WHAT_IF_MAX_POINTS', 100000))
+    if points > max_points:
+        raise ValueError(f"Grid has {points} points; the limit is {max_points}.")
+
+    rules = get_rules()
+    columns: Dict[str, np.ndarray] = {}
+    for key in StartupScoringEngine.FIELD_DEFAULTS:
+        if key in scenario and key not in fields:
+            columns[key] = np.array([scenario[key]], dtype=object)
+    grids = np.meshgrid(*axes, indexing='ij')
+    for field, grid in zip(fields, grids):
+        columns[field] = grid.ravel()
+    scored = StartupScoringEngine.score_batch(columns, rules=rules)
+
+    base = StartupScoringEngine(base_input, rules=rules).calculate()
+    scenario_base = StartupScoringEngine(scenario, rules=rules).calculate() if overrides else base
+    labels = rules.rating.labels
+    codes = rules.rating.codes(scored['total_score'])
+    counts = np.bincount(codes, minlength=len(labels))
+    # The grid varies around the overridden scenario, so moves are counted from its rating
+    base_code = labels.index(scenario_base['rating'])
+    totals = scored['total_score']
+
+    return {
+        'base': {
+            'total_score': base['total_score'],
+            'rating': base['rating'],
+            'inputs': {f: base_input.get(f) for f in WHAT_IF_FIELDS},
+        },
+        'scenario_base': {'total_score': scenario_base['total_score'], 'rating': scenario_base['rating']},
+        'overrides': overrides,
+        'axes': [{'field': f, 'values': a.tolist()} for f, a in zip(fields, axes)],
+        'shape': list(shape),
+        'scores': totals.tolist(),
+        'rating_labels': labels,
+        'ratings': codes.tolist(),
+        'summary': {
+            'points': points,
+            'min_score': int(totals.min()),
+            'max_score': int(totals.max()),
+            'rating_counts': {labels[i]: int(c) for i, c in enumerate(counts)},
+            'upgrades': int((codes > base_code).sum()),
+            'downgrades': int((codes < base_code).sum()),
+        },
+    }
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models.evaluation import StartupEvaluation
+from core.services.evaluation_search import search_index
+from core.services.name_index import name_index
+from core.services.text_index import text_index
+from core.services.weighted_ranking import section_matrix
+
+
+def _upsert(instance: StartupEvaluation):
+    section_matrix.upsert(instance)
+    name_index.upsert(instance)
+    text_index.upsert(instance)
+    search_index.upsert(instance)
+
+
+def _remove(evaluation_id):
+    section_matrix.remove(evaluation_id)
+    name_index.remove(evaluation_id)
+    text_index.remove(evaluation_id)
+    search_index.remove(evaluation_id)
+
+
+# The in-memory indexes follow a save or delete once its transaction commits, so a rollback never leaks into them
+
+@receiver(post_save, sender=StartupEvaluation)
+def update_evaluation_indexes(sender, instance, **kwargs):
+    transaction.on_commit(lambda: _upsert(instance))
+
+
+@receiver(post_delete, sender=StartupEvaluation)
+def remove_from_evaluation_indexes(sender, instance, **kwargs):
+    # delete() clears instance.id afterwards
+    evaluation_id = instance.id
+    transaction.on_commit(lambda: _remove(evaluation_id))
@@ -1,7 +1,11 @@
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from django.urls import reverse
+
+from core.services.ai_service import select_formatted_response, generate_response
+from core.services.query_parser import parse_query
+from core.services.scoring_engine import StartupScoringEngine
 
 
 class LeadsAPITests(APITestCase):
@@ -32,8 +36,6 @@ class AIHealthTests(APITestCase):
         self.assertIn("openai", res.data)
         self.assertIn("gemini", res.data)
 
-from django.test import SimpleTestCase
-from core.services.ai_service import select_formatted_response, generate_response
 
 SAMPLE_CTX = {
     "companies": [
@@ -83,3 +85,1102 @@ class AIFormattingTests(SimpleTestCase):
         self.assertIsNotNone(res)
         self.assertIn("Company Profile:", res)
         self.assertIn("Beta", res)
+
+
+SCORING_RECORDS = [
+    {},
+    {"company_name": "Acme", "legal_structure": "LLC", "incorporation_year": 2019, "tam_size": 2000,
+     "competition_level": "Low", "stage": "GROWTH", "active_users": 20000, "mrr": 60000, "burn_rate": 10000,
+     "funding_raised": 2000000, "founders_count": 2, "has_technical_founder": True, "team_size": 8,
+     "exit_strategy": "IPO"},
+    {"company_name": "ab", "legal_structure": "Sole", "tam_size": "abc", "competition_level": "High",
+     "stage": "MVP", "active_users": "1.5", "mrr": "500", "burn_rate": "5000", "funding_raised": "x",
+     "founders_count": "x", "has_technical_founder": "false", "team_size": None, "exit_strategy": "Merger"},
+    {"company_name": "Zeta", "stage": "IDEA", "active_users": 0, "mrr": None, "tam_size": None,
+     "incorporation_year": "2030", "exit_strategy": ""},
+]
+
+
+class ScoringBatchTests(SimpleTestCase):
+    def test_batch_matches_calculate(self):
+        columns = StartupScoringEngine.columns_from_records(SCORING_RECORDS)
+        out = StartupScoringEngine.score_batch(columns, include_details=True)
+        for i, rec in enumerate(SCORING_RECORDS):
+            ref = StartupScoringEngine(rec).calculate()
+            self.assertEqual(int(out["total_score"][i]), ref["total_score"])
+            self.assertEqual(out["rating"][i], ref["rating"])
+            for key, sec in ref["section_scores"].items():
+                self.assertEqual(int(out["section_scores"][key][i]), sec["score"])
+            self.assertEqual(out["strengths"][i], ref["strengths"])
+            self.assertEqual(out["weaknesses"][i], ref["weaknesses"])
+            self.assertEqual(out["risk_flags"][i], ref["risk_flags"])
+
+    def test_batch_numeric_columns_without_details(self):
+        import numpy as np
+        out = StartupScoringEngine.score_batch({
+            "mrr": np.array([0.0, 20000.0, 80000.0]),
+            "burn_rate": np.array([0.0, 5000.0, 200000.0]),
+            "stage": np.array(["IDEA", "SEED", "GROWTH"]),
+        })
+        self.assertNotIn("strengths", out)
+        for i, (mrr, burn, stage) in enumerate([(0.0, 0.0, "IDEA"), (20000.0, 5000.0, "SEED"), (80000.0, 200000.0, "GROWTH")]):
+            ref = StartupScoringEngine({"mrr": mrr, "burn_rate": burn, "stage": stage}).calculate()
+            self.assertEqual(int(out["total_score"][i]), ref["total_score"])
+            self.assertEqual(out["rating"][i], ref["rating"])
+
+
+class ScoringRulesReloadTests(SimpleTestCase):
+    def test_rule_file_hot_reload(self):
+        import json
+        import tempfile
+        from django.test import override_settings
+        from core.services import scoring_rules
+
+        record = {"mrr": 20000, "stage": "SEED"}
+        base = StartupScoringEngine(record).calculate()
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fh:
+            json.dump({"stage_points": {"SEED": {"points": 30, "strength": "Seed funded"}}}, fh)
+        try:
+            with override_settings(SCORING_RULES_FILE=fh.name):
+                scoring_rules.reload_rules(force=True)
+                tuned = StartupScoringEngine(record).calculate()
+                batch = StartupScoringEngine.score_batch(StartupScoringEngine.columns_from_records([record]))
+        finally:
+            scoring_rules.reload_rules(force=True)
+        self.assertEqual(tuned["total_score"], base["total_score"] + 15)
+        self.assertIn("Seed funded", tuned["strengths"])
+        self.assertEqual(int(batch["total_score"][0]), tuned["total_score"])
+        self.assertEqual(StartupScoringEngine(record).calculate(), base)
+
+    def test_malformed_rule_file_keeps_active_table(self):
+        import tempfile
+        from django.test import override_settings
+        from core.services import scoring_rules
+
+        active = scoring_rules.get_rules()
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fh:
+            fh.write("{not json")
+        try:
+            with override_settings(SCORING_RULES_FILE=fh.name):
+                self.assertIs(scoring_rules.reload_rules(force=True), active)
+        finally:
+            scoring_rules.reload_rules(force=True)
+
+
+def _steps_payload(name, mrr=0, users=0, stage="SEED", technical=False):
+    return {
+        "step1": {"companyName": name, "legalStructure": "LLC", "country": "UK", "stage": stage, "previousFunding": 50000},
+        "step2": {"coreProblem": "Payments fraud", "solution": "Realtime risk scoring"},
+        "step3": {"tam": 500, "competitors": "Stripe"},
+        "step4": {"activeUsers": users, "monthlyRevenue": mrr},
+        "step5": {"foundersCount": 2, "hasTechnicalFounder": technical, "founderProfileUrl": "https://example.com/founder"},
+        "step6": {"burnRate": 4000, "amountRaising": 250000},
+        "step7": {"vision": "Default fraud layer for SMB payments"},
+        "step8": {"exitStrategy": "Acquisition"},
+    }
+
+
+class RescoreEvaluationsCommandTests(TestCase):
+    def _create(self, name, **kwargs):
+        from core.models import StartupEvaluation
+        return StartupEvaluation.objects.create(
+            company_name=name, total_score=1, rating="HIGH_RISK", form_data=_steps_payload(name, **kwargs)
+        )
+
+    def _expected(self, evaluation):
+        from core.services.engine_input import flatten_steps
+        return StartupScoringEngine(flatten_steps(evaluation.form_data)[1]).calculate()
+
+    def test_rescore_updates_stale_scores(self):
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        evals = [self._create(f"Co {i}", mrr=i * 9000, users=i * 400, technical=bool(i % 2)) for i in range(7)]
+        checkpoint = os.path.join(tempfile.mkdtemp(), "ckpt.json")
+        out = StringIO()
+        call_command("rescore_evaluations", chunk_size=3, workers=1, checkpoint=checkpoint, stdout=out)
+        self.assertIn("rows/sec", out.getvalue())
+        self.assertFalse(os.path.exists(checkpoint))
+        from core.services.engine_input import flatten_steps
+        from core.services.investor_memo import evaluation_scoring
+        for e in evals:
+            e.refresh_from_db()
+            ref = self._expected(e)
+            self.assertEqual(e.total_score, ref["total_score"])
+            self.assertEqual(e.rating, ref["rating"])
+            # Stored findings follow the new scores
+            sections = StartupScoringEngine(flatten_steps(e.form_data)[1]).calculate_sections()
+            self.assertEqual(e.section_details["team"]["strengths"], sections["team"]["strengths"])
+            stored = evaluation_scoring(e)
+            for kind in ("strengths", "weaknesses", "risk_flags"):
+                self.assertEqual(stored[kind], ref[kind])
+
+    def test_rescore_resumes_from_checkpoint(self):
+        import json
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from core.models import StartupEvaluation
+
+        for i in range(4):
+            self._create(f"Resume {i}", mrr=20000)
+        ordered = list(StartupEvaluation.objects.order_by("id"))
+        checkpoint = os.path.join(tempfile.mkdtemp(), "ckpt.json")
+        with open(checkpoint, "w") as fh:
+            json.dump({"last_id": str(ordered[1].id), "processed": 2, "updated": 2, "skipped": 0}, fh)
+        call_command("rescore_evaluations", chunk_size=2, workers=2, checkpoint=checkpoint, resume=True, stdout=StringIO())
+        scores = [e.total_score for e in StartupEvaluation.objects.order_by("id")]
+        self.assertEqual(scores[:2], [1, 1])
+        self.assertTrue(all(s == self._expected(ordered[2])["total_score"] for s in scores[2:]))
+
+
+class IncrementalSectionScoringTests(APITestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        self.user = get_user_model().objects.create_user(username="founder@example.com", email="founder@example.com", password="pw-Secret-123")
+        self.client.force_authenticate(self.user)
+
+    def test_submit_persists_section_scores_and_update_rescores_changed_sections(self):
+        from core.models import StartupEvaluation
+        res = self.client.post(reverse("submit-evaluation"), _steps_payload("Fraudless", mrr=20000, users=500), format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        evaluation = StartupEvaluation.objects.get(id=res.data["evaluation_id"])
+        evaluation.user = self.user
+        evaluation.save(update_fields=["user"])
+        self.assertEqual(evaluation.section_scores, res.data["section_scores"])
+        self.assertEqual(set(evaluation.section_details), set(StartupScoringEngine.SECTION_MAX))
+
+        url = reverse("evaluation-form-update", kwargs={"id": evaluation.id})
+        res = self.client.patch(url, {"step6": {"burnRate": 1000}}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["recomputed_sections"], ["financials"])
+
+        evaluation.refresh_from_db()
+        self.assertEqual(evaluation.form_data["step6"], {"burnRate": 1000, "amountRaising": 250000})
+        from core.services.engine_input import flatten_steps
+        ref = StartupScoringEngine(flatten_steps(evaluation.form_data)[1]).calculate()
+        self.assertEqual(res.data["total_score"], ref["total_score"])
+        self.assertEqual(res.data["strengths"], ref["strengths"])
+        self.assertEqual(res.data["risk_flags"], ref["risk_flags"])
+        self.assertEqual(evaluation.total_score, ref["total_score"])
+        self.assertEqual(evaluation.section_scores, ref["section_scores"])
+
+    def test_update_requires_ownership(self):
+        from core.models import StartupEvaluation
+        evaluation = StartupEvaluation.objects.create(company_name="Other", form_data=_steps_payload("Other"))
+        url = reverse("evaluation-form-update", kwargs={"id": evaluation.id})
+        res = self.client.patch(url, {"step4": {"monthlyRevenue": 1}}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ScorePercentileTests(APITestCase):
+    def setUp(self):
+        from core.services.score_distribution import score_distribution
+        score_distribution.invalidate()
+
+    def test_distribution_percentiles(self):
+        from core.services.score_distribution import ScoreDistribution
+        dist = ScoreDistribution(initial_size=4)
+        dist.load([("SEED", 10, 2), ("SEED", 50, 1), ("GROWTH", 150, 1)])
+        dist.add("SEED", 300)
+        self.assertEqual(dist.count(), 5)
+        self.assertEqual(dist.percentile(50, "SEED"), round(100 * 2 / 3, 1))
+        self.assertEqual(dist.percentile(300), 100.0)
+        self.assertEqual(dist.percentile(10), 0.0)
+        dist.move(("SEED", 300), ("GROWTH", 5))
+        self.assertEqual(dist.count("SEED"), 3)
+        self.assertEqual(dist.percentile(150, "GROWTH"), 100.0)
+
+    def test_submit_returns_percentiles(self):
+        from core.models import StartupEvaluation
+        for score in (10, 20, 200):
+            StartupEvaluation.objects.create(company_name=f"Seed {score}", stage="SEED", total_score=score)
+        StartupEvaluation.objects.create(company_name="Growth", stage="GROWTH", total_score=5)
+        res = self.client.post(reverse("submit-evaluation"), _steps_payload("Newco", mrr=20000, users=500), format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["percentiles"]["stage_name"], "SEED")
+        self.assertEqual(res.data["percentiles"]["stage"], round(100 * 2 / 3, 1))
+        self.assertEqual(res.data["percentiles"]["overall"], 75.0)
+
+
+class WhatIfAnalysisTests(APITestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from core.models import StartupEvaluation
+        self.investor = get_user_model().objects.create_user(
+            username="inv@example.com", email="inv@example.com", password="pw-Secret-123", is_investor=True
+        )
+        self.client.force_authenticate(self.investor)
+        self.evaluation = StartupEvaluation.objects.create(
+            company_name="Gridco", form_data=_steps_payload("Gridco", mrr=12000, users=300)
+        )
+
+    def test_grid_matches_engine(self):
+        from core.services.engine_input import flatten_steps
+        url = reverse("evaluation-what-if", kwargs={"id": self.evaluation.id})
+        payload = {
+            "ranges": {"mrr": {"multipliers": [0.5, 1, 2, 5]}, "founders_count": {"values": [1, 2]}},
+            "overrides": {"has_technical_founder": True},
+        }
+        res = self.client.post(url, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["shape"], [4, 2])
+        self.assertEqual(res.data["summary"]["points"], 8)
+        _, base = flatten_steps(self.evaluation.form_data)
+        self.assertEqual(res.data["base"]["total_score"], StartupScoringEngine(base).calculate()["total_score"])
+        for i, mrr in enumerate([6000, 12000, 24000, 60000]):
+            for j, founders in enumerate([1, 2]):
+                ref = StartupScoringEngine({**base, "mrr": mrr, "founders_count": founders, "has_technical_founder": True}).calculate()
+                self.assertEqual(res.data["scores"][i * 2 + j], ref["total_score"])
+                self.assertEqual(res.data["rating_labels"][res.data["ratings"][i * 2 + j]], ref["rating"])
+
+    def test_rejects_unknown_fields(self):
+        url = reverse("evaluation-what-if", kwargs={"id": self.evaluation.id})
+        res = self.client.post(url, {"ranges": {"valuation": {"values": [1]}}}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_unreadable_overrides(self):
+        url = reverse("evaluation-what-if", kwargs={"id": self.evaluation.id})
+        ranges = {"mrr": {"values": [1000, 50000]}}
+        res = self.client.post(url, {"ranges": ranges, "overrides": {"company_name": 5}}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        # 1e400 parses to inf
+        body = '{"ranges": {"mrr": {"values": [1000, 50000]}}, "overrides": {"active_users": 1e400}}'
+        res = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("active_users", res.data["detail"])
+
+    def test_rating_moves_are_counted_from_the_overridden_scenario(self):
+        url = reverse("evaluation-what-if", kwargs={"id": self.evaluation.id})
+        overrides = {"active_users": 0, "founders_count": 1, "has_technical_founder": False}
+        res = self.client.post(url, {"ranges": {"mrr": {"multipliers": [0, 1, 10]}}, "overrides": overrides}, format="json").data
+        self.assertEqual((res["base"]["rating"], res["scenario_base"]["rating"]), ("STRONG", "MODERATE"))
+        self.assertEqual(res["summary"]["rating_counts"]["MODERATE"], 3)
+        self.assertEqual((res["summary"]["upgrades"], res["summary"]["downgrades"]), (0, 0))
+
+    def test_rejects_oversized_axes_before_building_them(self):
+        from core.services.what_if import MAX_AXIS_STEPS, axis_values
+        with self.assertRaises(ValueError):
+            axis_values({}, "mrr", {"min": 0, "max": 1, "steps": 10 ** 12})
+        with self.assertRaises(ValueError):
+            axis_values({}, "mrr", {"multipliers": [1.0] * (MAX_AXIS_STEPS + 1)})
+        self.assertEqual(len(axis_values({}, "mrr", {"min": 0, "max": 1, "steps": "5"})), 5)
+
+
+class ScoringPreviewTests(APITestCase):
+    def test_partial_preview_is_cached_and_writes_nothing(self):
+        from core.models import StartupEvaluation
+        from core.services import scoring_preview
+        scoring_preview._preview_cache.clear()
+        url = reverse("preview-evaluation")
+        payload = {"step1": {"companyName": "Draft", "stage": "seed"}, "step4": {"monthlyRevenue": 20000}}
+        res = self.client.post(url, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data["cached"])
+        self.assertIn("financials", res.data["answered_sections"])
+        self.assertNotIn("exit", res.data["answered_sections"])
+        self.assertEqual(res.data["section_scores"]["financials"]["score"], 15)
+
+        # A field the engine does not read reuses the memoized result
+        payload["step2"] = {"coreProblem": "typing..."}
+        res2 = self.client.post(url, payload, format="json")
+        self.assertTrue(res2.data["cached"])
+        self.assertEqual(res2.data["total_score"], res.data["total_score"])
+        self.assertEqual(StartupEvaluation.objects.count(), 0)
+
+    def test_preview_requires_steps(self):
+        res = self.client.post(reverse("preview-evaluation"), {"foo": 1}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cached_score_keeps_each_payloads_answered_sections(self):
+        from core.services import scoring_preview
+        scoring_preview._preview_cache.clear()
+        url = reverse("preview-evaluation")
+        empty = self.client.post(url, {"step1": {}}, format="json")
+        idea = self.client.post(url, {"step1": {"stage": "IDEA"}}, format="json")
+        self.assertTrue(idea.data["cached"])
+        self.assertEqual(idea.data["total_score"], empty.data["total_score"])
+        self.assertEqual(empty.data["answered_sections"], [])
+        self.assertEqual(idea.data["answered_sections"], ["traction"])
+        self.assertEqual(self.client.post(url, {"step1": {}}, format="json").data["answered_sections"], [])
+
+    def test_half_typed_fields_score_as_unanswered(self):
+        url = reverse("preview-evaluation")
+        payload = {
+            "step1": {"companyName": 5, "stage": 3, "incorporationYear": "20x", "legalStructure": 7},
+            "step4": {"activeUsers": "1,2x", "monthlyRevenue": 20000},
+        }
+        res = self.client.post(url, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["answered_sections"], ["financials"])
+        self.assertIn("No legal structure defined", res.data["risk_flags"])
+
+        # Only the preview drops them: submissions keep flattening the raw answers
+        from core.services.engine_input import flatten_steps
+        self.assertEqual(flatten_steps({"step3": {"competitors": ["Acme"]}})[1]["competition_level"], "Medium")
+
+
+class MonteCarloSimulationTests(APITestCase):
+    def test_ranges_yield_score_spread_and_rating_probabilities(self):
+        url = reverse("simulate-evaluation")
+        payload = {
+            "step1": {"companyName": "Ranged", "stage": "seed"},
+            "step4": {"monthlyRevenue": {"min": 5000, "max": 15000}, "activeUsers": {"min": 500, "max": 2000}},
+            "draws": 4000,
+            "seed": 7,
+        }
+        res = self.client.post(url, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["draws"], 4000)
+        self.assertLessEqual(res.data["p10"], res.data["p50"])
+        self.assertLessEqual(res.data["p50"], res.data["p90"])
+        self.assertLess(res.data["p10"], res.data["p90"])
+        self.assertAlmostEqual(sum(res.data["rating_probabilities"].values()), 1.0, places=3)
+
+        # Seeded runs are reproducible
+        again = self.client.post(url, payload, format="json")
+        self.assertEqual(again.data["expected_score"], res.data["expected_score"])
+
+    def test_range_inside_one_tier_matches_point_score(self):
+        from core.services.monte_carlo import simulate_scores
+        from core.services.scoring_engine import StartupScoringEngine
+        base = {"stage": "SEED", "mrr": 20000, "active_users": 50}
+        point = StartupScoringEngine(base).calculate()["total_score"]
+        result = simulate_scores(base, {"mrr": {"min": 12000, "max": 40000, "dist": "loguniform"}}, draws=500)
+        self.assertEqual(result["std"], 0)
+        self.assertEqual(result["expected_score"], point)
+
+    def test_invalid_distribution_is_rejected(self):
+        res = self.client.post(
+            reverse("simulate-evaluation"),
+            {"step4": {"monthlyRevenue": {"min": 10, "max": 1}}},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_discrete_distribution_needs_finite_values_and_weights(self):
+        import numpy as np
+        from core.services.monte_carlo import sample
+        rng = np.random.default_rng(0)
+        for spec in (
+            {"values": [1, 1e400]},
+            {"values": [1, 2], "weights": [1, -1]},
+            {"values": [1, 2], "weights": [0, 0]},
+            {"values": [1, 2], "weights": [1, float("nan")]},
+            {"values": [1, 2], "weights": [1]},
+        ):
+            with self.assertRaises(ValueError):
+                sample("mrr", spec, 10, rng)
+        self.assertTrue((sample("mrr", {"values": [1, 2], "weights": [0, 1]}, 10, rng) == 2).all())
+
+
+class WeightingProfileRankingTests(APITestCase):
+    def _sections(self, **scores):
+        return {k: {"score": scores.get(k, 0), "outOf": v} for k, v in StartupScoringEngine.SECTION_MAX.items()}
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from core.models import StartupEvaluation
+        from core.services.weighted_ranking import section_matrix
+        self.investor = get_user_model().objects.create_user(
+            username="inv@example.com", email="inv@example.com", password="pw-Secret-123", is_investor=True
+        )
+        self.client.force_authenticate(self.investor)
+        self.market = StartupEvaluation.objects.create(
+            company_name="MarketCo", stage="SEED", total_score=60, section_scores=self._sections(market=40, team=20)
+        )
+        self.traction = StartupEvaluation.objects.create(
+            company_name="TractionCo", stage="SEED", total_score=50, section_scores=self._sections(traction=40, team=10)
+        )
+        section_matrix.refresh(force=True)
+
+    def test_profile_reranks_and_follows_saved_evaluations(self):
+        res = self.client.post(reverse("investor-profiles"), {"name": "Traction first", "weights": {"traction": 3}}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["weights"]["market"], 1.0)
+        url = reverse("investor-profile-ranking", kwargs={"id": res.data["id"]})
+
+        ranked = self.client.get(url).data["results"]
+        self.assertEqual([r["name"] for r in ranked], ["TractionCo", "MarketCo"])
+        self.assertEqual(ranked[0]["weighted_score"], 130.0)
+
+        # Saving an evaluation updates the matrix and drops the memoized ranking
+        self.market.section_scores = self._sections(market=40, traction=40, team=20)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.market.save()
+        ranked = self.client.get(url, {"limit": 1}).data["results"]
+        self.assertEqual([r["name"] for r in ranked], ["MarketCo"])
+
+    def test_pending_rows_are_filtered_and_merged(self):
+        from core.models import StartupEvaluation
+        from core.services.weighted_ranking import section_matrix
+        with self.captureOnCommitCallbacks(execute=True):
+            added = StartupEvaluation.objects.create(
+                company_name="TeamCo", stage="MVP", total_score=55, section_scores=self._sections(team=30)
+            )
+            self.traction.delete()
+        ranked = section_matrix.rank({"team": 5})
+        self.assertEqual([r["name"] for r in ranked], ["TeamCo", "MarketCo"])
+        self.assertEqual(ranked[0]["id"], str(added.id))
+        self.assertEqual([r["name"] for r in section_matrix.rank({"team": 5}, stage="SEED")], ["MarketCo"])
+        self.assertEqual([r["name"] for r in section_matrix.rank({}, ids=[added.id])], ["TeamCo"])
+
+    def test_invalid_weights_are_rejected(self):
+        res = self.client.post(reverse("investor-profiles"), {"name": "Bad", "weights": {"valuation": 2}}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(reverse("investor-profiles"), {"name": "Bad", "weights": {"team": -1}}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ScoringBenchmarkTests(SimpleTestCase):
+    def test_synthetic_population_has_missing_and_bad_values(self):
+        from core.benchmarks.scoring import synthetic_columns, BAD_STRINGS
+        columns = synthetic_columns(2000, seed=3)
+        mrr = columns["mrr"].tolist()
+        self.assertIn(None, mrr)
+        self.assertTrue(any(v in BAD_STRINGS for v in mrr if isinstance(v, str)))
+        out = StartupScoringEngine.score_batch(columns)
+        self.assertEqual(out["total_score"].shape, (2000,))
+
+    def test_regression_gate_against_baseline(self):
+        import json
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        tmp = tempfile.mkdtemp()
+        report_path = os.path.join(tmp, "report.json")
+        baseline_path = os.path.join(tmp, "baseline.json")
+        opts = dict(sizes="300", calculate_max_rows=300, output=report_path, baseline=baseline_path, stdout=StringIO())
+        call_command("bench_scoring", update_baseline=True, **opts)
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)
+        self.assertEqual(set(baseline["results"]["300"]), {"calculate", "score_batch", "records_to_batch", "flatten_steps"})
+
+        # Pretend the baseline was 1000x faster: every benchmark regresses
+        for bench in baseline["results"]["300"].values():
+            bench["rows_per_sec"] *= 1000
+        with open(baseline_path, "w") as fh:
+            json.dump(baseline, fh)
+        with self.assertRaises(CommandError):
+            call_command("bench_scoring", margin=0.5, **opts)
+        with open(report_path) as fh:
+            self.assertEqual(len(json.load(fh)["regressions"]), 4)
+
+
+class ChatQueryParserTests(SimpleTestCase):
+    def test_matches_legacy_keyword_scans(self):
+        from core.benchmarks.chat_queries import CORPUS, legacy_parse
+
+        for question in CORPUS + ["", "What about Alpha vs. Beta top 7 with scores above that 5"]:
+            parsed = parse_query(question)._asdict()
+            for key, value in legacy_parse(question).items():
+                self.assertEqual(parsed[key], value, f"{key} differs for {question!r}")
+
+    def test_extracts_filters(self):
+        q = parse_query("Show top 5 pre-seed startups in the UK with score above than 60")
+        self.assertEqual((q.intent, q.top_n, q.min_score), ("rank", 5, 60.0))
+        self.assertEqual((q.stage, q.country), ("PRE_SEED", "UK"))
+        self.assertIsNone(parse_query("Tell us about Beta").country)
+        self.assertEqual(parse_query("Recommend a growth stage company in the US").country, "US")
+        self.assertTrue(parse_query("what's the weather like today?").unrelated)
+
+
+class CompanyNameIndexTests(TestCase):
+    def setUp(self):
+        from core.models import StartupEvaluation
+        from core.services.name_index import name_index
+        for i in range(12):
+            StartupEvaluation.objects.create(company_name=f"Leader {i}", stage="SEED", total_score=90 - i)
+        self.zephyr = StartupEvaluation.objects.create(
+            company_name="Zephyr Analytics Ltd", stage="MVP", total_score=5, form_data={"step4": {"monthlyRevenue": 1200}}
+        )
+        self.zenith = StartupEvaluation.objects.create(company_name="Zenith Robotics", stage="IDEA", total_score=3)
+        name_index.refresh(force=True)
+
+    def _context(self, question):
+        from core.services.startup_data_service import fetch_investor_context
+        return fetch_investor_context(None, question, chat_query=parse_query(question))
+
+    def test_resolves_names_outside_the_top_companies(self):
+        ctx = self._context("What is the MRR of Zephyr Analytics?")
+        self.assertNotIn("Zephyr Analytics Ltd", [c["name"] for c in ctx["companies"]])
+        self.assertEqual([c["name"] for c in ctx["mentioned"]], ["Zephyr Analytics Ltd"])
+        self.assertEqual(select_formatted_response(ctx["query"], ctx), "Zephyr Analytics Ltd MRR: 1200")
+
+        ctx = self._context("Compare Zenith Robotic and zephyr analytics")
+        self.assertEqual([c["name"] for c in ctx["mentioned"]], ["Zenith Robotics", "Zephyr Analytics Ltd"])
+        self.assertTrue(select_formatted_response(ctx["query"], ctx).startswith("Comparison:"))
+
+    def test_follows_saves_deletes_and_aliases(self):
+        from core.services.name_index import name_index
+        self.zenith.company_name = "Nimbus Robotics"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zenith.save()
+        self.assertEqual(name_index.best_match("Tell me about Nimbus"), str(self.zenith.id))
+        self.assertIsNone(name_index.best_match("Tell me about Zenith"))
+        name_index.set_aliases(self.zephyr.id, ["ZA Labs"])
+        self.assertEqual(name_index.best_match("Tell me about ZA"), str(self.zephyr.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zephyr.delete()
+        self.assertEqual(self._context("Tell me about Zephyr")["mentioned"], [])
+
+
+class StartupTextIndexTests(TestCase):
+    def setUp(self):
+        from core.models import StartupEvaluation
+        from core.services.text_index import text_index
+        for i in range(12):
+            StartupEvaluation.objects.create(
+                company_name=f"Leader {i}", stage="SEED", total_score=90 - i,
+                form_data={"step2": {"coreProblem": "Small shops lack inventory software", "solution": "Inventory app"}},
+            )
+        self.fraudguard = StartupEvaluation.objects.create(
+            company_name="FraudGuard", stage="MVP", total_score=4,
+            form_data={"step2": {"coreProblem": "Card payment fraud costs fintech merchants billions",
+                                 "solution": "Real-time fraud scoring for payments"},
+                       "step7": {"vision": "Safe payments everywhere"}},
+        )
+        text_index.refresh(force=True)
+
+    def _context(self, question):
+        from core.services.startup_data_service import fetch_investor_context
+        return fetch_investor_context(None, question, chat_query=parse_query(question))
+
+    def test_open_questions_get_relevant_low_scoring_companies(self):
+        from core.services.context_encoder import encode_context
+        ctx = self._context("fintech startups solving payments fraud")
+        self.assertNotIn("FraudGuard", [c["name"] for c in ctx["companies"]])
+        self.assertEqual([c["name"] for c in ctx["relevant"]], ["FraudGuard"])
+        self.assertIn("relevant:\nFraudGuard|", encode_context(ctx).text)
+        self.assertEqual(self._context("Which startups work on quantum chemistry?")["relevant"], [])
+        self.assertNotIn("relevant", self._context("Show the top 3 startups"))
+
+    def test_chat_keywords_are_still_topics(self):
+        from core.services.text_index import text_terms
+        self.assertEqual(text_terms("What helps revenue growth for customers in India?"),
+                         ["revenue", "growth", "customer", "india"])
+
+    def test_follows_saves_and_deletes(self):
+        from core.models import StartupEvaluation
+        from core.services.text_index import text_index
+        from django.db import transaction
+        self.fraudguard.form_data = {"step2": {"coreProblem": "Carbon accounting for logistics fleets"}}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fraudguard.save()
+        self.assertEqual(text_index.search("payments fraud"), [])
+        self.assertEqual([eid for eid, _ in text_index.search("carbon accounting")], [str(self.fraudguard.id)])
+        with self.captureOnCommitCallbacks(execute=True):
+            added = StartupEvaluation.objects.create(company_name="Ledgerly", form_data={"step7": {"vision": "Carbon ledgers"}})
+        self.assertEqual(text_index.search("carbon ledgers")[0][0], str(added.id))
+
+        # A save that is rolled back never reaches the index
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                StartupEvaluation.objects.create(company_name="Ghost", form_data={"step7": {"vision": "Ghost kitchens"}})
+                raise RuntimeError
+        self.assertEqual(text_index.search("ghost kitchens"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fraudguard.delete()
+        self.assertEqual(text_index.search("logistics fleets"), [])
+        self.assertEqual(len(text_index), 13)
+
+
+class StartupSearchTests(APITestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from core.models import StartupEvaluation
+        user = get_user_model().objects.create_user(username="searcher", email="searcher@example.com", password="x")
+        self.client.force_authenticate(user)
+        self.payguard = StartupEvaluation.objects.create(
+            company_name="PayGuard", total_score=20,
+            form_data={"step2": {"coreProblem": "Card fraud in online payments"}},
+        )
+        self.ledger = StartupEvaluation.objects.create(
+            company_name="Ledgerly", total_score=90,
+            form_data={"step2": {"solution": "Payment reconciliation for finance teams"}},
+        )
+        for i in range(3):
+            StartupEvaluation.objects.create(company_name=f"Farm {i}", total_score=i, form_data={"step7": {"vision": "Payments for farmers"}})
+
+    def _search(self, **params):
+        return self.client.get(reverse("startups-search"), params)
+
+    def test_ranked_prefix_search_with_pagination(self):
+        from django.test import override_settings
+        from core.services.evaluation_search import search_backend, search_index
+        for backend in ("auto", "memory"):
+            with override_settings(EVALUATION_SEARCH_BACKEND=backend):
+                search_index.refresh(force=True)
+                self.assertEqual(search_backend(), "fts5" if backend == "auto" else "memory")
+                res = self._search(q="payg")
+                self.assertEqual([r["name"] for r in res.data["results"]], ["PayGuard"])
+                res = self._search(q="pay", page_size=2)
+                self.assertEqual(res.data["count"], 5)
+                # A match in the company name outranks the form text
+                self.assertEqual(res.data["results"][0]["name"], "PayGuard")
+                self.assertIsNotNone(res.data["next"])
+                res = self._search(q="pay", page_size=2, page=3)
+                self.assertEqual(len(res.data["results"]), 1)
+                self.assertEqual(self._search(q="fraud pay").data["count"], 1)
+        self.assertEqual(self._search(q=" ").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_saves_and_deletes(self):
+        from django.test import override_settings
+        from core.services.evaluation_search import search_index
+        search_index.refresh(force=True)
+        self.payguard.form_data = {"step2": {"coreProblem": "Crop insurance"}}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payguard.save()
+            self.ledger.delete()
+        for backend in ("auto", "memory"):
+            with override_settings(EVALUATION_SEARCH_BACKEND=backend):
+                self.assertEqual([r["name"] for r in self._search(q="crop").data["results"]], ["PayGuard"])
+                self.assertEqual(self._search(q="fraud").data["count"], 0)
+                self.assertEqual(self._search(q="reconciliation").data["count"], 0)
+
+
+class ChatContextPlannerTests(TestCase):
+    def setUp(self):
+        from core.models import StartupEvaluation
+        for i in range(60):
+            StartupEvaluation.objects.create(
+                company_name=f"Company {i}", total_score=i,
+                stage="SEED" if i % 2 else "MVP", country="United Kingdom" if i % 3 else "US",
+            )
+
+    def _context(self, question, **filters):
+        from core.services.startup_data_service import fetch_investor_context
+        return fetch_investor_context(None, question, chat_query=parse_query(question), **filters)
+
+    def test_top_n_and_threshold_run_in_the_query(self):
+        question = "Show the top 20 startups with score above than 30"
+        ctx = self._context(question)
+        self.assertEqual([c["score"] for c in ctx["companies"]], list(range(59, 39, -1)))
+        table = select_formatted_response(question, ctx)
+        self.assertEqual(len(table.splitlines()), 23)
+        self.assertIn("20 | Company 40 | 40", table)
+
+        self.assertEqual(len(self._context("Rank the startups")["companies"]), 3)
+        self.assertEqual(len(self._context("Give me a table of companies")["companies"]), 10)
+        # "all" lists as many as the context cap allows
+        self.assertEqual(len(self._context("Give me a table of all companies")["companies"]), 50)
+        self.assertEqual(len(self._context("Rank the startups", limit=7)["companies"]), 7)
+
+    def test_stage_and_country_filters(self):
+        ctx = self._context("List seed startups in the UK")
+        self.assertEqual(len(ctx["companies"]), 10)
+        self.assertTrue(all(c["stage"] == "SEED" and c["country"] == "United Kingdom" for c in ctx["companies"]))
+        self.assertEqual(ctx["companies"][0]["score"], 59)
+        # An explicit stage filter wins over the question's
+        ctx = self._context("List seed startups", stage="MVP")
+        self.assertEqual({c["stage"] for c in ctx["companies"]}, {"MVP"})
+
+
+class StreamedAnswerTests(APITestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from core.models import StartupEvaluation
+        for i in range(450):
+            StartupEvaluation.objects.create(
+                company_name=f"Company {i}", total_score=i % 100, stage="SEED", country="UK",
+                form_data={"monthlyRevenue": i},
+            )
+        self.user = get_user_model().objects.create_user(username="streamer", password="pw12345!", is_staff=True)
+        self.client.force_authenticate(self.user)
+
+    def test_list_streams_in_chunks_and_matches_the_formatter(self):
+        from django.test import override_settings
+        from core.models.chat import ChatMessage
+        from core.services.startup_data_service import fetch_investor_context, iter_company_rows
+        question = "Show a table of all companies"
+        query = parse_query(question)
+        with override_settings(CHAT_STREAM_CHUNK_SIZE=100, CHAT_CONTEXT_MAX_ROWS=1000):
+            chunks = list(iter_company_rows(query))
+            expected = select_formatted_response(question, fetch_investor_context(None, question, chat_query=query))
+            resp = self.client.get("/api/v1/investor/chat/stream", {"message": question})
+            body = b"".join(resp.streaming_content).decode("utf-8")
+        self.assertEqual([len(c) for c in chunks], [100, 100, 100, 100, 50])
+        self.assertEqual([row[1] for chunk in chunks for row in chunk], sorted((i % 100 for i in range(450)), reverse=True))
+        lines = [e.split("data: ", 1)[1] for e in body.split("\n\n") if "event: token" in e]
+        self.assertEqual("\n".join(lines), expected)
+        saved = ChatMessage.objects.filter(sender=ChatMessage.Sender.ASSISTANT).latest("created_at")
+        self.assertEqual(saved.message, expected)
+
+
+class AnswerCacheTests(APITestCase):
+    def setUp(self):
+        from core.services import answer_cache
+        answer_cache.clear()
+
+    def test_key_normalizes_question_and_tracks_context(self):
+        from core.services.answer_cache import answer_key
+        ctx = {"companies": [{"id": "a", "name": "Alpha", "score": 70}]}
+        key = answer_key("Which startup  is strongest?", ctx, "gpt-4o-mini")
+        self.assertEqual(key, answer_key("which startup is strongest", ctx, "gpt-4o-mini"))
+        self.assertNotEqual(key, answer_key("which startup is strongest", ctx, "gpt-4.1-mini"))
+        changed = {"companies": [{"id": "a", "name": "Alpha", "score": 71}]}
+        self.assertNotEqual(key, answer_key("which startup is strongest", changed, "gpt-4o-mini"))
+
+    def test_hits_replay_chunks_and_are_counted(self):
+        from core.services import answer_cache
+        key = answer_cache.answer_key("q", {"companies": []}, "m")
+        self.assertIsNone(answer_cache.get_answer(key))
+        answer_cache.set_answer(key, "Alpha leads.", ["Alpha", " leads."], provider="openai")
+        self.assertEqual(answer_cache.get_answer(key)["chunks"], ["Alpha", " leads."])
+        stats = self.client.get(reverse("ai-health")).data["answer_cache"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+
+class ProviderRegistryTests(SimpleTestCase):
+    def test_settings_are_resolved_once_and_clients_shared(self):
+        from django.test import override_settings
+        from core.services.llm_providers import ProviderRegistry
+        with override_settings(OPENAI_API_KEY="", OPENAI_MODEL="gpt-test", GEMINI_API_KEY=""):
+            registry = ProviderRegistry()
+        self.assertEqual(registry.openai_model, "gpt-test")
+        self.assertFalse(registry.openai_configured)
+        self.assertIsNone(registry.openai())
+        self.assertIsNone(registry.gemini())
+        with override_settings(OPENAI_MODEL="gpt-other"):
+            self.assertEqual(registry.openai_model, "gpt-test")
+            registry.reset()
+        self.assertEqual(registry.openai_model, "gpt-other")
+
+
+class LLMGatewayTests(SimpleTestCase):
+    def _gateway(self, *providers, **kwargs):
+        from core.services.llm_gateway import LLMGateway
+        kwargs.setdefault("default_delay", 0.05)
+        kwargs.setdefault("min_delay", 0.01)
+        kwargs.setdefault("timeout", 5)
+        return LLMGateway(providers, **kwargs)
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        import time
+        from core.benchmarks.fake_providers import FakeProvider
+        slow = FakeProvider("openai", ["slow"], first_token_delay=2.0)
+        fast = FakeProvider("gemini", ["Alpha", " leads."], first_token_delay=0.01)
+        gateway = self._gateway(slow, fast)
+        t0 = time.monotonic()
+        self.assertEqual(list(gateway.stream([{"role": "user", "content": "q"}])), [("gemini", "Alpha"), ("gemini", " leads.")])
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertEqual((slow.cancelled, fast.completed), (1, 1))
+        self.assertEqual(gateway.stats()["hedged"], 1)
+
+        # A fast primary never triggers the hedge
+        quick = FakeProvider("openai", ["ok"])
+        spare = FakeProvider("gemini", ["unused"])
+        self.assertEqual(self._gateway(quick, spare).complete([]), ("ok", "openai"))
+        self.assertEqual(spare.calls, 0)
+
+    def test_failures_fail_over_and_hedge_delay_tracks_latency(self):
+        import time
+        from core.benchmarks.fake_providers import FakeProvider
+        from core.services.llm_gateway import LLMUnavailable
+        broken = FakeProvider("openai", error=RuntimeError("503"))
+        backup = FakeProvider("gemini", ["fine"])
+        gateway = self._gateway(broken, backup, default_delay=3.0)
+        t0 = time.monotonic()
+        self.assertEqual(gateway.complete([]), ("fine", "gemini"))
+        self.assertLess(time.monotonic() - t0, 1.0)
+        with self.assertRaises(LLMUnavailable):
+            self._gateway(broken, FakeProvider("gemini", error=RuntimeError("429"))).complete([])
+
+        primary = FakeProvider("openai")
+        gateway = self._gateway(primary, backup, min_samples=3, hedge_percentile=50, min_delay=0.0)
+        window = gateway._latency[("openai", "total")]
+        for seconds in (0.2, 0.4, 0.9):
+            window.add(seconds)
+        self.assertEqual(gateway.hedge_delay(primary, "total"), 0.4)
+
+    def test_streams_finishing_with_the_winner_are_closed(self):
+        import asyncio
+        from core.benchmarks.fake_providers import FakeProvider
+        primary = FakeProvider("openai", ["a", "b"])
+        backup = FakeProvider("gemini", ["c", "d"])
+        gateway = self._gateway(primary, backup, default_delay=0.01)
+
+        async def race():
+            # Both first tokens are held until the hedge is running, so both land in one round
+            gate = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().call_later(0.1, gate.set_result, None)
+
+            async def start(provider):
+                agen = provider.stream([], max_tokens=10, temperature=0.0)
+                first = await agen.__anext__()
+                await gate
+                return agen, first
+
+            provider, (agen, first) = await gateway._race(start, "first")
+            await agen.aclose()
+            return provider.name, first, primary.cancelled + backup.cancelled
+
+        # Either may win the round; the other's stream is closed all the same
+        name, first, closed = asyncio.run(race())
+        self.assertEqual(first, {"openai": "a", "gemini": "c"}[name])
+        self.assertEqual(closed, 2)
+
+
+class ContextEncoderTests(SimpleTestCase):
+    def _ctx(self, n):
+        companies = [
+            {"id": f"id-{i}", "name": f"Company {i}", "stage": "SEED", "country": "UK", "score": 90 - i,
+             "rating": "STRONG", "mrr": 1000 + i, "active_users": None, "paying_customers": 12,
+             "burn_rate": None, "amount_raising": 250000}
+            for i in range(n)
+        ]
+        return {"investor_id": "7", "query": "which seed companies look strongest?", "companies": companies}
+
+    def test_tabular_encoding_keeps_needed_columns_and_reports_savings(self):
+        from core.services.context_encoder import encode_context
+        ctx = self._ctx(10)
+        encoded = encode_context(ctx, parse_query("which seed companies look strongest?"), budget_tokens=10000)
+        lines = encoded.text.splitlines()
+        # Empty columns, ids and the echoed question are dropped
+        self.assertEqual(lines[0], "columns: name|stage|country|score|rating|mrr|paying_customers|amount_raising")
+        self.assertEqual(lines[2], "Company 0|SEED|UK|90|STRONG|1000|12|250000")
+        self.assertNotIn("id-0", encoded.text)
+        self.assertEqual((encoded.rows, encoded.omitted), (10, 0))
+        self.assertGreater(encoded.saved_ratio, 0.5)
+
+        ctx["mentioned"] = [ctx["companies"][4]]
+        encoded = encode_context(ctx, parse_query("what is the mrr of Company 4"), budget_tokens=10000)
+        lines = encoded.text.splitlines()
+        self.assertEqual(lines[:3], ["columns: name|mrr", "mentioned:", "Company 4|1004"])
+        self.assertEqual(encoded.rows, 10)
+
+    def test_rows_are_trimmed_to_the_token_budget(self):
+        from core.services.context_encoder import encode_context
+        ctx = self._ctx(50)
+        full = encode_context(ctx, parse_query("tell me about these startups"), budget_tokens=100000)
+        trimmed = encode_context(ctx, parse_query("tell me about these startups"), budget_tokens=200)
+        self.assertLessEqual(trimmed.tokens, 200 + 10)
+        self.assertGreater(trimmed.omitted, 0)
+        self.assertEqual(trimmed.rows + trimmed.omitted, 50)
+        self.assertTrue(trimmed.text.endswith(f"({trimmed.omitted} more companies omitted)"))
+        self.assertTrue(full.text.startswith(trimmed.text.rsplit("\n", 1)[0]))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_breaker_opens_on_failures_and_recovers_through_half_open(self):
+        from core.services.llm_gateway import CircuitBreaker
+        now = [0.0]
+        breaker = CircuitBreaker("openai", failure_ratio=0.5, min_calls=4, window=4, open_seconds=10, clock=lambda: now[0])
+        for ok in (True, False, True):
+            breaker.record(ok)
+        self.assertEqual(breaker.state, "closed")
+        breaker.record(False)
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+        now[0] = 10.0
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record(False)
+        self.assertEqual(breaker.state, "open")
+        now[0] = 20.0
+        self.assertTrue(breaker.allow())
+        breaker.record(True)
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.snapshot()["opened"], 2)
+
+    def test_open_circuit_skips_provider_and_deadline_bounds_the_call(self):
+        import time
+        from core.benchmarks.fake_providers import FakeProvider
+        from core.services.llm_gateway import LLMGateway, LLMUnavailable
+        primary = FakeProvider("openai", ["slow"], first_token_delay=0.3)
+        backup = FakeProvider("gemini", ["fine"])
+        gateway = LLMGateway([primary, backup], default_delay=5, timeout=5, slow_answer=0.1,
+                             breaker={"min_calls": 1, "window": 1, "open_seconds": 60})
+        # A slow success trips the primary's breaker; the next call goes straight to the backup
+        self.assertEqual(gateway.complete([]), ("slow", "openai"))
+        self.assertEqual(gateway.breakers["openai"].state, "open")
+        t0 = time.monotonic()
+        self.assertEqual(gateway.complete([]), ("fine", "gemini"))
+        self.assertLess(time.monotonic() - t0, 0.2)
+        self.assertEqual((primary.calls, gateway.stats()["short_circuited"]), (1, 1))
+
+        gateway.breakers["gemini"].record(False)
+        with self.assertRaises(LLMUnavailable):
+            gateway.complete([])
+        self.assertEqual(primary.calls, 1)
+
+        stuck = FakeProvider("openai", first_token_delay=5)
+        t0 = time.monotonic()
+        with self.assertRaises(LLMUnavailable):
+            LLMGateway([stuck], timeout=30).complete([], timeout=0.2)
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertEqual(stuck.cancelled, 1)
+
+
+class CircuitBreakerEndpointTests(APITestCase):
+    def test_breaker_state_endpoint(self):
+        resp = self.client.get("/api/v1/ai/circuit-breakers")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("providers", resp.data)
+
+
+class AnswerRendererTests(SimpleTestCase):
+    def test_layouts_keep_their_format(self):
+        from core.services.answer_renderer import CompanyRows, render_compare, render_list, render_rank_table, render_table
+        rows = CompanyRows(SAMPLE_CTX["companies"] + [dict(SAMPLE_CTX["companies"][0])])
+        self.assertEqual(render_table(rows), "\n".join([
+            "Company Table:",
+            "Name | Stage | Score | MRR | Country | Rating",
+            "-|-|-|-|-|-",
+            "Alpha | SEED | 72 | 15000 | UK | MODERATE",
+            "Beta | SERIES_A | 130 | 80000 | US | STRONG",
+            "Gamma | PRE_SEED | 40 | — | DE | HIGH_RISK",
+        ]))
+        self.assertEqual(render_rank_table(rows, top_n=2, min_score=50), "\n".join([
+            "Top companies by score ≥ 50:",
+            "Rank | Company | Score | Stage | Country | Rating",
+            "-|-|-|-|-|-",
+            "1 | Beta | 130.0 | SERIES_A | US | STRONG",
+            "2 | Alpha | 72.0 | SEED | UK | MODERATE",
+        ]))
+        self.assertEqual(render_list(rows).splitlines()[1:3], ["- Alpha: stage SEED, score 72", "- Beta: stage SERIES_A, score 130"])
+        self.assertEqual(render_compare(rows).splitlines()[1:4], ["Metric | Beta | Alpha", "-|-|-", "Stage | SERIES_A | SEED"])
+
+    def test_table_shows_at_most_max_rows(self):
+        from core.services.answer_renderer import CompanyRows, render_table
+        rows = CompanyRows([{"id": str(i), "name": f"Co {i}", "score": i} for i in range(12)])
+        lines = render_table(rows, max_rows=10).splitlines()
+        self.assertEqual(len(lines), 3 + 10 + 1)
+        self.assertEqual(lines[-2], "Co 9 | — | 9 | — | — | —")
+        self.assertEqual(lines[-1], "… 2 more companies not shown")
+
+
+class NarrativePrecomputeTests(APITestCase):
+    def test_submit_queues_narrative_and_endpoint_serves_it_once_stored(self):
+        from core.models import StartupEvaluation
+        from core.services.narrative_service import write_narrative
+        from unittest import mock
+        with mock.patch("core.services.narrative_service.narrative_worker.submit") as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(reverse("submit-evaluation"), _steps_payload("Fraudless", mrr=20000, users=500), format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(submit.call_count, 1)
+        evaluation_id = res.data["evaluation_id"]
+        payload = {"company": {"name": "Fraudless"}, "score": res.data["total_score"], "evaluation_id": str(evaluation_id)}
+
+        # Before the narrative is stored, the memo of the stored scoring output
+        pending = self.client.post(reverse("ai-narrative"), payload, format="json").data
+        self.assertEqual(StartupEvaluation.objects.get(id=evaluation_id).narrative, "")
+        for item in res.data["strengths"]:
+            self.assertIn(f"- Strength: {item}", pending)
+
+        self.assertEqual(write_narrative(evaluation_id), StartupEvaluation.NarrativeStatus.READY)
+        StartupEvaluation.objects.filter(id=evaluation_id).update(narrative="Stored narrative")
+        served = self.client.post(reverse("ai-narrative"), payload, format="json").data
+        self.assertEqual(served, "Stored narrative")
+
+    def test_model_narrative_and_failure_fallback(self):
+        from unittest import mock
+        from io import StringIO
+        from django.core.management import call_command
+        from core.benchmarks.fake_providers import FakeProvider
+        from core.models import StartupEvaluation
+        from core.services.llm_gateway import LLMGateway
+        from core.services.narrative_service import write_narrative
+        evaluation = StartupEvaluation.objects.create(company_name="Ledgerly", total_score=120, form_data=_steps_payload("Ledgerly"))
+
+        broken = LLMGateway([FakeProvider("openai", error=RuntimeError("503"))], timeout=5)
+        with mock.patch("core.services.narrative_service.get_gateway", return_value=broken):
+            self.assertEqual(write_narrative(evaluation.id), StartupEvaluation.NarrativeStatus.FAILED)
+        evaluation.refresh_from_db()
+        self.assertTrue(evaluation.narrative.startswith("Startup Overview\nLedgerly is a"))
+
+        model = FakeProvider("openai", ["Startup Overview", "\nLedgerly automates bookkeeping."])
+        with mock.patch("core.services.narrative_service.get_gateway", return_value=LLMGateway([model], timeout=5)):
+            call_command("precompute_narratives", retry_failed=True, stdout=StringIO())
+        evaluation.refresh_from_db()
+        self.assertEqual(evaluation.narrative_status, StartupEvaluation.NarrativeStatus.READY)
+        self.assertEqual(evaluation.narrative, "Startup Overview\nLedgerly automates bookkeeping.")
+        self.assertIsNotNone(evaluation.narrative_generated_at)
+
+
+class InvestorMemoTests(SimpleTestCase):
+    def test_memo_sections_follow_the_scoring_output(self):
+        from core.services.engine_input import flatten_steps
+        from core.services.investor_memo import SECTION_TITLES, render_memo
+        form = _steps_payload("Fraudless", mrr=3000, users=500, technical=True)
+        form["step6"].update({"preMoneyValuation": 2000000, "equityOffered": 10})
+        scoring = StartupScoringEngine(flatten_steps(form)[1]).calculate()
+        memo = render_memo(form, scoring)
+        self.assertEqual([block.split("\n", 1)[0] for block in memo.split("\n\n")], list(SECTION_TITLES))
+        self.assertIn("Fraudless is a Seed-stage company based in UK (LLC).", memo)
+        self.assertIn(f"Platform score: {scoring['total_score']}/200", memo)
+        self.assertIn("- Burn rate: $4,000 per month, net burn $1,000", memo)
+        self.assertIn("- Raising: $250,000 at a $2,000,000 pre-money valuation (post-money $2,250,000) for 10% equity", memo)
+        for kind, label in (("strengths", "Strength"), ("weaknesses", "Weakness"), ("risk_flags", "Risk")):
+            for item in scoring[kind]:
+                self.assertIn(f"- {label}: {item}", memo)
+
+    def test_missing_values_are_left_out(self):
+        from core.services.ai_service import fallback_narrative
+        from core.services.investor_memo import NO_RISKS, NOT_REPORTED
+        memo = fallback_narrative({"companyName": "Quietco", "monthlyRevenue": "n/a"}, None)
+        self.assertTrue(memo.startswith("Startup Overview\nQuietco is a company."))
+        self.assertIn(NOT_REPORTED, memo)
+        self.assertIn(NO_RISKS, memo)
+        self.assertNotIn("None", memo)
+
+
+class FakeOpenAIServerTests(SimpleTestCase):
+    def _post(self, server, body):
+        import json
+        import urllib.error
+        import urllib.request
+        req = urllib.request.Request(f"{server.url}/chat/completions", data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req) as resp:
+                return resp.status, resp.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode("utf-8")
+
+    def test_streams_and_completes_the_reply_and_injects_errors(self):
+        import json
+        from core.benchmarks.fake_openai import FakeOpenAIServer
+        messages = [{"role": "user", "content": "q"}]
+        with FakeOpenAIServer(tokens_per_second=0, first_token_delay=0, reply="Alpha leads the cohort") as server:
+            status_code, body = self._post(server, {"model": "m", "messages": messages, "max_tokens": 2})
+            self.assertEqual(status_code, 200)
+            self.assertEqual(json.loads(body)["choices"][0]["message"]["content"], "Alpha leads ")
+
+            status_code, body = self._post(server, {"model": "m", "messages": messages, "stream": True})
+            events = [e[len("data: "):] for e in body.split("\n\n") if e.startswith("data: ")]
+            self.assertEqual(events[-1], "[DONE]")
+            deltas = [json.loads(e)["choices"][0]["delta"].get("content") or "" for e in events[:-1]]
+            self.assertEqual("".join(deltas), "Alpha leads the cohort")
+            self.assertEqual(self._post(server, {"messages": []})[0], 400)
+
+        with FakeOpenAIServer(first_token_delay=0, error_rate=1.0, error_status=429) as server:
+            status_code, body = self._post(server, {"messages": messages})
+            self.assertEqual(status_code, 429)
+            self.assertEqual(json.loads(body)["error"]["type"], "server_error")
+            self.assertEqual(server.stats()["errors"], 1)
+
+
+class ChatLatencyBenchmarkTests(APITestCase):
+    def test_session_turns_continue_one_session_and_are_summarized(self):
+        from django.contrib.auth import get_user_model
+        from core.benchmarks.chat_latency import latency_summary, run_session
+        from core.models.chat import ChatSession
+        user = get_user_model().objects.create_user(username="bench", email="bench@example.com", password="pw-Secret-123", is_investor=True)
+        for endpoint in ("stream", "chat"):
+            samples = run_session(user, endpoint, ["Show me the top 5 startups"], 2, 0)
+            self.assertEqual([s["status"] for s in samples], [200, 200])
+            self.assertTrue(all(0 < s["ttft"] <= s["total"] for s in samples))
+        self.assertEqual(ChatSession.objects.filter(investor=user).count(), 2)
+        summary = latency_summary([0.1, 0.2, 0.3, 0.4])
+        self.assertEqual((summary["p50_ms"], summary["max_ms"]), (250.0, 400.0))
+        self.assertIsNone(latency_summary([]))
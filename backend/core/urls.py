@@ -5,14 +5,25 @@ from core.views.evaluation_views import (
     SubmitFullEvaluationAPIView,
     UserEvaluationListAPIView,
     EvaluationDetailAPIView,
+    EvaluationFormUpdateAPIView,
+    EvaluationWhatIfAPIView,
+    EvaluationPreviewAPIView,
+    EvaluationSimulateAPIView,
     AnalyticsSummaryAPIView
 )
 from core.views.auth_views import RegisterView, CustomTokenObtainPairView, MeView
 from core.views.ai_views import AINarrativeAPIView
 from core.views.leads_views import InvestorInterestAPIView, AcceleratorInterestAPIView
 from core.views.admin_investor_views import InvestorAdminListCreateAPIView, InvestorFromLeadAPIView
-from core.views.investor_views import InvestorDashboardStatsAPIView, StartupsListAPIView
-from core.views.chat_views import InvestorChatAPIView, InvestorChatStreamAPIView, InvestorChatSessionsAPIView, InvestorChatSessionDetailAPIView, AIHealthAPIView
+from core.views.investor_views import (
+    InvestorDashboardStatsAPIView,
+    StartupsListAPIView,
+    StartupSearchAPIView,
+    WeightingProfileListCreateAPIView,
+    WeightingProfileDetailAPIView,
+    WeightingProfileRankingAPIView,
+)
+from core.views.chat_views import InvestorChatAPIView, InvestorChatStreamAPIView, InvestorChatSessionsAPIView, InvestorChatSessionDetailAPIView, AIHealthAPIView, AICircuitBreakersAPIView
 
 urlpatterns = [
     # Auth Endpoints
@@ -24,8 +35,12 @@ urlpatterns = [
     # Evaluation Endpoints
     path('evaluations/create/', CreateEvaluationAPIView.as_view(), name='create-evaluation'),
     path('evaluations/submit/', SubmitFullEvaluationAPIView.as_view(), name='submit-evaluation'),
+    path('evaluations/preview/', EvaluationPreviewAPIView.as_view(), name='preview-evaluation'),
+    path('evaluations/simulate/', EvaluationSimulateAPIView.as_view(), name='simulate-evaluation'),
     path('evaluations/list/', UserEvaluationListAPIView.as_view(), name='list-evaluations'),
     path('evaluations/<uuid:id>/', EvaluationDetailAPIView.as_view(), name='evaluation-detail'),
+    path('evaluations/<uuid:id>/form/', EvaluationFormUpdateAPIView.as_view(), name='evaluation-form-update'),
+    path('evaluations/<uuid:id>/what-if/', EvaluationWhatIfAPIView.as_view(), name='evaluation-what-if'),
     path('evaluations/analytics/summary/', AnalyticsSummaryAPIView.as_view(), name='analytics-summary'),
     path('ai/narrative/', AINarrativeAPIView.as_view(), name='ai-narrative'),
     path('ai/narrative', AINarrativeAPIView.as_view(), name='ai-narrative-no-slash'),
@@ -41,10 +56,15 @@ urlpatterns = [
     # Investor Dashboard APIs
     path('investor/dashboard-stats', InvestorDashboardStatsAPIView.as_view(), name='investor-dashboard-stats'),
     path('startups', StartupsListAPIView.as_view(), name='startups-list'),
+    path('startups/search', StartupSearchAPIView.as_view(), name='startups-search'),
+    path('investor/profiles', WeightingProfileListCreateAPIView.as_view(), name='investor-profiles'),
+    path('investor/profiles/<int:id>', WeightingProfileDetailAPIView.as_view(), name='investor-profile-detail'),
+    path('investor/profiles/<int:id>/ranking', WeightingProfileRankingAPIView.as_view(), name='investor-profile-ranking'),
     path('investor/chat', InvestorChatAPIView.as_view(), name='investor-chat'),
     path('investor/chat/', InvestorChatAPIView.as_view(), name='investor-chat-slash'),
     path('investor/chat/stream', InvestorChatStreamAPIView.as_view(), name='investor-chat-stream'),
     path('investor/chat/sessions', InvestorChatSessionsAPIView.as_view(), name='investor-chat-sessions'),
     path('investor/chat/sessions/<uuid:id>', InvestorChatSessionDetailAPIView.as_view(), name='investor-chat-session-detail'),
     path('ai/health', AIHealthAPIView.as_view(), name='ai-health'),
+    path('ai/circuit-breakers', AICircuitBreakersAPIView.as_view(), name='ai-circuit-breakers'),
 ]
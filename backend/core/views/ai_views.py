@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.authentication import BaseAuthentication
-from core.services.ai_service import generate_narrative, fallback_narrative
+from core.services.ai_service import generate_narrative
 
 class AINarrativeAPIView(APIView):
     permission_classes = [AllowAny]
@@ -13,5 +13,6 @@ class AINarrativeAPIView(APIView):
         company = data.get("company") or {}
         score = data.get("score") or 0
         sections = data.get("sections") or []
-        # Temporary: Always use deterministic narrative to avoid client errors
-        return Response(fallback_narrative(company, score), status=status.HTTP_200_OK)
+        # Precomputed after submission; the stub until it is stored
+        evaluation_id = data.get("evaluation_id") or (company.get("id") if isinstance(company, dict) else None)
+        return Response(generate_narrative(company, score, sections, evaluation_id), status=status.HTTP_200_OK)
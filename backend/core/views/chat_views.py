@@ -4,32 +4,27 @@ from rest_framework import permissions, status, throttling
 from django.utils.html import strip_tags
 from django.http import StreamingHttpResponse
 import json
+from django.conf import settings
 from core.models.chat import ChatSession, ChatMessage
 from core.serializers.chat_serializers import ChatSessionSerializer, ChatMessageSerializer
-from core.services.startup_data_service import fetch_investor_context
-from core.services.ai_service import generate_response, UNRELATED_RESPONSE, SYSTEM_PROMPT, select_formatted_response
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None
+from core.services.startup_data_service import fetch_investor_context, iter_company_rows, profile_weights
+from core.services.ai_service import STREAMED_INTENTS, build_messages, generate_response, platform_answer, stream_formatted_response, UNRELATED_RESPONSE, SYSTEM_PROMPT, select_formatted_response
+from core.services.query_parser import parse_query
+from core.services import answer_cache, context_encoder
+from core.services.deadline import Deadline, db_time_limit
+from core.services.llm_gateway import LLMUnavailable, get_gateway
+from core.services.llm_providers import get_providers
+from core.services.narrative_service import get_narrative_worker
 import logging
-import os
-from decouple import config
-try:
-    import httpx
-except Exception:
-    httpx = None
-try:
-    import google.generativeai as genai
-except Exception:
-    genai = None
 from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
 from core.renderers.event_stream import EventStreamRenderer
 
 
 class InvestorThrottle(throttling.SimpleRateThrottle):
     scope = "investor_chat"
-    rate = "10/minute"
+
+    def get_rate(self):
+        return getattr(settings, "INVESTOR_CHAT_THROTTLE_RATE", "10/minute")
 
     def get_cache_key(self, request, view):
         if not request.user or not request.user.is_authenticated:
@@ -65,8 +60,11 @@ class InvestorChatAPIView(APIView):
 
         ChatMessage.objects.create(session=session, sender=ChatMessage.Sender.USER, message=text)
 
-        ctx = fetch_investor_context(user, text)
-        answer = generate_response(text, ctx)
+        deadline = Deadline.for_request()
+        query = parse_query(text)
+        with db_time_limit(deadline):
+            ctx = fetch_investor_context(user, text, weights=profile_weights(user, payload.get("profile_id")), chat_query=query)
+        answer = generate_response(text, ctx, query, deadline=deadline)
 
         ChatMessage.objects.create(session=session, sender=ChatMessage.Sender.ASSISTANT, message=answer)
 
@@ -125,6 +123,8 @@ class InvestorChatStreamAPIView(APIView):
             session = ChatSession.objects.create(investor=user)
         ChatMessage.objects.create(session=session, sender=ChatMessage.Sender.USER, message=text)
 
+        deadline = Deadline.for_request()
+
         def event_stream():
             seq = 0
             yield f"event: meta\ndata: {json.dumps({'session_id': str(session.id)})}\n\n".encode("utf-8")
@@ -137,10 +137,30 @@ class InvestorChatStreamAPIView(APIView):
             except Exception:
                 min_score = None
             try:
-                limit = int(request.GET.get("limit")) if request.GET.get("limit") else 10
+                limit = int(request.GET.get("limit")) if request.GET.get("limit") else None
             except Exception:
-                limit = 10
-            ctx = fetch_investor_context(user, text, ids=ids_list or None, stage=stage, min_score=min_score, limit=limit)
+                limit = None
+            query = parse_query(text)
+            with db_time_limit(deadline):
+                weights = profile_weights(user, request.GET.get("profile_id"))
+            if query.intent in STREAMED_INTENTS and not weights:
+                # Tables and lists go out chunk by chunk as rows are read, not after the whole answer is built
+                logger.info(f"[stream] q='{text[:100]}' streamed={query.intent} stage={stage} min_score={min_score} limit={limit}")
+                lines_acc = []
+                with db_time_limit(deadline):
+                    chunks = iter_company_rows(query, ids=ids_list or None, stage=stage, min_score=min_score, limit=limit)
+                    for lines in stream_formatted_response(query, chunks):
+                        events = []
+                        for line in lines:
+                            seq += 1
+                            events.append(f"id: {seq}\nevent: token\ndata: {line}\n\n")
+                        lines_acc.extend(lines)
+                        yield "".join(events).encode("utf-8")
+                yield "event: done\ndata: {}\n\n".encode("utf-8")
+                ChatMessage.objects.create(session=session, sender=ChatMessage.Sender.ASSISTANT, message="\n".join(lines_acc))
+                return
+            with db_time_limit(deadline):
+                ctx = fetch_investor_context(user, text, ids=ids_list or None, stage=stage, min_score=min_score, limit=limit, weights=weights, chat_query=query)
             try:
                 companies_count = len(ctx.get("companies") or [])
             except Exception:
@@ -148,7 +168,7 @@ class InvestorChatStreamAPIView(APIView):
             logger.info(f"[stream] q='{text[:100]}' companies={companies_count} stage={stage} min_score={min_score} limit={limit}")
             structured = None
             try:
-                structured = select_formatted_response(text, ctx)
+                structured = select_formatted_response(text, ctx, query)
             except Exception:
                 structured = None
             if structured:
@@ -160,65 +180,59 @@ class InvestorChatStreamAPIView(APIView):
                 yield "event: done\ndata: {}\n\n".encode("utf-8")
                 ChatMessage.objects.create(session=session, sender=ChatMessage.Sender.ASSISTANT, message=content_acc)
                 return
-            api_key = config("OPENAI_API_KEY", default="")
+            gateway = get_gateway()
             content_acc = ""
-            if not api_key or OpenAI is None:
-                # Fallback without OpenAI: use non-stream generator
-                ans = generate_response(text, ctx)
+            if not gateway.available:
+                # Fallback without a model provider: use non-stream generator
+                ans = generate_response(text, ctx, query, deadline=deadline)
                 content_acc = ans
                 yield f"event: token\ndata: {ans}\n\n".encode("utf-8")
                 yield "event: done\ndata: {}\n\n".encode("utf-8")
                 ChatMessage.objects.create(session=session, sender=ChatMessage.Sender.ASSISTANT, message=content_acc)
                 return
             try:
-                # avoid proxy incompatibilities with httpx version
-                try:
-                    for k in ["HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy", "ALL_PROXY", "all_proxy"]:
-                        if k in os.environ:
-                            os.environ.pop(k, None)
-                except Exception:
-                    pass
-                if httpx is not None:
-                    http_client = httpx.Client(timeout=30)
-                    client = OpenAI(api_key=api_key, http_client=http_client)
-                else:
-                    client = OpenAI(api_key=api_key)
                 sys_prompt = SYSTEM_PROMPT
                 # Simple unrelated guard pre-check
-                ql = text.lower()
-                invest_terms = ["startup", "startups", "company", "companies", "funding", "valuation", "mrr", "revenue", "invest", "investment", "cap table", "roi", "risk", "traction", "deal", "round", "growth", "users", "burn", "raise", "score", "stage", "portfolio", "list"]
-                if not any(t in ql for t in invest_terms):
+                if query.unrelated:
                     content_acc = UNRELATED_RESPONSE
                     yield f"event: token\ndata: {UNRELATED_RESPONSE}\n\n".encode("utf-8")
                     yield "event: done\ndata: {}\n\n".encode("utf-8")
                     ChatMessage.objects.create(session=session, sender=ChatMessage.Sender.ASSISTANT, message=content_acc)
                     return
-                msgs = [
-                    {"role": "system", "content": sys_prompt},
-                    {"role": "user", "content": f"Question: {text}\n\nContext:\n{json.dumps(ctx)}"},
-                ]
-                stream = client.chat.completions.create(
-                    model=config("OPENAI_MODEL", default="gpt-4o-mini"),
-                    messages=msgs,
-                    temperature=0.2,
-                    max_tokens=400,
-                    stream=True,
-                )
-                for part in stream:
-                    try:
-                        delta = part.choices[0].delta.content or ""
-                    except Exception:
-                        delta = ""
-                    if delta:
+                cache_key = answer_cache.answer_key(text, ctx, gateway.model_key, sys_prompt)
+                cached = answer_cache.get_answer(cache_key)
+                if cached:
+                    # Replay the cached deltas with the framing of a live stream
+                    logger.info(f"[stream] cache_hit provider={cached.get('provider')}")
+                    for delta in cached["chunks"]:
                         content_acc += delta
                         seq += 1
                         yield f"id: {seq}\nevent: token\ndata: {delta}\n\n".encode("utf-8")
+                    yield "event: done\ndata: {}\n\n".encode("utf-8")
+                    return
+                budget = deadline.llm_budget()
+                if budget <= 0:
+                    raise LLMUnavailable("request deadline spent before the model call")
+                msgs = build_messages(text, ctx, query)
+                # Hedged across the providers whose circuit is closed; streams from whichever answers first
+                chunks = []
+                provider = None
+                for provider, delta in gateway.stream(msgs, temperature=0.2, max_tokens=400, timeout=budget):
+                    content_acc += delta
+                    chunks.append(delta)
+                    seq += 1
+                    yield f"id: {seq}\nevent: token\ndata: {delta}\n\n".encode("utf-8")
+                answer_cache.set_answer(cache_key, content_acc, chunks, provider=provider or "")
                 yield "event: done\ndata: {}\n\n".encode("utf-8")
             except Exception as e:
-                logger.error(f"[stream] openai_error: {e}")
-                # Fallback to non-stream generator (may use Gemini if configured)
+                logger.error(f"[stream] llm_error: {e}")
+                if content_acc:
+                    # Cut off mid-answer by the deadline: end the partial answer rather than append another
+                    yield "event: done\ndata: {}\n\n".encode("utf-8")
+                    return
+                # Every provider failed or is open, or no time is left: answer from platform data
                 try:
-                    ans = generate_response(text, ctx)
+                    ans = platform_answer(text, ctx, query)
                 except Exception as ge:
                     logger.error(f"[stream] fallback_error: {ge}")
                     ans = "Information not available in platform records."
@@ -278,6 +292,14 @@ class InvestorChatSessionDetailAPIView(APIView):
         return Response({"id": str(s.id), "created_at": s.created_at, "messages": msgs}, status=status.HTTP_200_OK)
 
 
+class AICircuitBreakersAPIView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        gateway = get_gateway()
+        return Response({"providers": gateway.breaker_states(), "short_circuited": gateway.stats()["short_circuited"]}, status=status.HTTP_200_OK)
+
+
 class AIHealthAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -286,36 +308,27 @@ class AIHealthAPIView(APIView):
             "openai": {"configured": False, "ok": False, "error": None, "model": None},
             "gemini": {"configured": False, "ok": False, "error": None, "model": None},
         }
+        providers = get_providers()
         # OpenAI
-        okey = config("OPENAI_API_KEY", default="")
-        if okey and OpenAI is not None:
+        if providers.openai_configured:
             out["openai"]["configured"] = True
             try:
-                try:
-                    for k in ["HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy", "ALL_PROXY", "all_proxy"]:
-                        if k in os.environ:
-                            os.environ.pop(k, None)
-                except Exception:
-                    pass
-                if httpx is not None:
-                    http_client = httpx.Client(proxies=None, timeout=10)
-                    client = OpenAI(api_key=okey, http_client=http_client)
-                else:
-                    client = OpenAI(api_key=okey)
-                _ = client.models.list()
+                _ = providers.openai().with_options(timeout=10).models.list()
                 out["openai"]["ok"] = True
-                out["openai"]["model"] = config("OPENAI_MODEL", default="gpt-4o-mini")
+                out["openai"]["model"] = providers.openai_model
             except Exception as e:
                 out["openai"]["error"] = str(e)
         # Gemini
-        gkey = config("GEMINI_API_KEY", default="")
-        if gkey and genai is not None:
+        if providers.gemini_configured:
             out["gemini"]["configured"] = True
             try:
-                genai.configure(api_key=gkey)
-                _ = genai.list_models()
+                _ = providers.gemini_list_models()
                 out["gemini"]["ok"] = True
-                out["gemini"]["model"] = config("GEMINI_MODEL", default="models/gemini-1.5-flash-latest")
+                out["gemini"]["model"] = providers.gemini_model_name
             except Exception as e:
                 out["gemini"]["error"] = str(e)
+        out["answer_cache"] = answer_cache.stats()
+        out["gateway"] = get_gateway().stats()
+        out["context_encoder"] = context_encoder.stats()
+        out["narratives"] = get_narrative_worker().stats()
         return Response(out, status=status.HTTP_200_OK)
@@ -1,8 +1,9 @@
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView, RetrieveAPIView, CreateAPIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
+from rest_framework import status, permissions, throttling
 from rest_framework.exceptions import NotFound
+from django.db import transaction
 
 from core.models.evaluation import StartupEvaluation
 from core.serializers.evaluation_serializers import (
@@ -12,6 +13,12 @@ from core.serializers.evaluation_serializers import (
 )
 from core.repositories.evaluation_repository import EvaluationRepository
 from core.services.scoring_engine import StartupScoringEngine
+from core.services.engine_input import STEP_KEYS, has_steps, flatten_steps
+from core.services.score_distribution import get_score_distribution
+from core.services.what_if import score_grid
+from core.services.scoring_preview import preview_score
+from core.services.monte_carlo import simulate_steps, DEFAULT_DRAWS
+from core.services.narrative_service import schedule_narrative
 
 class CreateEvaluationAPIView(CreateAPIView):
     """
@@ -39,51 +46,9 @@ class SubmitFullEvaluationAPIView(APIView):
 
         # Support both legacy flat payload and new step1..step8 payload
         steps_payload = None
-        if all(k in data for k in ['step1', 'step2', 'step3', 'step4', 'step5', 'step6', 'step7', 'step8']):
+        if has_steps(data):
             steps_payload = data
-            # Flatten minimal base fields from step data for model validation
-            s1 = data.get('step1', {}) or {}
-            s3 = data.get('step3', {}) or {}
-            s4 = data.get('step4', {}) or {}
-            s5 = data.get('step5', {}) or {}
-            s6 = data.get('step6', {}) or {}
-            s7 = data.get('step7', {}) or {}
-            s8 = data.get('step8', {}) or {}
-
-            flat_for_model = {
-                'company_name': s1.get('companyName'),
-                'legal_structure': s1.get('legalStructure'),
-                'incorporation_year': s1.get('incorporationYear'),
-                'country': s1.get('country'),
-                'stage': (s1.get('stage') or 'IDEA').upper().replace('-', '_'),
-                'funding_raised': s1.get('previousFunding') or 0,
-                'founder_profile_url': s5.get('founderProfileUrl') or s7.get('founderProfileUrl'),
-            }
-            valid_stages = {c for c, _ in StartupEvaluation.Stage.choices}
-            st = flat_for_model['stage']
-            if st not in valid_stages:
-                if isinstance(st, str) and (st.startswith('SERIES_') or st == 'PUBLIC'):
-                    flat_for_model['stage'] = 'GROWTH'
-                else:
-                    flat_for_model['stage'] = 'IDEA'
-
-            # Build engine input from raw steps
-            engine_input = {
-                'company_name': flat_for_model['company_name'],
-                'legal_structure': flat_for_model['legal_structure'],
-                'incorporation_year': flat_for_model['incorporation_year'],
-                'country': flat_for_model['country'],
-                'stage': flat_for_model['stage'],
-                'funding_raised': flat_for_model['funding_raised'],
-                'tam_size': s3.get('tam'),
-                'competition_level': s3.get('competitors') and 'Medium' or None,
-                'active_users': s4.get('activeUsers'),
-                'mrr': s4.get('monthlyRevenue'),
-                'burn_rate': s6.get('burnRate'),
-                'founders_count': s5.get('foundersCount'),
-                'has_technical_founder': s5.get('hasTechnicalFounder'),
-                'exit_strategy': s8.get('exitStrategy'),
-            }
+            flat_for_model, engine_input = flatten_steps(data)
         else:
             engine_input = data
             flat_for_model = data
@@ -93,12 +58,14 @@ class SubmitFullEvaluationAPIView(APIView):
         create_serializer.is_valid(raise_exception=True)
         validated_data = create_serializer.validated_data
 
-        # 2. Run Scoring Engine
+        # 2. Run Scoring Engine (keeping per-section results for incremental rescoring)
         engine = StartupScoringEngine(engine_input)
-        score_result = engine.calculate()
+        score_result, section_details, _ = engine.calculate_incremental()
 
         # 3. Save Evaluation via Repository
         # Merge validated model data with scoring results
+        # (load the score distribution first so a reload cannot count this row twice)
+        distribution = get_score_distribution()
         
         # Determine user: if authenticated use request.user, otherwise use None or a default/guest user
         user = request.user if request.user.is_authenticated else None
@@ -107,6 +74,8 @@ class SubmitFullEvaluationAPIView(APIView):
             user=user,
             total_score=score_result['total_score'],
             rating=score_result['rating'],
+            section_scores=score_result['section_scores'],
+            section_details=section_details,
             **validated_data
         )
 
@@ -120,7 +89,14 @@ class SubmitFullEvaluationAPIView(APIView):
                 evaluation.form_data = steps_field
                 evaluation.save(update_fields=['form_data'])
 
-        # 5. Return Response
+        # 5. Place the score in the precomputed distribution
+        distribution.add(evaluation.stage, score_result['total_score'])
+        percentiles = distribution.percentiles(score_result['total_score'], evaluation.stage)
+
+        # 6. Write the investor narrative in the background
+        schedule_narrative(evaluation.id)
+
+        # 7. Return Response
         return Response({
             'evaluation_id': evaluation.id,
             'company_name': evaluation.company_name,
@@ -130,9 +106,145 @@ class SubmitFullEvaluationAPIView(APIView):
             'strengths': score_result['strengths'],
             'weaknesses': score_result['weaknesses'],
             'section_scores': score_result.get('section_scores', {}),
+            'percentiles': percentiles,
             'created_at': evaluation.created_at
         }, status=status.HTTP_201_CREATED)
 
+class EvaluationFormUpdateAPIView(APIView):
+    """
+    API View to update the step form data of an evaluation.
+    Only the sections whose engine inputs changed are rescored.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def patch(self, request, id, *args, **kwargs):
+        patch = request.data or {}
+        if not isinstance(patch, dict) or not any(k in patch for k in STEP_KEYS):
+            return Response({'detail': 'At least one of step1..step8 is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Loaded before the write so a reload cannot already include this edit
+        distribution = get_score_distribution()
+
+        # Row lock serializes concurrent edits: each one merges into the latest form_data
+        with transaction.atomic():
+            evaluation = EvaluationRepository.get_evaluation_for_update(id, request.user)
+            if not evaluation:
+                raise NotFound("Evaluation not found or access denied.")
+            if not has_steps(evaluation.form_data):
+                return Response({'detail': 'Evaluation has no step form data to update.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            form_data = dict(evaluation.form_data)
+            for key in STEP_KEYS:
+                if isinstance(patch.get(key), dict):
+                    form_data[key] = {**(form_data.get(key) or {}), **patch[key]}
+            flat_for_model, engine_input = flatten_steps(form_data)
+
+            update_serializer = EvaluationCreateSerializer(evaluation, data=flat_for_model)
+            update_serializer.is_valid(raise_exception=True)
+
+            previous = (evaluation.stage, evaluation.total_score)
+            engine = StartupScoringEngine(engine_input)
+            score_result, section_details, recomputed = engine.calculate_incremental(
+                evaluation.section_scores, evaluation.section_details
+            )
+            evaluation = EvaluationRepository.save_form_update(
+                evaluation,
+                form_data=form_data,
+                total_score=score_result['total_score'],
+                rating=score_result['rating'],
+                section_scores=score_result['section_scores'],
+                section_details=section_details,
+                **update_serializer.validated_data
+            )
+            # The stored narrative is served until the rewrite replaces it
+            schedule_narrative(evaluation.id)
+
+        distribution.move(previous, (evaluation.stage, evaluation.total_score))
+
+        return Response({
+            'evaluation_id': evaluation.id,
+            'company_name': evaluation.company_name,
+            'total_score': score_result['total_score'],
+            'rating': score_result['rating'],
+            'risk_flags': score_result['risk_flags'],
+            'strengths': score_result['strengths'],
+            'weaknesses': score_result['weaknesses'],
+            'section_scores': score_result['section_scores'],
+            'recomputed_sections': recomputed,
+            'percentiles': distribution.percentiles(evaluation.total_score, evaluation.stage),
+            'updated_at': evaluation.updated_at
+        }, status=status.HTTP_200_OK)
+
+class EvaluationWhatIfAPIView(APIView):
+    """
+    API View for what-if sensitivity analysis: scores the cartesian grid of the
+    requested input ranges around an evaluation in one vectorized pass.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, id, *args, **kwargs):
+        evaluation = EvaluationRepository.get_evaluation_detail(evaluation_id=id, user=request.user)
+        if not evaluation:
+            raise NotFound("Evaluation not found or access denied.")
+        if not has_steps(evaluation.form_data):
+            return Response({'detail': 'Evaluation has no step form data to analyse.'}, status=status.HTTP_400_BAD_REQUEST)
+        data = request.data or {}
+        _, engine_input = flatten_steps(evaluation.form_data)
+        try:
+            result = score_grid(engine_input, data.get('ranges') or {}, data.get('overrides') or {})
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'evaluation_id': evaluation.id, **result}, status=status.HTTP_200_OK)
+
+class ScoringPreviewThrottle(throttling.SimpleRateThrottle):
+    scope = "scoring_preview"
+    rate = "600/minute"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+class EvaluationPreviewAPIView(APIView):
+    """
+    Stateless dry-run scoring for the multi-step form.
+    Accepts a partial step1..step8 payload and never touches the database.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = [ScoringPreviewThrottle]
+
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        if not isinstance(data, dict) or not any(isinstance(data.get(k), dict) for k in STEP_KEYS):
+            return Response({'detail': 'At least one of step1..step8 is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        result, cached = preview_score(data)
+        return Response({**result, 'cached': cached}, status=status.HTTP_200_OK)
+
+class EvaluationSimulateAPIView(APIView):
+    """
+    Monte Carlo scoring for a step payload whose numeric fields may be ranges,
+    e.g. {"step4": {"monthlyRevenue": {"min": 5000, "max": 15000}}}.
+    Returns the expected score, P10/P50/P90 and the probability of each rating.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = [ScoringPreviewThrottle]
+
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        if not isinstance(data, dict) or not any(isinstance(data.get(k), dict) for k in STEP_KEYS):
+            return Response({'detail': 'At least one of step1..step8 is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            draws = int(data.get('draws') or DEFAULT_DRAWS)
+            seed = data.get('seed')
+            seed = int(seed) if seed is not None else None
+        except (TypeError, ValueError):
+            return Response({'detail': "'draws' and 'seed' must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = simulate_steps(data, draws=draws, seed=seed)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
 class AnalyticsSummaryAPIView(APIView):
     """
     Analytics summary for benchmarking and trends.
@@ -1,10 +1,21 @@
 from typing import Any, Dict, List
+from django.db import transaction
 from django.db.models import Count
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
+from rest_framework.pagination import PageNumberPagination
 
-from core.models import StartupEvaluation
+from core.models import StartupEvaluation, WeightingProfile
+from core.serializers.weighting_profile_serializers import WeightingProfileSerializer
+from core.services.evaluation_search import SearchResults, search_terms
+from core.services.weighted_ranking import get_section_matrix
+
+MAX_RANKING_LIMIT = 500
+
+
+def _is_investor(user) -> bool:
+    return getattr(user, "is_investor", False) or getattr(user, "is_staff", False)
 
 
 class InvestorDashboardStatsAPIView(APIView):
@@ -88,3 +99,105 @@ class StartupsListAPIView(APIView):
             )
         return Response({"results": rows}, status=status.HTTP_200_OK)
 
+
+class StartupSearchPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class StartupSearchAPIView(APIView):
+    """
+    Ranked full-text search over company names and the free-text form
+    answers (?q=, each word matched as a prefix), paginated with ?page= and
+    ?page_size=. Backed by the database full-text index where there is one.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        query = (request.query_params.get("q") or "").strip()[:200]
+        if not search_terms(query):
+            return Response({"detail": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = StartupSearchPagination()
+        page = paginator.paginate_queryset(SearchResults(query), request, view=self)
+        return paginator.get_paginated_response(page)
+
+
+class WeightingProfileListCreateAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not _is_investor(request.user):
+            return Response({"detail": "Investor access required."}, status=status.HTTP_403_FORBIDDEN)
+        qs = WeightingProfile.objects.filter(investor=request.user)
+        return Response({"results": WeightingProfileSerializer(qs, many=True).data}, status=status.HTTP_200_OK)
+
+    def post(self, request, *args, **kwargs):
+        if not _is_investor(request.user):
+            return Response({"detail": "Investor access required."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = WeightingProfileSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            if serializer.validated_data.get("is_default"):
+                WeightingProfile.objects.filter(investor=request.user, is_default=True).update(is_default=False)
+            profile = serializer.save(investor=request.user)
+        return Response(WeightingProfileSerializer(profile).data, status=status.HTTP_201_CREATED)
+
+
+class WeightingProfileDetailAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _get_profile(self, request, id):
+        try:
+            return WeightingProfile.objects.get(id=id, investor=request.user)
+        except WeightingProfile.DoesNotExist:
+            return None
+
+    def get(self, request, id, *args, **kwargs):
+        profile = self._get_profile(request, id)
+        if profile is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(WeightingProfileSerializer(profile).data, status=status.HTTP_200_OK)
+
+    def patch(self, request, id, *args, **kwargs):
+        profile = self._get_profile(request, id)
+        if profile is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = WeightingProfileSerializer(profile, data=request.data, partial=True, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            if serializer.validated_data.get("is_default"):
+                WeightingProfile.objects.filter(investor=request.user, is_default=True).exclude(pk=profile.pk).update(is_default=False)
+            profile = serializer.save()
+        return Response(WeightingProfileSerializer(profile).data, status=status.HTTP_200_OK)
+
+    def delete(self, request, id, *args, **kwargs):
+        profile = self._get_profile(request, id)
+        if profile is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        profile.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class WeightingProfileRankingAPIView(APIView):
+    """Top-N startups ranked by the weighted sum of their section scores under a saved profile."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, id, *args, **kwargs):
+        try:
+            profile = WeightingProfile.objects.get(id=id, investor=request.user)
+        except WeightingProfile.DoesNotExist:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = min(max(int(request.query_params.get("limit", "10")), 1), MAX_RANKING_LIMIT)
+        except ValueError:
+            limit = 10
+        try:
+            min_score = int(request.query_params["min_score"]) if request.query_params.get("min_score") else None
+        except ValueError:
+            min_score = None
+        stage = request.query_params.get("stage") or None
+        try:
+            results = get_section_matrix().rank(profile.weights, stage=stage, min_score=min_score, limit=limit)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"profile": WeightingProfileSerializer(profile).data, "results": results}, status=status.HTTP_200_OK)
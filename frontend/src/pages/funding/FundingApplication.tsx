@@ -253,7 +253,7 @@ export default function FundingApplication() {
 
       const result = await evaluationService.submitFullEvaluation(payload as any);
       try {
-        const ai = await aiService.generateNarrative(formData, result?.total_score ?? 0, []);
+        const ai = await aiService.generateNarrative(formData, result?.total_score ?? 0, [], result?.evaluation_id);
         const cleanSummary =
           (ai.summary && ai.summary !== "Automated snapshot based on submitted signals.")
             ? ai.summary
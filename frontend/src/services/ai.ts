@@ -32,8 +32,8 @@ async function callBackendNarrative(payload: any, requestId: string): Promise<Na
 }
 
 export const aiService = {
-  async generateNarrative(company: any, score: number, sections: any[]): Promise<NarrativeResponse> {
-    const payload = { company, score, sections };
+  async generateNarrative(company: any, score: number, sections: any[], evaluationId?: string): Promise<NarrativeResponse> {
+    const payload = { company, score, sections, evaluation_id: evaluationId };
     const requestId = Math.random().toString(36).slice(2);
     let attempt = 0;
     const backoff = [500, 1500, 3000];
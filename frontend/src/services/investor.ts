@@ -11,6 +11,11 @@ export const investorService = {
     const data: any = res.data;
     return Array.isArray(data) ? data : data?.results || [];
   },
+  async searchStartups(q: string, page = 1, pageSize = 20) {
+    // {count, next, previous, results: [{id, name, stage, country, total_score, rating, relevance}]}
+    const res = await api.get("/startups/search", { params: { q, page, page_size: pageSize } });
+    return res.data;
+  },
   async getEvaluationDetail(id: string) {
     const res = await api.get(`/evaluations/${id}/`);
     return res.data;